@@ -0,0 +1,231 @@
+import numpy as np
+
+from constants import WIDTH, HEIGHT, PIECES, PIECES_TYPES, FRAMES_PER_DROP, LINE_CLEAR_HIGHLIGHT_FRAMES
+from enums.game_phase import GamePhase
+from enums.randomizer_type import RandomizerType
+from enums.rotation import Rotation
+from enums.user_input_state import UserInputState
+from piece_randomizer import generate_piece_sequence
+
+
+def _build_cell_tables() -> tuple[np.ndarray, np.ndarray]:
+    # mino offsets indexed by [CellState.value, Rotation.value, mino]
+    max_type = max(piece_type.value for piece_type in PIECES_TYPES)
+    mino_count = max(len(piece.get_shape(rotation).cells) for piece in PIECES.values() for rotation in Rotation)
+    cell_rows = np.zeros((max_type + 1, len(Rotation), mino_count), dtype=np.int64)
+    cell_cols = np.zeros((max_type + 1, len(Rotation), mino_count), dtype=np.int64)
+    for piece_type, piece in PIECES.items():
+        for rotation in Rotation:
+            cells = piece.get_shape(rotation).cells
+            if len(cells) != mino_count:
+                raise ValueError(f'{piece_type} has {len(cells)} cells, BatchTetris needs {mino_count}')
+            cell_rows[piece_type.value, rotation.value] = [row for row, _ in cells]
+            cell_cols[piece_type.value, rotation.value] = [col for _, col in cells]
+    return cell_rows, cell_cols
+
+
+CELL_ROWS, CELL_COLS = _build_cell_tables()
+PIECE_TYPE_VALUES = np.array([piece_type.value for piece_type in PIECES_TYPES], dtype=np.int64)
+MAX_LEVEL = max(FRAMES_PER_DROP.keys())
+FRAMES_PER_DROP_TABLE = np.array([FRAMES_PER_DROP[level] for level in range(MAX_LEVEL + 1)], dtype=np.int64)
+LINE_SCORE_TABLE = np.array([0, 40, 100, 300, 1200], dtype=np.int64)
+# whole bags, so games wrapping around the sequence stay on bag boundaries
+DEFAULT_SEQUENCE_LENGTH = (1 << 15) * len(PIECES_TYPES)
+
+
+class BatchTetris:
+    count: int
+    width: int
+    height: int
+    rng: np.random.Generator
+    # indices into PIECES_TYPES, one byte per piece, read by every game from its own position
+    piece_sequence: np.ndarray
+    # position of the next piece of every game in piece_sequence
+    sequence_positions: np.ndarray
+    # (count, height, width) CellState values
+    boards: np.ndarray
+    pending_lines: np.ndarray
+    # active piece, CellState.value and Rotation.value
+    piece_type: np.ndarray
+    piece_row: np.ndarray
+    piece_col: np.ndarray
+    piece_rotation: np.ndarray
+    # GamePhase.value
+    game_phase: np.ndarray
+    start_level: np.ndarray
+    level: np.ndarray
+    cleared_lines_count: np.ndarray
+    score: np.ndarray
+    frame: np.ndarray
+    next_frame_to_drop: np.ndarray
+    highlight_end_frame: np.ndarray
+
+    def __init__(self, count: int, start_level: int = 0, seed: int | None = None, piece_sequence: bytes | None = None,
+                 randomizer_type: RandomizerType = RandomizerType.UNIFORM):
+        self.count = count
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.rng = np.random.default_rng(seed)
+        if piece_sequence is None:
+            piece_sequence = generate_piece_sequence(randomizer_type, len(PIECES_TYPES), DEFAULT_SEQUENCE_LENGTH,
+                                                     int(self.rng.integers(1 << 63)))
+        # a shared buffer is not copied, batches built from the same bytes read the same memory
+        self.piece_sequence = np.frombuffer(piece_sequence, dtype=np.uint8)
+        # games start on different bag boundaries of the sequence
+        self.sequence_positions = self.rng.integers(0, len(self.piece_sequence) // len(PIECES_TYPES),
+                                                    size=count) * len(PIECES_TYPES)
+        self.boards = np.zeros((count, HEIGHT, WIDTH), dtype=np.uint8)
+        self.pending_lines = np.zeros((count, HEIGHT), dtype=bool)
+        self.piece_type = np.zeros(count, dtype=np.int64)
+        self.piece_row = np.zeros(count, dtype=np.int64)
+        self.piece_col = np.zeros(count, dtype=np.int64)
+        self.piece_rotation = np.zeros(count, dtype=np.int64)
+        self.game_phase = np.zeros(count, dtype=np.int64)
+        self.start_level = np.zeros(count, dtype=np.int64)
+        self.level = np.zeros(count, dtype=np.int64)
+        self.cleared_lines_count = np.zeros(count, dtype=np.int64)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.frame = np.zeros(count, dtype=np.int64)
+        self.next_frame_to_drop = np.zeros(count, dtype=np.int64)
+        self.highlight_end_frame = np.zeros(count, dtype=np.int64)
+        self.reset(np.arange(count), start_level)
+
+    # region Public methods
+    def reset(self, indices: np.ndarray, start_level: int = 0):
+        # equivalent to TetrisEngine leaving GamePhase.START at start_level
+        self.boards[indices] = 0
+        self.pending_lines[indices] = False
+        self.game_phase[indices] = GamePhase.PLAYING.value
+        self.start_level[indices] = start_level
+        self.level[indices] = start_level
+        self.cleared_lines_count[indices] = 0
+        self.score[indices] = 0
+        self.frame[indices] = 0
+        self.highlight_end_frame[indices] = LINE_CLEAR_HIGHLIGHT_FRAMES
+        self._spawn_pieces(indices)
+
+    def step(self, actions: np.ndarray):
+        # one logic frame for every game, actions are UserInputState values
+        actions = np.asarray(actions)
+        self.frame += 1
+        playing = np.flatnonzero(self.game_phase == GamePhase.PLAYING.value)
+        clearing = np.flatnonzero(self.game_phase == GamePhase.CLEARING_LINE.value)
+        if len(playing):
+            self._update_game_state(playing, actions[playing])
+        if len(clearing):
+            self._update_game_line(clearing)
+
+    def check_pieces_valid(self, indices: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                           rotations: np.ndarray) -> np.ndarray:
+        piece_types = self.piece_type[indices]
+        board_rows = rows[:, None] + CELL_ROWS[piece_types, rotations]
+        board_cols = cols[:, None] + CELL_COLS[piece_types, rotations]
+        inside = (board_rows >= 0) & (board_rows < self.height) & (board_cols >= 0) & (board_cols < self.width)
+        cells = self.boards[indices[:, None],
+                            np.clip(board_rows, 0, self.height - 1), np.clip(board_cols, 0, self.width - 1)]
+        return np.all(inside & (cells == 0), axis=1)
+
+    def get_drop_distances(self, indices: np.ndarray) -> np.ndarray:
+        piece_types = self.piece_type[indices]
+        rotations = self.piece_rotation[indices]
+        board_rows = self.piece_row[indices, None] + CELL_ROWS[piece_types, rotations]
+        board_cols = self.piece_col[indices, None] + CELL_COLS[piece_types, rotations]
+        # (games, minos, height) occupancy of the column under every mino
+        columns = self.boards[indices[:, None, None], np.arange(self.height), board_cols[:, :, None]] != 0
+        # a mino already overlapping the stack blocks at its own row, the piece cannot drop like in BoardState
+        below = columns & (np.arange(self.height) >= board_rows[:, :, None])
+        first_blocked = np.where(below.any(axis=2), below.argmax(axis=2), self.height)
+        return np.maximum(np.min(first_blocked - board_rows - 1, axis=1), 0)
+    # endregion Public methods
+
+    # region Protected methods
+    def _next_piece_types(self, indices: np.ndarray) -> np.ndarray:
+        positions = self.sequence_positions[indices] % len(self.piece_sequence)
+        self.sequence_positions[indices] = positions + 1
+        return PIECE_TYPE_VALUES[self.piece_sequence[positions]]
+
+    def _get_frames_to_next_drop(self, indices: np.ndarray) -> np.ndarray:
+        self.level[indices] = np.minimum(self.level[indices], MAX_LEVEL)
+        return FRAMES_PER_DROP_TABLE[self.level[indices]]
+
+    def _spawn_pieces(self, indices: np.ndarray):
+        self.piece_type[indices] = self._next_piece_types(indices)
+        self.piece_row[indices] = 0
+        self.piece_col[indices] = self.width // 2
+        self.piece_rotation[indices] = Rotation.ZERO.value
+        self.next_frame_to_drop[indices] = self.frame[indices] + self._get_frames_to_next_drop(indices)
+
+    def _merge_pieces(self, indices: np.ndarray):
+        piece_types = self.piece_type[indices]
+        rotations = self.piece_rotation[indices]
+        board_rows = self.piece_row[indices, None] + CELL_ROWS[piece_types, rotations]
+        board_cols = self.piece_col[indices, None] + CELL_COLS[piece_types, rotations]
+        self.boards[indices[:, None], board_rows, board_cols] = piece_types[:, None]
+
+    def _lock_pieces(self, indices: np.ndarray):
+        self._merge_pieces(indices)
+        self._spawn_pieces(indices)
+
+    def _soft_drop(self, indices: np.ndarray):
+        valid = self.check_pieces_valid(indices, self.piece_row[indices] + 1, self.piece_col[indices],
+                                        self.piece_rotation[indices])
+        dropped = indices[valid]
+        self.piece_row[dropped] += 1
+        self.next_frame_to_drop[dropped] = self.frame[dropped] + self._get_frames_to_next_drop(dropped)
+        self._lock_pieces(indices[~valid])
+
+    def _update_game_state(self, indices: np.ndarray, actions: np.ndarray):
+        # rotation and movement
+        cols = self.piece_col[indices] + (actions == UserInputState.D_RIGHT.value) \
+            - (actions == UserInputState.D_LEFT.value)
+        rotations = (self.piece_rotation[indices] + (actions == UserInputState.D_ROTATE.value)) % len(Rotation)
+        valid = self.check_pieces_valid(indices, self.piece_row[indices], cols, rotations)
+        self.piece_col[indices[valid]] = cols[valid]
+        self.piece_rotation[indices[valid]] = rotations[valid]
+
+        # soft and hard drops
+        soft_dropped = indices[actions == UserInputState.D_DOWN.value]
+        if len(soft_dropped):
+            self._soft_drop(soft_dropped)
+        hard_dropped = indices[actions == UserInputState.D_HARD_DROP.value]
+        if len(hard_dropped):
+            # like TetrisEngine, the landing row is followed by a soft drop, which only moves a piece spawned into
+            # the stack
+            self.piece_row[hard_dropped] += self.get_drop_distances(hard_dropped)
+            self._soft_drop(hard_dropped)
+
+        # gravity, every successful drop moves next_frame_to_drop past the current frame
+        gravity = indices[self.frame[indices] >= self.next_frame_to_drop[indices]]
+        if len(gravity):
+            self._soft_drop(gravity)
+
+        self.pending_lines[indices] = np.all(self.boards[indices] != 0, axis=2)
+        clearing = indices[self.pending_lines[indices].any(axis=1)]
+        self.game_phase[clearing] = GamePhase.CLEARING_LINE.value
+        self.highlight_end_frame[clearing] = self.frame[clearing] + LINE_CLEAR_HIGHLIGHT_FRAMES
+
+        game_over_row = 0
+        topped_out = indices[np.any(self.boards[indices, game_over_row] != 0, axis=1)]
+        self.game_phase[topped_out] = GamePhase.GAME_OVER.value
+
+    def _update_game_line(self, indices: np.ndarray):
+        indices = indices[self.frame[indices] >= self.highlight_end_frame[indices]]
+        if not len(indices):
+            return
+        pending_lines = self.pending_lines[indices]
+        cleared_counts = pending_lines.sum(axis=1)
+        # stable sort moves cleared rows to the top and keeps the remaining rows in order
+        row_order = np.argsort(~pending_lines, axis=1, kind='stable')
+        boards = np.take_along_axis(self.boards[indices], row_order[:, :, None], axis=1)
+        boards[np.arange(self.height) < cleared_counts[:, None]] = 0
+        self.boards[indices] = boards
+
+        level = self.level[indices]
+        self.cleared_lines_count[indices] += cleared_counts
+        self.score[indices] += LINE_SCORE_TABLE[np.minimum(cleared_counts, 4)] * (level + 1) * (cleared_counts <= 4)
+        start_level = self.start_level[indices]
+        level_up_limit = np.minimum(start_level * 10 + 1, np.maximum(100, start_level * 10 - 50))
+        lines_for_next_level = level_up_limit + (level - start_level) * 10
+        self.level[indices] += self.cleared_lines_count[indices] >= lines_for_next_level
+        self.game_phase[indices] = GamePhase.PLAYING.value
+    # endregion Protected methods
@@ -0,0 +1,19 @@
+import argparse
+
+from benchmarks import bench_game_logic, bench_render, bench_scaling, bench_server
+from benchmarks.harness import DEFAULT_MIN_TIME, run_benchmarks, save_results, compare_results
+
+BENCHMARK_MODULES = [bench_game_logic, bench_render, bench_scaling, bench_server]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the game benchmarks.')
+    parser.add_argument('-k', '--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help='JSON file to write results to')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help='seconds to spend per benchmark')
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(BENCHMARK_MODULES, arguments.filter, arguments.min_time)
+    save_results(arguments.output, results)
+    if arguments.compare:
+        compare_results(arguments.compare, results)
@@ -0,0 +1,92 @@
+from benchmarks.fixtures import BOARD_KINDS, make_board, make_filled_board, make_piece, make_engine
+from benchmarks.harness import Benchmark, parametrize
+from bit_board_state import BitBoardState
+from board_state import BoardState
+from constants import PIECES
+from enums.cell_state import CellState
+from enums.randomizer_type import RandomizerType
+from enums.rotation import Rotation
+from enums.user_input_state import UserInputState
+from piece_randomizer import create_randomizer, generate_piece_sequence
+
+BOARD_TYPES = [BoardState, BitBoardState]
+ENGINE_ROUNDS = 300
+SEQUENCE_LENGTH = 1 << 16
+
+
+@parametrize('position', ['spawn', 'landing'])
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_check_piece_valid(benchmark: Benchmark, board_kind: str, board_type: type, position: str):
+    board_state = make_board(board_kind, board_type)
+    benchmark(board_state.check_piece_valid, make_piece(board_state, position))
+
+
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_find_filled_rows(benchmark: Benchmark, board_kind: str, board_type: type):
+    benchmark(make_board(board_kind, board_type).find_filled_rows)
+
+
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_clear_lines(benchmark: Benchmark, board_kind: str, board_type: type):
+    benchmark.pedantic(lambda board_state: board_state.clear_lines(),
+                       setup=lambda: (make_filled_board(board_kind, board_type),), rounds=ENGINE_ROUNDS)
+
+
+@parametrize('rotation', list(Rotation))
+def bench_get_piece_cell(benchmark: Benchmark, rotation: Rotation):
+    benchmark(PIECES[CellState.T_PIECE].get_piece_cell, 1, 2, rotation)
+
+
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_merge_piece(benchmark: Benchmark, board_kind: str, board_type: type):
+    def setup():
+        engine = make_engine(board_kind, board_type)
+        engine.piece_state.offset_row = engine.get_landing_row()
+        return engine,
+    benchmark.pedantic(lambda engine: engine.merge_piece(), setup=setup, rounds=ENGINE_ROUNDS)
+
+
+@parametrize('user_input_state', [UserInputState.D_NONE, UserInputState.D_LEFT, UserInputState.D_ROTATE,
+                                  UserInputState.D_HARD_DROP])
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_frame_step(benchmark: Benchmark, board_kind: str, board_type: type, user_input_state: UserInputState):
+    benchmark.pedantic(lambda engine: engine.step(user_input_state),
+                       setup=lambda: (make_engine(board_kind, board_type),), rounds=ENGINE_ROUNDS)
+
+
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_board_fork(benchmark: Benchmark, board_kind: str, board_type: type):
+    def fork_and_write(board_state):
+        board_state.fork().set_matrix_cell(0, 0, CellState.T_PIECE)
+    benchmark(fork_and_write, make_board(board_kind, board_type))
+
+
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_engine_snapshot(benchmark: Benchmark, board_kind: str, board_type: type):
+    benchmark(make_engine(board_kind, board_type).snapshot)
+
+
+@parametrize('board_type', BOARD_TYPES)
+@parametrize('board_kind', BOARD_KINDS)
+def bench_engine_restore(benchmark: Benchmark, board_kind: str, board_type: type):
+    engine = make_engine(board_kind, board_type)
+    benchmark(engine.restore, engine.snapshot())
+
+
+@parametrize('randomizer_type', list(RandomizerType))
+def bench_randomizer_next_piece(benchmark: Benchmark, randomizer_type: RandomizerType):
+    benchmark(create_randomizer(randomizer_type, len(PIECES), 0).next_piece)
+
+
+@parametrize('randomizer_type', list(RandomizerType))
+def bench_generate_piece_sequence(benchmark: Benchmark, randomizer_type: RandomizerType):
+    benchmark.extra_info['pieces'] = SEQUENCE_LENGTH
+    benchmark.pedantic(generate_piece_sequence, setup=lambda: (randomizer_type, len(PIECES), SEQUENCE_LENGTH, 0),
+                       rounds=10)
@@ -0,0 +1,93 @@
+import os
+
+from benchmarks.fixtures import BOARD_KINDS, make_engine
+from benchmarks.harness import Benchmark, parametrize
+from enums.user_input_state import UserInputState
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame as pg  # noqa: E402
+
+from board_compositor import BoardCompositor  # noqa: E402
+from game_configuration import DEFAULT_CONFIGURATION  # noqa: E402
+from spectator_wall import WALL_WINDOW_SIZE  # noqa: E402
+from tetris_game_state import TetrisGameState  # noqa: E402
+
+WALL_BOARD_COUNTS = [4, 16]
+
+game = None
+
+
+def _get_game() -> TetrisGameState:
+    global game
+    if game is None:
+        game = TetrisGameState(incremental_render=True)
+    return game
+
+
+def _render_full(game_state: TetrisGameState):
+    game_state.incremental_renderer, incremental_renderer = None, game_state.incremental_renderer
+    game_state.render()
+    pg.display.flip()
+    game_state.incremental_renderer = incremental_renderer
+
+
+def _render_incremental(game_state: TetrisGameState):
+    pg.display.update(game_state.render())
+
+
+@parametrize('board_kind', BOARD_KINDS)
+def bench_render_full(benchmark: Benchmark, board_kind: str):
+    game_state = _get_game()
+    game_state.engine = make_engine(board_kind)
+    benchmark(_render_full, game_state)
+
+
+@parametrize('board_kind', BOARD_KINDS)
+def bench_render_incremental_idle(benchmark: Benchmark, board_kind: str):
+    game_state = _get_game()
+    game_state.engine = make_engine(board_kind)
+    game_state.incremental_renderer.invalidate()
+    benchmark(_render_incremental, game_state)
+
+
+@parametrize('board_kind', BOARD_KINDS)
+def bench_render_incremental_moving(benchmark: Benchmark, board_kind: str):
+    game_state = _get_game()
+    game_state.engine = make_engine(board_kind)
+    game_state.incremental_renderer.invalidate()
+    moves = [UserInputState.D_LEFT, UserInputState.D_RIGHT]
+
+    def step_and_render(frame: list[int]):
+        frame[0] += 1
+        game_state.engine.update(moves[frame[0] % 2])
+        _render_incremental(game_state)
+    benchmark(step_and_render, [0])
+
+
+def _make_wall(board_count: int) -> tuple[BoardCompositor, list]:
+    _get_game()
+    compositor = BoardCompositor(pg.Surface(WALL_WINDOW_SIZE).convert(), board_count, DEFAULT_CONFIGURATION)
+    engines = [make_engine(BOARD_KINDS[index % len(BOARD_KINDS)], seed=index) for index in range(board_count)]
+    compositor.render(engines)
+    return compositor, engines
+
+
+@parametrize('board_count', WALL_BOARD_COUNTS)
+def bench_render_wall_idle(benchmark: Benchmark, board_count: int):
+    compositor, engines = _make_wall(board_count)
+    benchmark(compositor.render, engines)
+
+
+@parametrize('board_count', WALL_BOARD_COUNTS)
+def bench_render_wall_moving(benchmark: Benchmark, board_count: int):
+    # every board changes every frame, the worst case for the wall
+    compositor, engines = _make_wall(board_count)
+    moves = [UserInputState.D_LEFT, UserInputState.D_RIGHT]
+
+    def step_and_render(frame: list[int]):
+        frame[0] += 1
+        for engine in engines:
+            engine.update(moves[frame[0] % 2])
+        compositor.render(engines)
+    benchmark(step_and_render, [0])
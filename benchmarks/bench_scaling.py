@@ -0,0 +1,65 @@
+from benchmarks.fixtures import make_board, make_filled_board, make_piece
+from benchmarks.harness import Benchmark, parametrize
+from bit_board_state import BitBoardState
+from board_state import BoardState
+from enums.user_input_state import UserInputState
+from game_configuration import GameConfiguration
+from tetris_engine import TetrisEngine
+
+BOARD_TYPES = [BoardState, BitBoardState]
+# (width, height), from the standard board up to the event variant
+BOARD_SIZES = [(10, 22), (20, 50), (40, 100), (40, 200)]
+ENGINE_ROUNDS = 300
+
+
+def _make_engine(board_type: type, board_size: tuple[int, int]) -> TetrisEngine:
+    width, height = board_size
+    engine = TetrisEngine(board_type, 0, GameConfiguration(width, height))
+    engine.step(UserInputState.D_HARD_DROP)
+    engine.board_state = make_board('half_full', board_type, width=width, height=height)
+    engine.landing_row = None
+    return engine
+
+
+@parametrize('board_size', BOARD_SIZES)
+@parametrize('board_type', BOARD_TYPES)
+def bench_scaling_check_piece_valid(benchmark: Benchmark, board_type: type, board_size: tuple[int, int]):
+    width, height = board_size
+    board_state = make_board('half_full', board_type, width=width, height=height)
+    benchmark(board_state.check_piece_valid, make_piece(board_state, 'landing'))
+
+
+@parametrize('board_size', BOARD_SIZES)
+@parametrize('board_type', BOARD_TYPES)
+def bench_scaling_drop_distance(benchmark: Benchmark, board_type: type, board_size: tuple[int, int]):
+    width, height = board_size
+    board_state = make_board('half_full', board_type, width=width, height=height)
+    piece_state = make_piece(board_state, 'spawn')
+
+    def drop_distance():
+        board_state.skyline = None
+        return board_state.get_drop_distance(piece_state)
+    benchmark(drop_distance)
+
+
+@parametrize('board_size', BOARD_SIZES)
+@parametrize('board_type', BOARD_TYPES)
+def bench_scaling_clear_lines(benchmark: Benchmark, board_type: type, board_size: tuple[int, int]):
+    width, height = board_size
+    benchmark.pedantic(lambda board_state: board_state.clear_lines(),
+                       setup=lambda: (make_filled_board('half_full', board_type, width=width, height=height),),
+                       rounds=ENGINE_ROUNDS)
+
+
+@parametrize('board_size', BOARD_SIZES)
+@parametrize('board_type', BOARD_TYPES)
+def bench_scaling_frame_step(benchmark: Benchmark, board_type: type, board_size: tuple[int, int]):
+    benchmark.pedantic(lambda engine: engine.step(UserInputState.D_LEFT),
+                       setup=lambda: (_make_engine(board_type, board_size),), rounds=ENGINE_ROUNDS)
+
+
+@parametrize('board_size', BOARD_SIZES)
+@parametrize('board_type', BOARD_TYPES)
+def bench_scaling_hard_drop(benchmark: Benchmark, board_type: type, board_size: tuple[int, int]):
+    benchmark.pedantic(lambda engine: engine.step(UserInputState.D_HARD_DROP),
+                       setup=lambda: (_make_engine(board_type, board_size),), rounds=ENGINE_ROUNDS)
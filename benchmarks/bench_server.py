@@ -0,0 +1,35 @@
+import random
+
+from benchmarks.harness import Benchmark, parametrize
+from enums.user_input_state import UserInputState
+from selfplay_runner import RANDOM_PLAYER_INPUTS
+from versus_match import PLAYER_COUNT, VersusMatch
+
+# logic frames between two inputs of a player, None for players that never press anything
+INPUT_INTERVALS = [None, 6, 1]
+
+
+@parametrize('input_interval', INPUT_INTERVALS)
+def bench_match_tick(benchmark: Benchmark, input_interval: int | None):
+    rng = random.Random(0)
+    inputs = [rng.choice(RANDOM_PLAYER_INPUTS) for _ in range(4096)]
+    state = {'match': VersusMatch(0, 0), 'frame': 0}
+
+    def tick():
+        match = state['match']
+        if match.is_over():
+            match = state['match'] = VersusMatch(0, state['frame'])
+        state['frame'] += 1
+        if input_interval is not None and state['frame'] % input_interval == 0:
+            for player_index in range(PLAYER_COUNT):
+                match.push_input(player_index, state['frame'], inputs[(state['frame'] + player_index) % len(inputs)])
+        return match.tick()
+    benchmark(tick)
+
+
+def bench_match_garbage(benchmark: Benchmark):
+    def receive_garbage(match: VersusMatch):
+        match.pending_garbage[0].append([4, 3])
+        match.push_input(0, 1, UserInputState.D_HARD_DROP)
+        return match.tick()
+    benchmark.pedantic(receive_garbage, setup=lambda: (VersusMatch(0, 0),), rounds=300)
@@ -0,0 +1,69 @@
+import random
+
+from board_state import BoardState
+from constants import WIDTH, HEIGHT, PIECES_TYPES, ROTATION_ORDER
+from enums.cell_state import CellState
+from enums.user_input_state import UserInputState
+from piece_state import PieceState
+from tetris_engine import TetrisEngine
+
+BOARD_KINDS = ['empty', 'half_full', 'nearly_topped_out', 'tetris_ready']
+FIXTURE_SEED = 20240601
+
+
+def _fill_rows(board_state: BoardState, rng: random.Random, first_row: int, last_row: int, density: float):
+    for row in range(first_row, last_row):
+        hole = rng.randrange(board_state.width)
+        for col in range(board_state.width):
+            if col != hole and rng.random() < density:
+                board_state.set_matrix_cell(row, col, rng.choice(PIECES_TYPES))
+
+
+def make_board(kind: str, board_type: type = BoardState, seed: int = FIXTURE_SEED,
+               width: int = WIDTH, height: int = HEIGHT) -> BoardState:
+    rng = random.Random(seed)
+    board_state = board_type(width, height)
+    match kind:
+        case 'half_full':
+            _fill_rows(board_state, rng, height // 2, height, 0.8)
+        case 'nearly_topped_out':
+            _fill_rows(board_state, rng, 3, height, 0.85)
+        case 'tetris_ready':
+            # four rows complete except for a well in the last column, under a ragged stack
+            _fill_rows(board_state, rng, height - 7, height - 4, 0.5)
+            for row in range(height - 4, height):
+                for col in range(width - 1):
+                    board_state.set_matrix_cell(row, col, rng.choice(PIECES_TYPES))
+        case 'empty':
+            pass
+        case _:
+            raise ValueError(f'unknown board kind {kind}')
+    return board_state
+
+
+def make_filled_board(kind: str, board_type: type = BoardState, seed: int = FIXTURE_SEED,
+                      width: int = WIDTH, height: int = HEIGHT) -> BoardState:
+    # make_board with every other row completed, so clear_lines has work to do
+    board_state = make_board(kind, board_type, seed, width, height)
+    rng = random.Random(seed)
+    for row in range(board_state.height - 1, board_state.height // 2, -2):
+        for col in range(board_state.width):
+            if board_state.get_matrix_cell(row, col) == CellState.EMPTY:
+                board_state.set_matrix_cell(row, col, rng.choice(PIECES_TYPES))
+    board_state.find_filled_rows()
+    return board_state
+
+
+def make_piece(board_state: BoardState, position: str, piece_index: int = 0) -> PieceState:
+    piece_state = PieceState(PIECES_TYPES[piece_index], 0, board_state.width // 2, ROTATION_ORDER[0])
+    if position == 'landing':
+        piece_state.offset_row += board_state.get_drop_distance(piece_state)
+    return piece_state
+
+
+def make_engine(kind: str, board_type: type = BoardState, seed: int = FIXTURE_SEED) -> TetrisEngine:
+    engine = TetrisEngine(board_type, seed)
+    engine.step(UserInputState.D_HARD_DROP)
+    engine.board_state = make_board(kind, board_type, seed)
+    engine.landing_row = None
+    return engine
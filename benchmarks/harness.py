@@ -0,0 +1,155 @@
+import inspect
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from enum import Enum
+from types import ModuleType
+from typing import Any, Callable
+
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_MIN_ROUNDS = 5
+ROUND_TIME = 0.002
+
+
+def parametrize(name: str, values: list) -> Callable:
+    def decorator(function: Callable) -> Callable:
+        function.parameters = getattr(function, 'parameters', []) + [(name, values)]
+        return function
+    return decorator
+
+
+class Benchmark:
+    name: str
+    min_time: float
+    min_rounds: int
+    # seconds per call for every measured round
+    timings: list[float]
+    iterations: int
+    extra_info: dict[str, Any]
+
+    def __init__(self, name: str, min_time: float = DEFAULT_MIN_TIME, min_rounds: int = DEFAULT_MIN_ROUNDS):
+        self.name = name
+        self.min_time = min_time
+        self.min_rounds = min_rounds
+        self.timings = []
+        self.iterations = 1
+        self.extra_info = {}
+
+    def __call__(self, function: Callable, *args, **kwargs) -> Any:
+        iterations = 1
+        while self._time_round(function, args, kwargs, iterations) < ROUND_TIME:
+            iterations *= 2
+        self.iterations = iterations
+        deadline = time.perf_counter() + self.min_time
+        while len(self.timings) < self.min_rounds or time.perf_counter() < deadline:
+            self.timings.append(self._time_round(function, args, kwargs, iterations) / iterations)
+        return function(*args, **kwargs)
+
+    def pedantic(self, function: Callable, setup: Callable[[], tuple] | None = None, rounds: int = 100) -> Any:
+        # one call per round, setup() returns the call arguments and is not timed
+        result = None
+        for _ in range(rounds):
+            args = setup() if setup is not None else ()
+            start_time = time.perf_counter_ns()
+            result = function(*args)
+            self.timings.append((time.perf_counter_ns() - start_time) / 1e9)
+        return result
+
+    def get_stats(self) -> dict[str, float]:
+        mean = statistics.fmean(self.timings)
+        return {
+            'min': min(self.timings),
+            'max': max(self.timings),
+            'mean': mean,
+            'stddev': statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0,
+            'median': statistics.median(self.timings),
+            'ops': 1 / mean if mean else 0.0,
+            'rounds': len(self.timings),
+            'iterations': self.iterations,
+        }
+
+    def _time_round(self, function: Callable, args: tuple, kwargs: dict, iterations: int) -> float:
+        start_time = time.perf_counter_ns()
+        for _ in range(iterations):
+            function(*args, **kwargs)
+        return (time.perf_counter_ns() - start_time) / 1e9
+
+
+def _get_label(value: Any) -> str:
+    if isinstance(value, type):
+        return value.__name__
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, tuple):
+        return 'x'.join(_get_label(item) for item in value)
+    return str(value)
+
+
+def collect_benchmarks(modules: list[ModuleType]) -> list[tuple[str, Callable, dict[str, Any]]]:
+    benchmarks = []
+    for module in modules:
+        for function_name, function in inspect.getmembers(module, inspect.isfunction):
+            if not function_name.startswith('bench_') or function.__module__ != module.__name__:
+                continue
+            parameters = getattr(function, 'parameters', [])
+            names = [name for name, _ in parameters]
+            for values in itertools.product(*(values for _, values in parameters)):
+                label = '-'.join(_get_label(value) for value in values)
+                benchmarks.append((f'{function_name}[{label}]' if label else function_name,
+                                   function, dict(zip(names, values))))
+    return benchmarks
+
+
+def run_benchmarks(modules: list[ModuleType], name_filter: str = '',
+                   min_time: float = DEFAULT_MIN_TIME) -> list[dict[str, Any]]:
+    results = []
+    for name, function, kwargs in collect_benchmarks(modules):
+        if name_filter not in name:
+            continue
+        benchmark = Benchmark(name, min_time)
+        function(benchmark, **kwargs)
+        stats = benchmark.get_stats()
+        results.append({'name': name, 'group': function.__module__, 'params': {key: str(value)
+                                                                             for key, value in kwargs.items()},
+                        'extra_info': benchmark.extra_info, 'stats': stats})
+        print(f'{name:<72} {stats["ops"]:>14,.0f} ops/s {stats["mean"] * 1e6:>12.2f} us/call '
+              f'(median {stats["median"] * 1e6:.2f} us, {stats["rounds"]} rounds)')
+    return results
+
+
+def get_commit_info() -> dict[str, Any]:
+    try:
+        commit_id = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                   check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'id': None, 'dirty': None}
+    return {'id': commit_id, 'dirty': dirty}
+
+
+def save_results(path: str, results: list[dict[str, Any]]):
+    report = {
+        'machine_info': {'python_version': platform.python_version(), 'platform': platform.platform(),
+                         'processor': platform.processor()},
+        'commit_info': get_commit_info(),
+        'datetime': datetime.now(timezone.utc).isoformat(),
+        'benchmarks': results,
+    }
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+
+def compare_results(path: str, results: list[dict[str, Any]]):
+    with open(path) as file:
+        baseline = {benchmark['name']: benchmark['stats'] for benchmark in json.load(file)['benchmarks']}
+    for result in results:
+        baseline_stats = baseline.get(result['name'])
+        if baseline_stats is None:
+            continue
+        ratio = result['stats']['mean'] / baseline_stats['mean']
+        print(f'{result["name"]:<72} {ratio:>8.2f}x mean time vs baseline')
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from selfplay_runner import RANDOM_PLAYER_INPUTS
+from tetris_client import TetrisClient
+from tetris_server import TetrisServer
+
+DEFAULT_MATCHES = 100
+DEFAULT_SECONDS = 10.0
+# inputs per second of every loopback player, about a fast human
+DEFAULT_INPUT_RATE = 10.0
+
+
+def _run_server(port: int, seconds: float, results: multiprocessing.Queue, ready: multiprocessing.Event):
+    async def serve():
+        server = TetrisServer(0)
+        started = asyncio.get_running_loop().create_future()
+        serve_task = asyncio.create_task(server.serve('127.0.0.1', port, started))
+        await started
+        ready.set()
+        # waits for the clients to join, then measures the steady state
+        await asyncio.sleep(seconds * 0.2)
+        tick_count, match_tick_count, tick_ns, sent_bytes = (server.tick_count, server.match_tick_count,
+                                                             server.tick_ns, server.sent_bytes)
+        skipped_ticks = server.timestep.skipped_ticks
+        start_time = time.perf_counter()
+        await asyncio.sleep(seconds * 0.8)
+        elapsed = time.perf_counter() - start_time
+        tick_count = server.tick_count - tick_count
+        results.put({
+            'ticks_per_second': tick_count / elapsed,
+            'skipped_ticks': server.timestep.skipped_ticks - skipped_ticks,
+            'matches': len(server.matches),
+            'tick_ms': (server.tick_ns - tick_ns) / max(tick_count, 1) / 1e6,
+            'match_tick_us': (server.tick_ns - tick_ns) / max(server.match_tick_count - match_tick_count, 1) / 1e3,
+            'sent_bytes_per_second': (server.sent_bytes - sent_bytes) / elapsed,
+        })
+        server.stop()
+        await serve_task
+    asyncio.run(serve())
+
+
+async def _play(port: int, seed: int, deadline: float, input_rate: float) -> dict:
+    # plays random inputs, joining a new match whenever one ends, until the deadline
+    rng = random.Random(seed)
+    latencies_ns = []
+    received_bytes = 0
+    received_messages = 0
+    while time.perf_counter() < deadline:
+        client = TetrisClient()
+        await client.connect('127.0.0.1', port)
+
+        async def send_inputs():
+            while True:
+                await asyncio.sleep(rng.expovariate(input_rate))
+                if client.match_id is not None:
+                    client.send_input(rng.choice(RANDOM_PLAYER_INPUTS))
+
+        input_task = asyncio.create_task(send_inputs())
+        while time.perf_counter() < deadline:
+            try:
+                message_type = await asyncio.wait_for(client.receive(), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+            if message_type is None:
+                break
+            received_messages += 1
+        input_task.cancel()
+        client.close()
+        latencies_ns += client.input_latencies_ns
+        received_bytes += client.received_bytes
+    return {'latencies_ns': latencies_ns, 'received_bytes': received_bytes, 'received_messages': received_messages}
+
+
+def _run_clients(port: int, first_seed: int, client_count: int, seconds: float, input_rate: float) -> dict:
+    async def play_all():
+        deadline = time.perf_counter() + seconds
+        return await asyncio.gather(*(_play(port, first_seed + index, deadline, input_rate)
+                                      for index in range(client_count)))
+    client_results = asyncio.run(play_all())
+    return {'latencies_ns': [latency for result in client_results for latency in result['latencies_ns']],
+            'received_bytes': sum(result['received_bytes'] for result in client_results),
+            'received_messages': sum(result['received_messages'] for result in client_results)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load the versus server with loopback clients playing random inputs.')
+    parser.add_argument('--matches', type=int, default=DEFAULT_MATCHES, help='concurrent matches')
+    parser.add_argument('--seconds', type=float, default=DEFAULT_SECONDS)
+    parser.add_argument('--input-rate', type=float, default=DEFAULT_INPUT_RATE, help='inputs per second per player')
+    parser.add_argument('--port', type=int, default=7788)
+    parser.add_argument('--client-processes', type=int, default=1, help='processes the clients are spread over')
+    arguments = parser.parse_args()
+
+    server_results = multiprocessing.Queue()
+    server_ready = multiprocessing.Event()
+    server_process = multiprocessing.Process(target=_run_server, args=(arguments.port, arguments.seconds,
+                                                                       server_results, server_ready))
+    server_process.start()
+    server_ready.wait()
+    player_count = arguments.matches * 2
+    with ProcessPoolExecutor(arguments.client_processes) as executor:
+        shard_size = -(-player_count // arguments.client_processes)
+        futures = [executor.submit(_run_clients, arguments.port, first_player,
+                                   min(shard_size, player_count - first_player), arguments.seconds,
+                                   arguments.input_rate)
+                   for first_player in range(0, player_count, shard_size)]
+        shard_results = [future.result() for future in futures]
+    server_stats = server_results.get()
+    server_process.join()
+
+    latencies_ms = sorted(latency / 1e6 for result in shard_results for latency in result['latencies_ns'])
+    print(f'server: {server_stats["matches"]} matches, {server_stats["ticks_per_second"]:.1f} ticks/s, '
+          f'{server_stats["skipped_ticks"]} skipped ticks, {server_stats["tick_ms"]:.3f} ms/tick, '
+          f'{server_stats["match_tick_us"]:.1f} us/match tick, '
+          f'{server_stats["sent_bytes_per_second"] / 1024:.1f} KiB/s')
+    print(f'clients: {sum(result["received_messages"] for result in shard_results) / arguments.seconds:,.0f} '
+          f'messages/s, {sum(result["received_bytes"] for result in shard_results) / arguments.seconds / 1024:.1f} '
+          f'KiB/s received')
+    if latencies_ms:
+        quantiles = statistics.quantiles(latencies_ms, n=100)
+        print(f'input latency: {len(latencies_ms)} inputs, p50 {quantiles[49]:.2f} ms, p95 {quantiles[94]:.2f} ms, '
+              f'p99 {quantiles[98]:.2f} ms')
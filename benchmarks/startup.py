@@ -0,0 +1,79 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_RUNS = 5
+IMPORT_MODULE = 'tetris_game_state'
+TOP_IMPORTS = 10
+FIRST_FRAME_MARKER = 'first frame'
+
+
+def _run_first_frame():
+    # child process: import the game, open the window and show one rendered frame
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame as pg
+    from tetris_game_state import TetrisGameState
+    game_state = TetrisGameState(incremental_render=True)
+    pg.display.update(game_state.render())
+    print(FIRST_FRAME_MARKER, flush=True)
+
+
+def measure_first_frame(font_index_path: str) -> float:
+    # seconds from spawning the interpreter to the first frame on screen
+    environment = dict(os.environ, TETRIS_FONT_INDEX=font_index_path)
+    environment.setdefault('SDL_VIDEODRIVER', 'dummy')
+    start_time = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.startup', '--child'], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, env=environment)
+    for line in process.stdout:
+        if line.strip() == FIRST_FRAME_MARKER:
+            elapsed = time.perf_counter() - start_time
+            break
+    else:
+        raise RuntimeError('the game exited before rendering a frame')
+    process.wait()
+    return elapsed
+
+
+def measure_imports(module: str) -> list[tuple[str, int, int]]:
+    # (module, self us, cumulative us) of every import done by `import module`, from python -X importtime
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True,
+                            text=True, check=True).stderr
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure import time and time to the first rendered frame.')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.child:
+        _run_first_frame()
+        sys.exit()
+
+    imports = measure_imports(IMPORT_MODULE)
+    total_us = next(cumulative_us for name, _, cumulative_us in imports if name == IMPORT_MODULE)
+    print(f'import {IMPORT_MODULE}: {total_us / 1000:.1f} ms, slowest imports by cumulative time:')
+    for name, self_us, cumulative_us in sorted(imports, key=lambda item: -item[2])[1:TOP_IMPORTS + 1]:
+        print(f'  {name:<48} {cumulative_us / 1000:>8.1f} ms (self {self_us / 1000:.1f} ms)')
+
+    with tempfile.TemporaryDirectory() as directory:
+        # a fresh index path per run makes every font lookup scan the system fonts
+        cold_times = [measure_first_frame(os.path.join(directory, f'cold_{run}.json')) for run in range(arguments.runs)]
+        warm_index_path = os.path.join(directory, 'warm.json')
+        measure_first_frame(warm_index_path)
+        warm_times = [measure_first_frame(warm_index_path) for _ in range(arguments.runs)]
+    print(f'first frame, cold font index: median {statistics.median(cold_times) * 1000:.1f} ms, '
+          f'min {min(cold_times) * 1000:.1f} ms')
+    print(f'first frame, warm font index: median {statistics.median(warm_times) * 1000:.1f} ms, '
+          f'min {min(warm_times) * 1000:.1f} ms')
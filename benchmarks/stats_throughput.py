@@ -0,0 +1,84 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bit_board_state import BitBoardState
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from selfplay_runner import RANDOM_PLAYER_INPUTS
+from stats_store import LEADERBOARD_QUERY, StatsStore, GameStatsTracker
+from tetris_engine import TetrisEngine
+
+DEFAULT_ROWS = 200000
+DEFAULT_GAMES = 5000
+# high start levels end random-input games within a few hundred frames
+DEFAULT_START_LEVEL = 29
+START_LEVELS = 30
+LEADERBOARD_QUERIES = 1000
+
+
+def bench_store_rows(path: str, row_count: int) -> tuple[float, float]:
+    # (seconds to record, seconds until every row is committed) for row_count game rows
+    rng = random.Random(0)
+    with StatsStore(path) as store:
+        start_time = time.perf_counter()
+        for game_number in range(row_count):
+            store.record_game(0, game_number, game_number, rng.randrange(START_LEVELS), rng.randrange(40),
+                              rng.randrange(1000000), rng.randrange(300), rng.randrange(800), rng.randrange(60),
+                              rng.randrange(150), rng.randrange(5000), rng.randrange(50000), time.time())
+        record_time = time.perf_counter() - start_time
+        store.close()
+        return record_time, time.perf_counter() - start_time
+
+
+def bench_scripted_games(path: str, game_count: int, start_level: int) -> tuple[float, int]:
+    # (seconds, logic frames) to play game_count random-input games back to back with a tracker on one engine
+    input_rng = random.Random(0)
+    engine = TetrisEngine(BitBoardState, 0)
+    engine.start_level = start_level
+    frames = 0
+    with StatsStore(path) as store:
+        tracker = GameStatsTracker(store, 1, engine)
+        start_time = time.perf_counter()
+        while tracker.game_number < game_count or engine.game_phase != GamePhase.GAME_OVER:
+            # a hard drop on the game over screen starts the next game
+            user_input_state = UserInputState.D_HARD_DROP if engine.game_phase == GamePhase.GAME_OVER else \
+                input_rng.choice(RANDOM_PLAYER_INPUTS)
+            engine.step(user_input_state)
+            tracker.record_input(user_input_state)
+            tracker.update()
+            frames += 1
+        store.close()
+        return time.perf_counter() - start_time, frames
+
+
+def bench_leaderboard(path: str) -> tuple[float, str]:
+    # (seconds per query, query plan) of the leaderboard of every start level
+    with StatsStore(path) as store:
+        plan = ' '.join(row[-1] for row in store.read_connection.execute(f'EXPLAIN QUERY PLAN {LEADERBOARD_QUERY}',
+                                                                        (0, 10)))
+        start_time = time.perf_counter()
+        for query in range(LEADERBOARD_QUERIES):
+            store.get_leaderboard(query % START_LEVELS)
+        return (time.perf_counter() - start_time) / LEADERBOARD_QUERIES, plan
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the write and query throughput of the stats store.')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='game rows recorded directly')
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help='scripted games played with a tracker')
+    parser.add_argument('--start-level', type=int, default=DEFAULT_START_LEVEL)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows_path = os.path.join(directory, 'rows.db')
+        record_time, commit_time = bench_store_rows(rows_path, arguments.rows)
+        print(f'record_game: {record_time / arguments.rows * 1e6:.2f} us/row on the caller, '
+              f'{arguments.rows / commit_time:,.0f} rows/s committed')
+        query_time, query_plan = bench_leaderboard(rows_path)
+        print(f'leaderboard of {arguments.rows} games: {query_time * 1e6:.1f} us/query ({query_plan})')
+        game_time, frames = bench_scripted_games(os.path.join(directory, 'games.db'), arguments.games,
+                                                 arguments.start_level)
+        print(f'scripted games: {arguments.games / game_time:,.0f} games/s, {frames / game_time:,.0f} frames/s')
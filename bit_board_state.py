@@ -0,0 +1,201 @@
+from typing import Hashable
+
+from constants import PIECES
+from enums.cell_state import CellState
+from piece import Piece
+from piece_shape import PieceShape
+from piece_state import PieceState
+
+CELL_BITS = 4
+CELL_MASK = (1 << CELL_BITS) - 1
+CELL_STATES = tuple(CellState)
+
+
+def get_snapshot_row_sizes(width: int) -> tuple[int, int]:
+    # snapshot: occupancy mask of every row, then the packed CellState values of every row, little endian
+    return (width + 7) // 8, (width * CELL_BITS + 7) // 8
+
+
+class BitBoardState:
+    __slots__ = ('width', 'height', 'pieces', 'rows', 'colors', 'full_row_mask', 'pending_lines', 'skyline',
+                 'owns_rows')
+    width: int
+    height: int
+    # piece type -> Piece, to look up the shapes of piece states
+    pieces: dict[Hashable, Piece]
+    # occupancy bitmask per row, bit N is set when column N is not empty
+    rows: list[int]
+    # CellState value per cell packed CELL_BITS bits per column, used for rendering only
+    colors: list[int]
+    full_row_mask: int
+    pending_lines: list[bool]
+    # top occupied row of every column, height for empty columns, None until requested after a change
+    skyline: list[int] | None
+    # False while rows and colors are shared with a fork, the first write copies them
+    owns_rows: bool
+
+    def __init__(self, width: int, height: int, pieces: dict[Hashable, Piece] = PIECES):
+        self.width = width
+        self.height = height
+        self.pieces = pieces
+        self.rows = [0] * height
+        self.colors = [0] * height
+        self.full_row_mask = (1 << width) - 1
+        self.pending_lines = [False] * height
+        self.skyline = None
+        self.owns_rows = True
+
+    def fork(self) -> 'BitBoardState':
+        board_state = BitBoardState.__new__(BitBoardState)
+        board_state.width = self.width
+        board_state.height = self.height
+        board_state.pieces = self.pieces
+        board_state.rows = self.rows
+        board_state.colors = self.colors
+        board_state.full_row_mask = self.full_row_mask
+        board_state.pending_lines = list(self.pending_lines)
+        board_state.skyline = list(self.skyline) if self.skyline is not None else None
+        board_state.owns_rows = self.owns_rows = False
+        return board_state
+
+    def snapshot(self) -> bytes:
+        mask_size, colors_size = get_snapshot_row_sizes(self.width)
+        return b''.join([row_mask.to_bytes(mask_size, 'little') for row_mask in self.rows] +
+                        [row_colors.to_bytes(colors_size, 'little') for row_colors in self.colors])
+
+    def restore(self, data: bytes):
+        mask_size, colors_size = get_snapshot_row_sizes(self.width)
+        colors_start = mask_size * self.height
+        self.rows = [int.from_bytes(data[start:start + mask_size], 'little')
+                     for start in range(0, colors_start, mask_size)]
+        self.colors = [int.from_bytes(data[start:start + colors_size], 'little')
+                       for start in range(colors_start, colors_start + colors_size * self.height, colors_size)]
+        self.owns_rows = True
+        self.skyline = None
+        self.find_filled_rows()
+
+    @property
+    def board(self) -> list[CellState]:
+        return [self.get_matrix_cell(row, col) for row in range(self.height) for col in range(self.width)]
+
+    def get_matrix_cell(self, row: int, col: int) -> CellState:
+        return CELL_STATES[(self.colors[row] >> (col * CELL_BITS)) & CELL_MASK]
+
+    def set_matrix_cell(self, row: int, col: int, new_state: CellState):
+        if not self.owns_rows:
+            self.rows = list(self.rows)
+            self.colors = list(self.colors)
+            self.owns_rows = True
+        shift = col * CELL_BITS
+        self.colors[row] = (self.colors[row] & ~(CELL_MASK << shift)) | (new_state.value << shift)
+        if new_state == CellState.EMPTY:
+            self.rows[row] &= ~(1 << col)
+        else:
+            self.rows[row] |= 1 << col
+        # kept up to date like in BoardState.set_matrix_cell
+        if new_state == CellState.EMPTY:
+            self.skyline = None
+        elif self.skyline is not None and row < self.skyline[col]:
+            self.skyline[col] = row
+
+    def check_row_filled(self, row: int) -> bool:
+        return self.rows[row] == self.full_row_mask
+
+    def check_row_empty(self, row: int) -> bool:
+        return self.rows[row] == 0
+
+    def find_filled_rows(self, first_row: int = 0, last_row: int | None = None):
+        # only rows first_row..last_row - 1 can have changed, e.g. the rows a locked piece covers
+        for row in range(max(first_row, 0), self.height if last_row is None else min(last_row, self.height)):
+            self.pending_lines[row] = self.rows[row] == self.full_row_mask
+
+    def clear_lines(self) -> int:
+        rows = self.rows
+        colors = self.colors
+        full_row_mask = self.full_row_mask
+        kept_rows = []
+        kept_colors = []
+        for row in range(self.height):
+            if rows[row] == full_row_mask:
+                self.pending_lines[row] = False
+            else:
+                kept_rows.append(rows[row])
+                kept_colors.append(colors[row])
+        cleared_count = self.height - len(kept_rows)
+        if cleared_count:
+            self.rows = [0] * cleared_count + kept_rows
+            self.colors = [0] * cleared_count + kept_colors
+            self.owns_rows = True
+            self.skyline = None
+        return cleared_count
+
+    def insert_garbage_rows(self, count: int, hole_col: int) -> bool:
+        # pushes the stack up by count rows filled but for hole_col, returns whether occupied rows were pushed out
+        count = min(count, self.height)
+        overflowed = any(self.rows[:count])
+        hole_shift = hole_col * CELL_BITS
+        garbage_colors = sum(CellState.GARBAGE.value << (col * CELL_BITS) for col in range(self.width))
+        self.rows = self.rows[count:] + [self.full_row_mask & ~(1 << hole_col)] * count
+        self.colors = self.colors[count:] + [garbage_colors & ~(CELL_MASK << hole_shift)] * count
+        self.owns_rows = True
+        del self.pending_lines[:count]
+        self.pending_lines += [False] * count
+        self.skyline = None
+        return overflowed
+
+    def check_piece_valid(self, piece_state: PieceState) -> bool:
+        return self.check_shape_valid(self.pieces[piece_state.piece_type].get_shape(piece_state.rotation),
+                                      piece_state.offset_row, piece_state.offset_col)
+
+    def check_shape_valid(self, shape: PieceShape, offset_row: int, offset_col: int) -> bool:
+        board_row = offset_row + shape.min_row
+        board_col = offset_col + shape.min_col
+        if (board_row < 0) or (offset_row + shape.max_row >= self.height) or \
+                (board_col < 0) or (offset_col + shape.max_col >= self.width):
+            return False
+        rows = self.rows
+        for mask in shape.row_masks:
+            if rows[board_row] & (mask << board_col):
+                return False
+            board_row += 1
+        return True
+
+    def get_row_masks(self) -> list[int]:
+        return self.rows
+
+    def get_row_colors(self) -> list[int]:
+        return self.colors
+
+    def get_skyline(self) -> list[int]:
+        if self.skyline is None:
+            skyline = [self.height] * self.width
+            seen_columns = 0
+            for row, row_mask in enumerate(self.rows):
+                new_columns = row_mask & ~seen_columns
+                while new_columns:
+                    lowest_column = new_columns & -new_columns
+                    skyline[lowest_column.bit_length() - 1] = row
+                    new_columns ^= lowest_column
+                seen_columns |= row_mask
+                if seen_columns == self.full_row_mask:
+                    break
+            self.skyline = skyline
+        return self.skyline
+
+    def get_drop_distance(self, piece_state: PieceState) -> int:
+        shape = self.pieces[piece_state.piece_type].get_shape(piece_state.rotation)
+        skyline = self.get_skyline()
+        distance = self.height
+        for row, col in shape.cells:
+            board_row = piece_state.offset_row + row
+            board_col = piece_state.offset_col + col
+            if board_row < skyline[board_col]:
+                distance = min(distance, skyline[board_col] - board_row - 1)
+                continue
+            # the cell is under an overhang, walk down the column
+            column_bit = 1 << board_col
+            free_rows = 0
+            while board_row + free_rows < self.height and not self.rows[board_row + free_rows] & column_bit:
+                free_rows += 1
+            distance = min(distance, max(free_rows - 1, 0))
+        return distance
@@ -0,0 +1,115 @@
+import math
+import time
+from collections import OrderedDict
+
+import pygame as pg
+
+from constants import GRID_SIZE, HUD_HEIGHT
+from enums.frame_phase import FramePhase
+from enums.game_phase import GamePhase
+from font_cache import load_font
+from frame_profiler import FrameProfiler
+from game_configuration import GameConfiguration
+from incremental_renderer import IncrementalRenderer, TEXT_CACHE_SIZE, bake_cell_sprites
+from tetris_engine import TetrisEngine
+
+FONT_SIZE = 36
+# gap between two boards, in pixels
+TILE_MARGIN = 4
+
+
+def get_tile_layout(board_count: int, window_size: tuple[int, int], configuration: GameConfiguration,
+                    margin: int = TILE_MARGIN) -> tuple[int, int]:
+    # (columns, grid_size) giving the largest cells that fit every board in the window
+    window_width, window_height = window_size
+    # the HUD keeps its proportion to the cells
+    tile_height_cells = configuration.height + HUD_HEIGHT / GRID_SIZE
+    best_layout = (board_count, 0)
+    for columns in range(1, board_count + 1):
+        rows = math.ceil(board_count / columns)
+        grid_size = int(min((window_width - margin * (columns - 1)) / columns / configuration.width,
+                            (window_height - margin * (rows - 1)) / rows / tile_height_cells))
+        if grid_size > best_layout[1]:
+            best_layout = (columns, grid_size)
+    if best_layout[1] < 1:
+        raise ValueError(f'{board_count} boards do not fit in a {window_width}x{window_height} window')
+    return best_layout
+
+
+class BoardCompositor:
+    surface: pg.Surface
+    configuration: GameConfiguration
+    grid_size: int
+    hud_height: int
+    # window area of every board, in board order
+    tile_rects: list[pg.Rect]
+    # one renderer per board drawing into a subsurface of the window, all sharing the sprites and text cache
+    renderers: list[IncrementalRenderer]
+    # render key of every board when it was last drawn, None when it has to be redrawn
+    displayed_keys: list[tuple | None]
+    # set by invalidate, the next frame updates the whole window including the margins
+    full_update: bool
+
+    def __init__(self, surface: pg.Surface, board_count: int, configuration: GameConfiguration,
+                 margin: int = TILE_MARGIN):
+        self.surface = surface
+        self.configuration = configuration
+        columns, self.grid_size = get_tile_layout(board_count, surface.get_size(), configuration, margin)
+        self.hud_height = HUD_HEIGHT * self.grid_size // GRID_SIZE
+        tile_width = configuration.width * self.grid_size
+        tile_height = self.hud_height + configuration.height * self.grid_size
+        self.tile_rects = [pg.Rect((index % columns) * (tile_width + margin),
+                                   (index // columns) * (tile_height + margin), tile_width, tile_height)
+                           for index in range(board_count)]
+        font = load_font('Calibri', max(FONT_SIZE * self.grid_size // GRID_SIZE, 1))
+        cell_sprites = bake_cell_sprites(self.grid_size)
+        # one bounded text cache for the whole wall, with room for the texts of every board
+        text_surfaces = OrderedDict()
+        self.renderers = [IncrementalRenderer(surface.subsurface(tile_rect), font, configuration.height,
+                                              configuration.width, self.hud_height, self.grid_size,
+                                              cell_sprites, text_surfaces, TEXT_CACHE_SIZE * board_count)
+                          for tile_rect in self.tile_rects]
+        self.invalidate()
+
+    # region Public methods
+    def invalidate(self):
+        self.surface.fill((0, 0, 0))
+        for renderer in self.renderers:
+            renderer.invalidate()
+        self.displayed_keys = [None] * len(self.renderers)
+        self.full_update = True
+
+    def invalidate_board(self, index: int):
+        # needed after changes the render key cannot see, e.g. restoring a snapshot
+        self.renderers[index].invalidate()
+        self.displayed_keys[index] = None
+
+    def render(self, engines: list[TetrisEngine], profiler: FrameProfiler | None = None) -> list[pg.Rect]:
+        start_ns = time.perf_counter_ns() if profiler is not None else 0
+        dirty_rects = []
+        for index, engine in enumerate(engines):
+            render_key = self._get_render_key(engine)
+            if render_key == self.displayed_keys[index]:
+                continue
+            self.displayed_keys[index] = render_key
+            tile_x, tile_y = self.tile_rects[index].topleft
+            dirty_rects += [rect.move(tile_x, tile_y) for rect in self.renderers[index].render(engine)]
+        # the phases of single boards would overwrite each other, the whole wall counts as board rendering
+        if profiler is not None:
+            profiler.record(FramePhase.RENDER_BOARD, start_ns)
+        if self.full_update:
+            self.full_update = False
+            return [self.surface.get_rect()]
+        return dirty_rects
+    # endregion Public methods
+
+    # region Protected methods
+    def _get_render_key(self, engine: TetrisEngine) -> tuple:
+        # everything the board tile shows, the board itself only changes when a piece locks or lines clear
+        key = (engine.game_phase, engine.start_level, engine.level, engine.score, engine.cleared_lines_count,
+               engine.pieces_count)
+        if engine.game_phase == GamePhase.PLAYING:
+            piece_state = engine.piece_state
+            return key + (piece_state.piece_type, piece_state.rotation, piece_state.offset_row, piece_state.offset_col)
+        return key
+    # endregion Protected methods
@@ -1,63 +1,221 @@
+from typing import Hashable
+
+from bit_board_state import CELL_BITS, CELL_MASK, CELL_STATES, get_snapshot_row_sizes
 from constants import PIECES
 from enums.cell_state import CellState
+from piece import Piece
+from piece_shape import PieceShape
 from piece_state import PieceState
 
 
 class BoardState:
-    board: list[CellState]
+    __slots__ = ('rows', 'width', 'height', 'pieces', 'row_counts', 'pending_lines', 'skyline', 'owns_rows',
+                 'owned_rows')
+    # CellState of every cell, one list per row
+    rows: list[list[CellState]]
     width: int
     height: int
+    # piece type -> Piece, to look up the shapes of piece states
+    pieces: dict[Hashable, Piece]
+    # occupied cells per row
+    row_counts: list[int]
+    # rows found filled by find_filled_rows and not cleared yet
     pending_lines: list[bool]
+    # top occupied row of every column, height for empty columns, None until requested after a change
+    skyline: list[int] | None
+    # False while rows and row_counts are shared with a fork, the first write copies them but not the row lists
+    owns_rows: bool
+    # False for the row lists shared with a fork, a write copies only the row it touches
+    owned_rows: list[bool]
 
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, pieces: dict[Hashable, Piece] = PIECES):
         self.width = width
         self.height = height
-        self.board = [CellState.EMPTY for _ in range(width * height)]
-        self.pending_lines = []
+        self.pieces = pieces
+        self.rows = [[CellState.EMPTY] * width for _ in range(height)]
+        self.row_counts = [0] * height
+        self.pending_lines = [False] * height
+        self.skyline = None
+        self.owns_rows = True
+        self.owned_rows = [True] * height
+
+    def fork(self) -> 'BoardState':
+        board_state = BoardState.__new__(BoardState)
+        board_state.width = self.width
+        board_state.height = self.height
+        board_state.pieces = self.pieces
+        board_state.rows = self.rows
+        board_state.row_counts = self.row_counts
+        board_state.pending_lines = list(self.pending_lines)
+        board_state.skyline = list(self.skyline) if self.skyline is not None else None
+        board_state.owns_rows = self.owns_rows = False
+        board_state.owned_rows = [False] * self.height
+        self.owned_rows = [False] * self.height
+        return board_state
+
+    @property
+    def board(self) -> list[CellState]:
+        return [cell_state for row_cells in self.rows for cell_state in row_cells]
+
+    def snapshot(self) -> bytes:
+        # same layout as BitBoardState.snapshot
+        mask_size, colors_size = get_snapshot_row_sizes(self.width)
+        masks = []
+        colors = []
+        for row_cells in self.rows:
+            row_mask = 0
+            row_colors = 0
+            for col in range(self.width):
+                value = row_cells[col].value
+                if value:
+                    row_mask |= 1 << col
+                    row_colors |= value << (col * CELL_BITS)
+            masks.append(row_mask.to_bytes(mask_size, 'little'))
+            colors.append(row_colors.to_bytes(colors_size, 'little'))
+        return b''.join(masks + colors)
+
+    def restore(self, data: bytes):
+        mask_size, colors_size = get_snapshot_row_sizes(self.width)
+        colors_start = mask_size * self.height
+        rows = []
+        for start in range(colors_start, colors_start + colors_size * self.height, colors_size):
+            row_colors = int.from_bytes(data[start:start + colors_size], 'little')
+            rows.append([CELL_STATES[(row_colors >> (col * CELL_BITS)) & CELL_MASK] for col in range(self.width)])
+        self.rows = rows
+        self.row_counts = [int.from_bytes(data[start:start + mask_size], 'little').bit_count()
+                           for start in range(0, colors_start, mask_size)]
+        self.owns_rows = True
+        self.owned_rows = [True] * self.height
+        self.skyline = None
+        self.find_filled_rows()
 
     def get_matrix_cell(self, row: int, col: int) -> CellState:
-        return self.board[col + row * self.width]
+        return self.rows[row][col]
 
     def set_matrix_cell(self, row: int, col: int, new_state: CellState):
-        self.board[col + row * self.width] = new_state
+        if not self.owns_rows:
+            self._own_rows()
+        if not self.owned_rows[row]:
+            self.rows[row] = list(self.rows[row])
+            self.owned_rows[row] = True
+        row_cells = self.rows[row]
+        was_empty = row_cells[col] == CellState.EMPTY
+        if was_empty != (new_state == CellState.EMPTY):
+            self.row_counts[row] += 1 if was_empty else -1
+        row_cells[col] = new_state
+        # filling a cell can only raise its column, so the skyline survives merges and is rebuilt after clears
+        if new_state == CellState.EMPTY:
+            self.skyline = None
+        elif self.skyline is not None and row < self.skyline[col]:
+            self.skyline[col] = row
 
     def check_row_filled(self, row: int) -> bool:
-        return all([self.get_matrix_cell(row, col) != CellState.EMPTY
-                    for col in range(0, self.width)])
+        return self.row_counts[row] == self.width
 
     def check_row_empty(self, row: int) -> bool:
-        return all([self.get_matrix_cell(row, col) == CellState.EMPTY
-                    for col in range(0, self.width)])
+        return self.row_counts[row] == 0
 
-    def find_filled_rows(self):
-        self.pending_lines = [self.check_row_filled(row)
-                              for row in range(0, self.height)]
+    def find_filled_rows(self, first_row: int = 0, last_row: int | None = None):
+        # only rows first_row..last_row - 1 can have changed, e.g. the rows a locked piece covers
+        for row in range(max(first_row, 0), self.height if last_row is None else min(last_row, self.height)):
+            self.pending_lines[row] = self.row_counts[row] == self.width
 
     def clear_lines(self) -> int:
-        src_row = self.height - 1
-        for dst_row in reversed(range(self.height)):
-            while src_row >= 0 and self.pending_lines[src_row]:
-                src_row -= 1
-
-            dst_start = dst_row * self.width
-            src_start = src_row * self.width
-            if src_row < 0:
-                self.board[dst_start:dst_start + self.width] = [CellState.EMPTY] * self.width
+        # kept rows move down as whole lists, shared ones stay shared
+        width = self.width
+        kept_rows = []
+        kept_counts = []
+        kept_owned_rows = []
+        for row in range(self.height):
+            if self.row_counts[row] == width:
+                self.pending_lines[row] = False
             else:
-                self.board[dst_start:dst_start + self.width] = self.board[src_start:src_start + self.width]
-                src_row -= 1
-        return self.pending_lines.count(True)
+                kept_rows.append(self.rows[row])
+                kept_counts.append(self.row_counts[row])
+                kept_owned_rows.append(self.owned_rows[row])
+        cleared_count = self.height - len(kept_rows)
+        if cleared_count:
+            self.rows = [[CellState.EMPTY] * width for _ in range(cleared_count)] + kept_rows
+            self.row_counts = [0] * cleared_count + kept_counts
+            self.owned_rows = [True] * cleared_count + kept_owned_rows
+            self.owns_rows = True
+            self.skyline = None
+        return cleared_count
+
+    def insert_garbage_rows(self, count: int, hole_col: int) -> bool:
+        # pushes the stack up by count rows filled but for hole_col, returns whether occupied rows were pushed out
+        count = min(count, self.height)
+        overflowed = any(self.row_counts[:count])
+        garbage_row = [CellState.GARBAGE] * self.width
+        garbage_row[hole_col] = CellState.EMPTY
+        self.rows = self.rows[count:] + [list(garbage_row) for _ in range(count)]
+        self.row_counts = self.row_counts[count:] + [self.width - 1] * count
+        self.owned_rows = self.owned_rows[count:] + [True] * count
+        self.owns_rows = True
+        del self.pending_lines[:count]
+        self.pending_lines += [False] * count
+        self.skyline = None
+        return overflowed
 
     def check_piece_valid(self, piece_state: PieceState) -> bool:
-        piece = PIECES[piece_state.piece_type]
-        for row in range(0, piece.side):
-            for col in range(0, piece.side):
-                cell_state = piece.get_piece_cell(row, col, piece_state.rotation)
-                if cell_state != CellState.EMPTY:
-                    board_row = piece_state.offset_row + row
-                    board_col = piece_state.offset_col + col
-                    if (board_row < 0) or (board_row >= self.height) or (board_col < 0) or (board_col >= self.width):
-                        return False
-                    if self.get_matrix_cell(board_row, board_col) != CellState.EMPTY:
-                        return False
+        return self.check_shape_valid(self.pieces[piece_state.piece_type].get_shape(piece_state.rotation),
+                                      piece_state.offset_row, piece_state.offset_col)
+
+    def check_shape_valid(self, shape: PieceShape, offset_row: int, offset_col: int) -> bool:
+        for row, col in shape.cells:
+            board_row = offset_row + row
+            board_col = offset_col + col
+            if (board_row < 0) or (board_row >= self.height) or (board_col < 0) or (board_col >= self.width):
+                return False
+            if self.rows[board_row][board_col] != CellState.EMPTY:
+                return False
         return True
+
+    def get_row_masks(self) -> list[int]:
+        return [sum(1 << col for col in range(self.width) if row_cells[col] != CellState.EMPTY)
+                for row_cells in self.rows]
+
+    def get_row_colors(self) -> list[int]:
+        # same packing as BitBoardState.colors
+        return [sum(row_cells[col].value << (col * CELL_BITS) for col in range(self.width)) for row_cells in self.rows]
+
+    def get_skyline(self) -> list[int]:
+        if self.skyline is None:
+            skyline = [self.height] * self.width
+            missing_columns = self.width
+            # empty rows are skipped by their counts, the scan stops once every column has a top
+            for row in range(self.height):
+                if not self.row_counts[row]:
+                    continue
+                row_cells = self.rows[row]
+                for col in range(self.width):
+                    if skyline[col] == self.height and row_cells[col] != CellState.EMPTY:
+                        skyline[col] = row
+                        missing_columns -= 1
+                if not missing_columns:
+                    break
+            self.skyline = skyline
+        return self.skyline
+
+    def get_drop_distance(self, piece_state: PieceState) -> int:
+        shape = self.pieces[piece_state.piece_type].get_shape(piece_state.rotation)
+        skyline = self.get_skyline()
+        distance = self.height
+        for row, col in shape.cells:
+            board_row = piece_state.offset_row + row
+            board_col = piece_state.offset_col + col
+            if board_row < skyline[board_col]:
+                distance = min(distance, skyline[board_col] - board_row - 1)
+                continue
+            # the cell is under an overhang, walk down the column
+            free_rows = 0
+            while board_row + free_rows < self.height and \
+                    self.rows[board_row + free_rows][board_col] == CellState.EMPTY:
+                free_rows += 1
+            distance = min(distance, max(free_rows - 1, 0))
+        return distance
+
+    def _own_rows(self):
+        self.rows = list(self.rows)
+        self.row_counts = list(self.row_counts)
+        self.owns_rows = True
@@ -1,23 +1,14 @@
-import pygame as pg
-
 from enums.cell_state import CellState
 from enums.rotation import Rotation
-from enums.user_input_state import UserInputState
 from piece import Piece
 
 WIDTH = 10
 HEIGHT = 22
 VISIBLE_HEIGHT = 20
 GRID_SIZE = 30
-WINDOW_SIZE = (300, 780)
-
-KEYBOARD_CONFIGURATION = {
-    pg.K_RIGHT: UserInputState.D_RIGHT,
-    pg.K_LEFT: UserInputState.D_LEFT,
-    pg.K_DOWN: UserInputState.D_DOWN,
-    pg.K_UP: UserInputState.D_ROTATE,
-    pg.K_SPACE: UserInputState.D_HARD_DROP
-}
+# score and level text above the board
+HUD_HEIGHT = 120
+WINDOW_SIZE = (WIDTH * GRID_SIZE, HUD_HEIGHT + HEIGHT * GRID_SIZE)
 
 PIECES = {
     CellState.T_PIECE: Piece([0, 0, 0,
@@ -55,7 +46,8 @@ BASE_COLOR = {
     CellState.J_PIECE: (45, 153, 81),
     CellState.Z_PIECE: (153, 45, 45),
     CellState.S_PIECE: (45, 99, 153),
-    CellState.I_PIECE: (153, 99, 45)
+    CellState.I_PIECE: (153, 99, 45),
+    CellState.GARBAGE: (110, 110, 110)
 }
 LIGHT_COLOR = {
     CellState.EMPTY: (40, 40, 40),
@@ -65,7 +57,8 @@ LIGHT_COLOR = {
     CellState.J_PIECE: (68, 229, 122),
     CellState.Z_PIECE: (229, 68, 68),
     CellState.S_PIECE: (68, 149, 229),
-    CellState.I_PIECE: (229, 149, 68)
+    CellState.I_PIECE: (229, 149, 68),
+    CellState.GARBAGE: (165, 165, 165)
 }
 DARK_COLOR = {
     CellState.EMPTY: (40, 40, 40),
@@ -75,7 +68,8 @@ DARK_COLOR = {
     CellState.J_PIECE: (30, 102, 54),
     CellState.Z_PIECE: (102, 30, 30),
     CellState.S_PIECE: (30, 66, 102),
-    CellState.I_PIECE: (102, 66, 30)
+    CellState.I_PIECE: (102, 66, 30),
+    CellState.GARBAGE: (73, 73, 73)
 }
 
 # https://tetris.wiki/Tetris_(NES,_Nintendo)
@@ -91,3 +85,4 @@ FRAMES_PER_DROP = {
     8: 8
 }
 SECONDS_PER_FRAME = 1 / 60
+LINE_CLEAR_HIGHLIGHT_FRAMES = 12
@@ -10,3 +10,4 @@ class CellState(Enum):
     Z_PIECE = 5
     S_PIECE = 6
     I_PIECE = 7
+    GARBAGE = 8
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class FramePhase(Enum):
+    EVENTS = 0
+    UPDATE = 1
+    RENDER_BOARD = 2
+    RENDER_PHASE = 3
+    RENDER_HUD = 4
+    RENDER_PROFILER = 5
+    FLIP = 6
+    FRAME = 7
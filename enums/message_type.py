@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class MessageType(Enum):
+    INPUT = 0
+    MATCH_START = 1
+    BOARD_UPDATE = 2
+    MATCH_END = 3
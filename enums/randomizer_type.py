@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class RandomizerType(Enum):
+    UNIFORM = 0
+    BAG = 1
+    NES = 2
@@ -0,0 +1,47 @@
+from constants import SECONDS_PER_FRAME
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+DEFAULT_MAX_CATCH_UP_TICKS = 10
+
+
+class FixedTimestep:
+    ticks_per_second: int
+    max_catch_up_ticks: int
+    start_ns: int | None
+    # logic ticks handed out since start_ns, including the skipped ones
+    tick_count: int
+    skipped_ticks: int
+    # progress towards the next tick in [0, 1), for render interpolation
+    alpha: float
+
+    def __init__(self, ticks_per_second: int = round(1 / SECONDS_PER_FRAME),
+                 max_catch_up_ticks: int = DEFAULT_MAX_CATCH_UP_TICKS):
+        self.ticks_per_second = ticks_per_second
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.reset()
+
+    def reset(self):
+        self.start_ns = None
+        self.tick_count = 0
+        self.skipped_ticks = 0
+        self.alpha = 0.0
+
+    def advance(self, now_ns: int) -> int:
+        if self.start_ns is None:
+            self.start_ns = now_ns
+        # integer arithmetic keeps the tick rate exact over arbitrarily long sessions
+        scaled_elapsed = (now_ns - self.start_ns) * self.ticks_per_second
+        due_ticks = scaled_elapsed // NANOSECONDS_PER_SECOND
+        self.alpha = (scaled_elapsed % NANOSECONDS_PER_SECOND) / NANOSECONDS_PER_SECOND
+        ticks = due_ticks - self.tick_count
+        if ticks > self.max_catch_up_ticks:
+            # the machine cannot keep up, let logic time slip instead of spiralling
+            self.skipped_ticks += ticks - self.max_catch_up_ticks
+            ticks = self.max_catch_up_ticks
+            self.alpha = 0.0
+        self.tick_count = due_ticks
+        return ticks
+
+    def get_tick_time_ns(self, tick_index: int) -> int:
+        # earliest time at which the tick becomes due
+        return self.start_ns - (-tick_index * NANOSECONDS_PER_SECOND // self.ticks_per_second)
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pygame as pg
+
+DEFAULT_FONT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'tetris', 'font_index.json')
+# font name -> font file, None for fonts the system does not have, loaded from the font index on first use
+font_paths: dict[str, str | None] | None = None
+
+
+def get_font_index_path() -> str:
+    # TETRIS_FONT_INDEX is read on every use, tests and benchmarks point it elsewhere
+    return os.environ.get('TETRIS_FONT_INDEX', DEFAULT_FONT_INDEX_PATH)
+
+
+def get_font_path(name: str) -> str | None:
+    global font_paths
+    if font_paths is None:
+        font_paths = _load_font_index()
+    if name in font_paths and (font_paths[name] is None or os.path.exists(font_paths[name])):
+        return font_paths[name]
+    # matching scans every system font the first time, which takes seconds on some machines
+    font_paths[name] = pg.sysfont.match_font(name)
+    _save_font_index()
+    return font_paths[name]
+
+
+def load_font(name: str, size: int) -> pg.font.Font:
+    # same font as pg.font.SysFont(name, size), the pygame default font when the system has none by that name
+    return pg.font.Font(get_font_path(name), size)
+
+
+def _load_font_index() -> dict[str, str | None]:
+    try:
+        with open(get_font_index_path()) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_font_index():
+    try:
+        font_index_path = get_font_index_path()
+        os.makedirs(os.path.dirname(font_index_path), exist_ok=True)
+        with open(font_index_path, 'w') as file:
+            json.dump(font_paths, file)
+    except OSError:
+        # a read-only home only costs the scan on the next start
+        pass
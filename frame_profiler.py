@@ -0,0 +1,107 @@
+import json
+import time
+from array import array
+
+from enums.frame_phase import FramePhase
+
+DEFAULT_CAPACITY = 4096
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    capacity: int
+    frame_budget_ns: int
+    summary_path: str | None
+    show_overlay: bool
+    # ring buffer of durations in nanoseconds per FramePhase.value
+    samples: list[array]
+    frame_count: int
+    frame_start_ns: int
+    previous_frame_start_ns: int
+    late_frames: int
+    dropped_frames: int
+    # ring buffer of nanoseconds from an input event to the logic tick that applied it
+    input_latencies: array
+    input_count: int
+
+    def __init__(self, frame_rate: int, capacity: int = DEFAULT_CAPACITY, summary_path: str | None = None,
+                 show_overlay: bool = False):
+        self.capacity = capacity
+        self.frame_budget_ns = 1_000_000_000 // frame_rate if frame_rate else 0
+        self.summary_path = summary_path
+        self.show_overlay = show_overlay
+        self.samples = [array('q', bytes(8 * capacity)) for _ in FramePhase]
+        self.frame_count = 0
+        self.frame_start_ns = 0
+        self.previous_frame_start_ns = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.input_latencies = array('q', bytes(8 * capacity))
+        self.input_count = 0
+
+    # region Public methods
+    def begin_frame(self) -> int:
+        self.previous_frame_start_ns, self.frame_start_ns = self.frame_start_ns, time.perf_counter_ns()
+        if self.previous_frame_start_ns and self.frame_budget_ns:
+            # frames the display missed while the previous frame was running
+            self.dropped_frames += max((self.frame_start_ns - self.previous_frame_start_ns) //
+                                       self.frame_budget_ns - 1, 0)
+        return self.frame_start_ns
+
+    def record(self, phase: FramePhase, start_ns: int) -> int:
+        end_ns = time.perf_counter_ns()
+        self.samples[phase.value][self.frame_count % self.capacity] = end_ns - start_ns
+        return end_ns
+
+    def end_frame(self):
+        frame_ns = self.record(FramePhase.FRAME, self.frame_start_ns) - self.frame_start_ns
+        if self.frame_budget_ns and frame_ns > self.frame_budget_ns:
+            self.late_frames += 1
+        self.frame_count += 1
+        # phases that were skipped this frame must not keep the sample of a previous lap of the ring
+        index = self.frame_count % self.capacity
+        for phase_samples in self.samples:
+            phase_samples[index] = 0
+
+    def record_input_latency(self, latency_ns: int):
+        self.input_latencies[self.input_count % self.capacity] = latency_ns
+        self.input_count += 1
+
+    def get_percentiles(self, phase: FramePhase) -> dict[str, float]:
+        return self._get_percentiles(self.samples[phase.value], self.frame_count)
+
+    def get_input_latency_percentiles(self) -> dict[str, float]:
+        return self._get_percentiles(self.input_latencies, self.input_count)
+
+    def get_summary(self) -> dict:
+        return {
+            'frames': self.frame_count,
+            'late_frames': self.late_frames,
+            'dropped_frames': self.dropped_frames,
+            'frame_budget_ms': self.frame_budget_ns / 1e6,
+            'phases_ms': {phase.name.lower(): self.get_percentiles(phase) for phase in FramePhase},
+            'inputs': self.input_count,
+            'input_latency_ms': self.get_input_latency_percentiles(),
+        }
+
+    def save_summary(self):
+        if self.summary_path is None:
+            return
+        with open(self.summary_path, 'w') as file:
+            json.dump(self.get_summary(), file, indent=2)
+
+    def get_overlay_text(self) -> str:
+        frame_percentiles = self.get_percentiles(FramePhase.FRAME)
+        return (f'{frame_percentiles["p50"]:.1f}/{frame_percentiles["p95"]:.1f}/{frame_percentiles["p99"]:.1f} ms '
+                f'late {self.late_frames} drop {self.dropped_frames}')
+    # endregion Public methods
+
+    # region Protected methods
+    def _get_percentiles(self, samples: array, sample_count: int) -> dict[str, float]:
+        count = min(sample_count, self.capacity)
+        durations = sorted(samples[:count])
+        if not durations:
+            return {f'p{percentile}': 0.0 for percentile in PERCENTILES}
+        return {f'p{percentile}': durations[min(count * percentile // 100, count - 1)] / 1e6
+                for percentile in PERCENTILES}
+    # endregion Protected methods
@@ -0,0 +1,38 @@
+from typing import Hashable
+
+from constants import WIDTH, HEIGHT, GRID_SIZE, HUD_HEIGHT, PIECES
+from enums.randomizer_type import RandomizerType
+from piece import Piece
+from piece_randomizer import DEFAULT_PREVIEW_COUNT
+
+
+class GameConfiguration:
+    width: int
+    height: int
+    # side of a board cell on screen, in pixels
+    grid_size: int
+    # piece type -> Piece, custom sets may use any keys; cell values of the pieces pick the CellState colors
+    pieces: dict[Hashable, Piece]
+    piece_types: list[Hashable]
+    randomizer_type: RandomizerType
+    # upcoming pieces known ahead of their spawn
+    preview_count: int
+    window_size: tuple[int, int]
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT, grid_size: int = GRID_SIZE,
+                 pieces: dict[Hashable, Piece] | None = None, randomizer_type: RandomizerType = RandomizerType.UNIFORM,
+                 preview_count: int = DEFAULT_PREVIEW_COUNT):
+        self.width = width
+        self.height = height
+        self.grid_size = grid_size
+        self.pieces = pieces if pieces is not None else PIECES
+        self.piece_types = list(self.pieces.keys())
+        self.randomizer_type = randomizer_type
+        self.preview_count = preview_count
+        self.window_size = (width * grid_size, HUD_HEIGHT + height * grid_size)
+        for piece_type, piece in self.pieces.items():
+            if piece.side > min(width, height):
+                raise ValueError(f'piece {piece_type} does not fit on a {width}x{height} board')
+
+
+DEFAULT_CONFIGURATION = GameConfiguration()
@@ -0,0 +1,166 @@
+import time
+from collections import OrderedDict
+
+import pygame as pg
+
+from constants import WIDTH, HEIGHT, GRID_SIZE, HUD_HEIGHT
+from enums.cell_state import CellState
+from enums.frame_phase import FramePhase
+from enums.game_phase import GamePhase
+from frame_profiler import FrameProfiler
+from renderer import draw_cell
+from tetris_engine import TetrisEngine
+
+# displayed cell code is the CellState value, or'ed with the ghost piece CellState value shifted by GHOST_SHIFT
+GHOST_SHIFT = 4
+HIGHLIGHT_CODE = len(CellState) << GHOST_SHIFT
+UNKNOWN_CODE = -1
+# y of the HUD lines and distance between overlay lines, for the default HUD_HEIGHT
+HUD_LINE_Y = (5, 40, 80)
+OVERLAY_LINE_SPACING = 40
+# rendered texts kept per renderer, the HUD and overlay lines on screen plus the recently replaced ones
+TEXT_CACHE_SIZE = 16
+
+
+def bake_cell_sprites(grid_size: int = GRID_SIZE) -> dict[int, pg.Surface]:
+    # every board cell combined with every ghost outline, plus the line clear highlight
+    cell_sprites = {}
+    for cell in CellState:
+        for ghost in CellState:
+            sprite = pg.Surface((grid_size, grid_size)).convert()
+            draw_cell(sprite, cell, 0, 0, 0, 0, False, grid_size)
+            if ghost != CellState.EMPTY:
+                draw_cell(sprite, ghost, 0, 0, 0, 0, True, grid_size)
+            cell_sprites[cell.value | (ghost.value << GHOST_SHIFT)] = sprite
+    highlight_sprite = pg.Surface((grid_size, grid_size)).convert()
+    highlight_sprite.fill((255, 255, 255))
+    cell_sprites[HIGHLIGHT_CODE] = highlight_sprite
+    return cell_sprites
+
+
+class IncrementalRenderer:
+    surface: pg.Surface
+    font: pg.font.Font
+    height: int
+    width: int
+    grid_size: int
+    padding_y: int
+    # may be shared between renderers with the same grid_size and font
+    cell_sprites: dict[int, pg.Surface]
+    text_cache_size: int
+    # least recently used first, may be shared like cell_sprites with a text_cache_size covering every sharer
+    text_surfaces: OrderedDict
+    # last code blitted at every board cell
+    displayed_cells: list[int]
+    displayed_hud: tuple[str, ...] | None
+    displayed_overlay: tuple | None
+
+    def __init__(self, surface: pg.Surface, font: pg.font.Font, height: int = HEIGHT, width: int = WIDTH,
+                 padding_y: int = HUD_HEIGHT, grid_size: int = GRID_SIZE,
+                 cell_sprites: dict[int, pg.Surface] | None = None, text_surfaces: OrderedDict | None = None,
+                 text_cache_size: int = TEXT_CACHE_SIZE):
+        self.surface = surface
+        self.font = font
+        self.height = height
+        self.width = width
+        self.grid_size = grid_size
+        self.padding_y = padding_y
+        self.cell_sprites = cell_sprites if cell_sprites is not None else bake_cell_sprites(grid_size)
+        self.text_surfaces = text_surfaces if text_surfaces is not None else OrderedDict()
+        self.text_cache_size = text_cache_size
+        self.invalidate()
+
+    # region Public methods
+    def invalidate(self):
+        self.displayed_cells = [UNKNOWN_CODE] * (self.width * self.height)
+        self.displayed_hud = None
+        self.displayed_overlay = None
+
+    def render(self, game_state: TetrisEngine, profiler: FrameProfiler | None = None) -> list[pg.Rect]:
+        start_ns = time.perf_counter_ns() if profiler is not None else 0
+        dirty_rects = []
+        overlay = self._get_overlay(game_state)
+        if overlay != self.displayed_overlay:
+            self.displayed_cells = [UNKNOWN_CODE] * (self.width * self.height)
+
+        cells = self._get_cell_codes(game_state)
+        displayed_cells = self.displayed_cells
+        for index, code in enumerate(cells):
+            if displayed_cells[index] != code:
+                displayed_cells[index] = code
+                row, col = divmod(index, self.width)
+                dirty_rects.append(self.surface.blit(self.cell_sprites[code],
+                                                     (col * self.grid_size, self.padding_y + row * self.grid_size)))
+        if profiler is not None:
+            start_ns = profiler.record(FramePhase.RENDER_BOARD, start_ns)
+
+        if overlay != self.displayed_overlay:
+            self.displayed_overlay = overlay
+            if overlay is not None:
+                x, y = self.surface.get_rect().center
+                line_spacing = OVERLAY_LINE_SPACING * self.padding_y // HUD_HEIGHT
+                for index, text in enumerate(overlay[1:]):
+                    text_surface = self._get_text_surface(text)
+                    self.surface.blit(text_surface,
+                                      text_surface.get_rect(center=(x, self.padding_y + y + index * line_spacing)))
+            dirty_rects.append(pg.Rect(0, self.padding_y, self.width * self.grid_size, self.height * self.grid_size))
+        if profiler is not None:
+            start_ns = profiler.record(FramePhase.RENDER_PHASE, start_ns)
+
+        hud = (f'LEVEL {game_state.level}', f'Score: {game_state.score}',
+               f'Lines count: {game_state.cleared_lines_count}')
+        if hud != self.displayed_hud:
+            self.displayed_hud = hud
+            hud_rect = pg.Rect(0, 0, self.surface.get_width(), self.padding_y)
+            self.surface.fill((0, 0, 0), hud_rect)
+            for text, y in zip(hud, HUD_LINE_Y):
+                self.surface.blit(self._get_text_surface(text), (5, y * self.padding_y // HUD_HEIGHT))
+            dirty_rects.append(hud_rect)
+        if profiler is not None:
+            profiler.record(FramePhase.RENDER_HUD, start_ns)
+        return dirty_rects
+    # endregion Public methods
+
+    # region Protected methods
+    def _get_text_surface(self, text: str) -> pg.Surface:
+        text_surface = self.text_surfaces.get(text)
+        if text_surface is not None:
+            self.text_surfaces.move_to_end(text)
+            return text_surface
+        # scores keep changing, only the recent texts are kept
+        text_surface = self.font.render(text, True, (220, 220, 220))
+        self.text_surfaces[text] = text_surface
+        while len(self.text_surfaces) > self.text_cache_size:
+            self.text_surfaces.popitem(last=False)
+        return text_surface
+
+    def _get_overlay(self, game_state: TetrisEngine) -> tuple | None:
+        match game_state.game_phase:
+            case GamePhase.GAME_OVER:
+                return game_state.game_phase, 'GAME OVER'
+            case GamePhase.START:
+                return game_state.game_phase, 'PRESS START', f'Select level: {game_state.start_level}'
+            case _:
+                return None
+
+    def _get_cell_codes(self, game_state: TetrisEngine) -> list[int]:
+        board_state = game_state.board_state
+        cells = [board_state.get_matrix_cell(row, col).value
+                 for row in range(self.height) for col in range(self.width)]
+        match game_state.game_phase:
+            case GamePhase.PLAYING:
+                piece_state = game_state.piece_state
+                shape = game_state.configuration.pieces[piece_state.piece_type].get_shape(piece_state.rotation)
+                for row, col in shape.cells:
+                    cells[(piece_state.offset_row + row) * self.width + piece_state.offset_col + col] = \
+                        shape.cell_type.value
+                ghost_row = game_state.get_landing_row()
+                ghost_code = shape.cell_type.value << GHOST_SHIFT
+                for row, col in shape.cells:
+                    cells[(ghost_row + row) * self.width + piece_state.offset_col + col] |= ghost_code
+            case GamePhase.CLEARING_LINE:
+                for row in range(self.height):
+                    if board_state.pending_lines[row]:
+                        cells[row * self.width:(row + 1) * self.width] = [HIGHLIGHT_CODE] * self.width
+        return cells
+    # endregion Protected methods
@@ -0,0 +1,56 @@
+from typing import Callable
+
+from enums.user_input_state import UserInputState
+from keyboard_configuration import KEYBOARD_CONFIGURATION
+
+InputHandler = Callable[[UserInputState], None]
+
+
+class InputDispatcher:
+    keyboard_configuration: dict[int, UserInputState]
+    # event type -> UserInputState -> subscribed handlers, in subscription order
+    handlers: dict[int, dict[UserInputState, list[InputHandler]]]
+    # (event type, key) -> (mapped UserInputState, handlers), rebuilt on (un)subscribe so dispatch is one lookup
+    dispatch_table: dict[tuple[int, int], tuple[UserInputState, tuple[InputHandler, ...]]]
+
+    def __init__(self, keyboard_configuration: dict[int, UserInputState] = KEYBOARD_CONFIGURATION):
+        self.keyboard_configuration = keyboard_configuration
+        self.handlers = {}
+        self.dispatch_table = {}
+
+    # region Public methods
+    def subscribe(self, event_type: int, user_input_state: UserInputState, handler: InputHandler):
+        handlers = self.handlers.setdefault(event_type, {}).setdefault(user_input_state, [])
+        # subscribing twice is a no-op, so re-running setup code cannot make a handler fire more than once
+        if handler not in handlers:
+            handlers.append(handler)
+            self._build_dispatch_table(event_type)
+
+    def unsubscribe(self, event_type: int, user_input_state: UserInputState, handler: InputHandler):
+        handlers = self.handlers.get(event_type, {}).get(user_input_state, [])
+        if handler in handlers:
+            handlers.remove(handler)
+            self._build_dispatch_table(event_type)
+
+    def get_handler_count(self) -> int:
+        return sum(len(handlers) for type_handlers in self.handlers.values() for handlers in type_handlers.values())
+
+    def dispatch(self, event_type: int, key: int):
+        entry = self.dispatch_table.get((event_type, key))
+        if entry is None:
+            return
+        user_input_state, handlers = entry
+        for handler in handlers:
+            handler(user_input_state)
+    # endregion Public methods
+
+    # region Protected methods
+    def _build_dispatch_table(self, event_type: int):
+        type_handlers = self.handlers[event_type]
+        for key, user_input_state in self.keyboard_configuration.items():
+            handlers = tuple(type_handlers.get(user_input_state, ()))
+            if handlers:
+                self.dispatch_table[(event_type, key)] = (user_input_state, handlers)
+            else:
+                self.dispatch_table.pop((event_type, key), None)
+    # endregion Protected methods
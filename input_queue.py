@@ -0,0 +1,63 @@
+from collections import deque
+
+from enums.user_input_state import UserInputState
+
+# NES delayed auto shift: first repeat after DAS_FRAMES held frames, then every ARR_FRAMES
+DAS_FRAMES = 16
+ARR_FRAMES = 6
+REPEATABLE_INPUTS = (UserInputState.D_LEFT, UserInputState.D_RIGHT, UserInputState.D_DOWN)
+
+
+class InputEvent:
+    timestamp_ns: int
+    user_input_state: UserInputState
+    pressed: bool
+    # True for inputs generated by auto-repeat of a held key
+    repeat: bool
+
+    def __init__(self, timestamp_ns: int, user_input_state: UserInputState, pressed: bool, repeat: bool = False):
+        self.timestamp_ns = timestamp_ns
+        self.user_input_state = user_input_state
+        self.pressed = pressed
+        self.repeat = repeat
+
+
+class InputQueue:
+    events: deque[InputEvent]
+    das_frames: int
+    arr_frames: int
+    # logic frames every held repeatable key has been down for
+    held_frames: dict[UserInputState, int]
+
+    def __init__(self, das_frames: int = DAS_FRAMES, arr_frames: int = ARR_FRAMES):
+        self.events = deque()
+        self.das_frames = das_frames
+        self.arr_frames = arr_frames
+        self.held_frames = {}
+
+    # region Public methods
+    def push(self, timestamp_ns: int, user_input_state: UserInputState, pressed: bool):
+        self.events.append(InputEvent(timestamp_ns, user_input_state, pressed))
+
+    def poll(self, tick_time_ns: int) -> list[InputEvent]:
+        # presses due by tick_time_ns in arrival order, followed by auto-repeats of keys held through the tick
+        for user_input_state, held_frames in self.held_frames.items():
+            self.held_frames[user_input_state] = held_frames + 1
+        presses = []
+        while self.events and self.events[0].timestamp_ns <= tick_time_ns:
+            event = self.events.popleft()
+            if event.pressed:
+                presses.append(event)
+                if event.user_input_state in REPEATABLE_INPUTS:
+                    self.held_frames[event.user_input_state] = 0
+            else:
+                self.held_frames.pop(event.user_input_state, None)
+        for user_input_state, held_frames in self.held_frames.items():
+            if held_frames >= self.das_frames and (held_frames - self.das_frames) % self.arr_frames == 0:
+                presses.append(InputEvent(tick_time_ns, user_input_state, True, True))
+        return presses
+
+    def clear(self):
+        self.events.clear()
+        self.held_frames.clear()
+    # endregion Public methods
@@ -0,0 +1,11 @@
+import pygame as pg
+
+from enums.user_input_state import UserInputState
+
+KEYBOARD_CONFIGURATION = {
+    pg.K_RIGHT: UserInputState.D_RIGHT,
+    pg.K_LEFT: UserInputState.D_LEFT,
+    pg.K_DOWN: UserInputState.D_DOWN,
+    pg.K_UP: UserInputState.D_ROTATE,
+    pg.K_SPACE: UserInputState.D_HARD_DROP
+}
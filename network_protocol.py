@@ -0,0 +1,23 @@
+import struct
+
+from enums.message_type import MessageType
+
+# every message: payload size, MessageType value; followed by the payload
+MESSAGE_HEADER = struct.Struct('<HB')
+# client -> server, input sequence number, UserInputState value
+INPUT = struct.Struct('<Ib')
+# server -> client: match id, index of the receiving player, piece generator seed, board width, height
+MATCH_START = struct.Struct('<IBQHH')
+# frame, player index of the board, last input sequence applied to it, game phase, piece number (index in the
+# piece set + 1, 0 without a piece), row, col, rotation, level, score, cleared lines, incoming garbage lines,
+# changed rows; followed by ROW_UPDATE and the packed CellState values of every changed row
+BOARD_UPDATE = struct.Struct('<IBIBBhhBHQIHH')
+ROW_UPDATE = struct.Struct('<H')
+# match id, index of the winner, NO_WINNER when both players topped out on the same frame
+MATCH_END = struct.Struct('<IB')
+NO_WINNER = 0xFF
+MESSAGE_TYPES = tuple(MessageType)
+
+
+def pack_message(message_type: MessageType, payload: bytes) -> bytes:
+    return MESSAGE_HEADER.pack(len(payload), message_type.value) + payload
@@ -1,22 +1,52 @@
 from enums.cell_state import CellState
 from enums.rotation import Rotation
+from piece_shape import PieceShape
 
 
 class Piece:
+    __slots__ = ('data', 'side', 'rotated_data', 'shapes', 'canonical_rotations')
     data: list[CellState]
     side: int
+    # rotated copies of data and their occupied cells, indexed by Rotation.value
+    rotated_data: tuple[list[CellState], ...]
+    shapes: tuple[PieceShape, ...]
+    # first rotation with the same cells up to translation, O, S, Z and I have fewer distinct shapes than rotations
+    canonical_rotations: tuple[Rotation, ...]
 
     def __init__(self, data: list[int], side: int):
         self.data = [CellState(cell) for cell in data]
         self.side = side
+        self.rotated_data = tuple(self._rotate_data(rotation) for rotation in Rotation)
+        self.shapes = tuple(self._build_shape(rotated_data) for rotated_data in self.rotated_data)
+        normalized_cells = [frozenset((row - shape.min_row, col - shape.min_col) for row, col in shape.cells)
+                            for shape in self.shapes]
+        self.canonical_rotations = tuple(Rotation(normalized_cells.index(cells)) for cells in normalized_cells)
 
     def get_piece_cell(self, row: int, col: int, rotation: Rotation) -> CellState:
+        return self.rotated_data[rotation.value][col + row * self.side]
+
+    def get_shape(self, rotation: Rotation) -> PieceShape:
+        return self.shapes[rotation.value]
+
+    def get_canonical_rotation(self, rotation: Rotation) -> Rotation:
+        return self.canonical_rotations[rotation.value]
+
+    def _rotate_data(self, rotation: Rotation) -> list[CellState]:
+        return [self.data[self._get_rotated_index(row, col, rotation)]
+                for row in range(self.side) for col in range(self.side)]
+
+    def _get_rotated_index(self, row: int, col: int, rotation: Rotation) -> int:
         match rotation:
             case Rotation.CLOCKWISE_90:
-                return self.data[(self.side - col - 1) * self.side + row]
+                return (self.side - col - 1) * self.side + row
             case Rotation.CLOCKWISE_180:
-                return self.data[(self.side - row - 1) * self.side + (self.side - col - 1)]
+                return (self.side - row - 1) * self.side + (self.side - col - 1)
             case Rotation.CLOCKWISE_270:
-                return self.data[col * self.side + (self.side - row - 1)]
+                return col * self.side + (self.side - row - 1)
             case _:
-                return self.data[col + row * self.side]
+                return col + row * self.side
+
+    def _build_shape(self, rotated_data: list[CellState]) -> PieceShape:
+        cells = tuple((index // self.side, index % self.side)
+                      for index, cell in enumerate(rotated_data) if cell != CellState.EMPTY)
+        return PieceShape(rotated_data[cells[0][0] * self.side + cells[0][1]], cells)
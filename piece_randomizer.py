@@ -0,0 +1,175 @@
+import copy
+import random
+import struct
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+
+from enums.randomizer_type import RandomizerType
+
+DEFAULT_PREVIEW_COUNT = 3
+# snapshot: RandomizerType value, preview length, randomizer state length; followed by the preview and the state
+# as one byte per value and the 625 words of the Mersenne Twister state
+SNAPSHOT_HEADER = struct.Struct('<BBB')
+RANDOMIZER_TYPES = tuple(RandomizerType)
+MAX_PIECE_COUNT = 255
+
+
+class PieceRandomizer(ABC):
+    # written to snapshots, which only restore into a randomizer of the same type
+    randomizer_type: RandomizerType
+    # pieces are indices into the piece set of the game
+    piece_count: int
+    rng: random.Random
+    preview_count: int
+    # the next preview_count pieces, in spawn order
+    preview: deque[int]
+
+    def __init__(self, piece_count: int, seed: int, preview_count: int = DEFAULT_PREVIEW_COUNT):
+        if not 0 < piece_count <= MAX_PIECE_COUNT:
+            raise ValueError(f'randomizers take 1 to {MAX_PIECE_COUNT} pieces, not {piece_count}')
+        self.piece_count = piece_count
+        self.rng = random.Random(seed)
+        self.preview_count = preview_count
+        self.preview = deque()
+        for _ in range(preview_count):
+            self.preview.append(self._draw())
+
+    # region Public methods
+    def next_piece(self) -> int:
+        # pieces come out in draw order, the preview only draws them earlier
+        self.preview.append(self._draw())
+        return self.preview.popleft()
+
+    def generate(self, count: int) -> bytes:
+        # count pieces in bulk, one byte each, continuing the sequence of this randomizer
+        return bytes(self._draw() for _ in range(count))
+
+    def copy(self) -> 'PieceRandomizer':
+        randomizer = copy.copy(self)
+        randomizer.rng = random.Random()
+        randomizer.rng.setstate(self.rng.getstate())
+        randomizer.preview = deque(self.preview)
+        randomizer._set_state(self._get_state())
+        return randomizer
+
+    def snapshot(self) -> bytes:
+        state = self._get_state()
+        _, rng_words, _ = self.rng.getstate()
+        return SNAPSHOT_HEADER.pack(self.randomizer_type.value, len(self.preview), len(state)) + \
+            bytes(self.preview) + bytes(state) + \
+            array('I', rng_words).tobytes()
+
+    def restore(self, data: bytes):
+        randomizer_type, preview_length, state_length = SNAPSHOT_HEADER.unpack_from(data)
+        if randomizer_type != self.randomizer_type.value:
+            snapshot_type = RANDOMIZER_TYPES[randomizer_type].name if randomizer_type < len(RANDOMIZER_TYPES) else \
+                randomizer_type
+            raise ValueError(f'snapshot of a {snapshot_type} randomizer, this one is {self.randomizer_type.name}')
+        state_start = SNAPSHOT_HEADER.size + preview_length
+        self.preview = deque(data[SNAPSHOT_HEADER.size:state_start])
+        self._set_state(list(data[state_start:state_start + state_length]))
+        rng_words = array('I')
+        rng_words.frombytes(data[state_start + state_length:])
+        self.rng.setstate((3, tuple(rng_words), None))
+    # endregion Public methods
+
+    # region Protected methods
+    @abstractmethod
+    def _draw(self) -> int:
+        pass
+
+    def _get_state(self) -> list[int]:
+        return []
+
+    def _set_state(self, state: list[int]):
+        pass
+    # endregion Protected methods
+
+
+class UniformRandomizer(PieceRandomizer):
+    randomizer_type = RandomizerType.UNIFORM
+
+    def generate(self, count: int) -> bytes:
+        # choices draws one float per piece instead of rejection sampling, a different but equally uniform stream
+        return bytes(self.rng.choices(range(self.piece_count), k=count))
+
+    def _draw(self) -> int:
+        # same draws as random.choice over the piece set
+        return self.rng.randrange(self.piece_count)
+
+
+class BagRandomizer(PieceRandomizer):
+    randomizer_type = RandomizerType.BAG
+    # pieces left in the current bag, drawn from the end
+    bag: list[int]
+
+    def __init__(self, piece_count: int, seed: int, preview_count: int = DEFAULT_PREVIEW_COUNT):
+        self.bag = []
+        super().__init__(piece_count, seed, preview_count)
+
+    def generate(self, count: int) -> bytes:
+        sequence = bytearray()
+        while len(sequence) < count:
+            if not self.bag:
+                self._refill_bag()
+            sequence += bytes(reversed(self.bag))
+            self.bag = []
+        # pieces past count stay in the bag for the next draws
+        self.bag = list(reversed(sequence[count:]))
+        return bytes(sequence[:count])
+
+    def _draw(self) -> int:
+        if not self.bag:
+            self._refill_bag()
+        return self.bag.pop()
+
+    def _refill_bag(self):
+        self.bag = list(range(self.piece_count))
+        self.rng.shuffle(self.bag)
+
+    def _get_state(self) -> list[int]:
+        return self.bag
+
+    def _set_state(self, state: list[int]):
+        self.bag = list(state)
+
+
+class NesRandomizer(PieceRandomizer):
+    randomizer_type = RandomizerType.NES
+    # last drawn piece, piece_count before the first draw
+    previous: int
+
+    def __init__(self, piece_count: int, seed: int, preview_count: int = DEFAULT_PREVIEW_COUNT):
+        self.previous = piece_count
+        super().__init__(piece_count, seed, preview_count)
+
+    def _draw(self) -> int:
+        # https://tetris.wiki/Tetris_(NES,_Nintendo), a repeat or the extra roll value rerolls once without the check
+        piece = self.rng.randrange(self.piece_count + 1)
+        if piece == self.piece_count or piece == self.previous:
+            piece = self.rng.randrange(self.piece_count)
+        self.previous = piece
+        return piece
+
+    def _get_state(self) -> list[int]:
+        return [self.previous]
+
+    def _set_state(self, state: list[int]):
+        self.previous = state[0]
+
+
+def create_randomizer(randomizer_type: RandomizerType, piece_count: int, seed: int,
+                      preview_count: int = DEFAULT_PREVIEW_COUNT) -> PieceRandomizer:
+    match randomizer_type:
+        case RandomizerType.BAG:
+            return BagRandomizer(piece_count, seed, preview_count)
+        case RandomizerType.NES:
+            return NesRandomizer(piece_count, seed, preview_count)
+        case _:
+            return UniformRandomizer(piece_count, seed, preview_count)
+
+
+def generate_piece_sequence(randomizer_type: RandomizerType, piece_count: int, length: int, seed: int) -> bytes:
+    # a shared sequence for batch simulations, games read it from their own offsets
+    return create_randomizer(randomizer_type, piece_count, seed, 0).generate(length)
@@ -0,0 +1,26 @@
+from enums.cell_state import CellState
+
+
+class PieceShape:
+    __slots__ = ('cell_type', 'cells', 'min_row', 'max_row', 'min_col', 'max_col', 'row_masks')
+    cell_type: CellState
+    # occupied (row, col) offsets inside the piece square
+    cells: tuple[tuple[int, int], ...]
+    min_row: int
+    max_row: int
+    min_col: int
+    max_col: int
+    # occupancy bitmask for rows min_row..max_row, bit 0 is column min_col
+    row_masks: tuple[int, ...]
+
+    def __init__(self, cell_type: CellState, cells: tuple[tuple[int, int], ...]):
+        self.cell_type = cell_type
+        self.cells = cells
+        self.min_row = min(row for row, _ in cells)
+        self.max_row = max(row for row, _ in cells)
+        self.min_col = min(col for _, col in cells)
+        self.max_col = max(col for _, col in cells)
+        row_masks = [0] * (self.max_row - self.min_row + 1)
+        for row, col in cells:
+            row_masks[row - self.min_row] |= 1 << (col - self.min_col)
+        self.row_masks = tuple(row_masks)
@@ -1,14 +1,17 @@
-from enums.cell_state import CellState
+from typing import Hashable
+
 from enums.rotation import Rotation
 
 
 class PieceState:
-    piece_type: CellState
+    __slots__ = ('piece_type', 'offset_row', 'offset_col', 'rotation')
+    # key into the piece set, a CellState for the standard pieces
+    piece_type: Hashable
     offset_row: int
     offset_col: int
     rotation: Rotation
 
-    def __init__(self, piece_type: CellState, offset_row: int, offset_col: int, rotation: Rotation):
+    def __init__(self, piece_type: Hashable, offset_row: int, offset_col: int, rotation: Rotation):
         self.piece_type = piece_type
         self.offset_row = offset_row
         self.offset_col = offset_col
@@ -0,0 +1,190 @@
+from collections import OrderedDict, deque
+from typing import Callable
+
+from board_state import BoardState
+from constants import ROTATION_ORDER
+from enums.user_input_state import UserInputState
+from piece import Piece
+from piece_shape import PieceShape
+from piece_state import PieceState
+
+DEFAULT_CACHE_SIZE = 256
+
+
+class BoardFeatures:
+    aggregate_height: int
+    max_height: int
+    holes: int
+    bumpiness: int
+    cleared_lines: int
+
+    def __init__(self, rows: list[int], width: int, cleared_lines: int):
+        height = len(rows)
+        column_heights = [0] * width
+        seen_columns = 0
+        holes = 0
+        for row, row_mask in enumerate(rows):
+            holes += (seen_columns & ~row_mask).bit_count()
+            new_columns = row_mask & ~seen_columns
+            while new_columns:
+                lowest_column = new_columns & -new_columns
+                column_heights[lowest_column.bit_length() - 1] = height - row
+                new_columns ^= lowest_column
+            seen_columns |= row_mask
+        self.aggregate_height = sum(column_heights)
+        self.max_height = max(column_heights)
+        self.holes = holes
+        self.bumpiness = sum(abs(left - right) for left, right in zip(column_heights, column_heights[1:]))
+        self.cleared_lines = cleared_lines
+
+
+class WeightedHeuristic:
+    aggregate_height: float
+    cleared_lines: float
+    holes: float
+    bumpiness: float
+
+    # weights from the well-known genetic-algorithm tuned four-feature player
+    def __init__(self, aggregate_height: float = -0.510066, cleared_lines: float = 0.760666,
+                 holes: float = -0.35663, bumpiness: float = -0.184483):
+        self.aggregate_height = aggregate_height
+        self.cleared_lines = cleared_lines
+        self.holes = holes
+        self.bumpiness = bumpiness
+
+    def __call__(self, features: BoardFeatures) -> float:
+        return (self.aggregate_height * features.aggregate_height + self.cleared_lines * features.cleared_lines +
+                self.holes * features.holes + self.bumpiness * features.bumpiness)
+
+
+class Placement:
+    piece_state: PieceState
+    # inputs that move the piece from the searched position to piece_state and lock it there,
+    # each paired with the (rotation index, row, col) the piece is expected at after the input
+    inputs: list[tuple[UserInputState, tuple[int, int, int] | None]]
+    features: BoardFeatures
+    score: float
+
+    def __init__(self, piece_state: PieceState, inputs: list[tuple[UserInputState, tuple[int, int, int] | None]],
+                 features: BoardFeatures, score: float):
+        self.piece_state = piece_state
+        self.inputs = inputs
+        self.features = features
+        self.score = score
+
+
+class PlacementSearch:
+    heuristic: Callable[[BoardFeatures], float]
+    cache_size: int
+    # transposition cache, (board rows, piece type, rotation, row, col) -> placements
+    cache: OrderedDict
+    cache_hits: int
+    cache_misses: int
+
+    def __init__(self, heuristic: Callable[[BoardFeatures], float] | None = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.heuristic = heuristic if heuristic is not None else WeightedHeuristic()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # region Public methods
+    def find_placements(self, board_state: BoardState, piece_state: PieceState) -> list[Placement]:
+        rows = board_state.get_row_masks()
+        cache_key = (tuple(rows), piece_state.piece_type, piece_state.rotation,
+                     piece_state.offset_row, piece_state.offset_col)
+        placements = self.cache.get(cache_key)
+        if placements is not None:
+            self.cache_hits += 1
+            self.cache.move_to_end(cache_key)
+            return placements
+        self.cache_misses += 1
+        placements = self._search(rows, board_state.width, board_state.pieces[piece_state.piece_type], piece_state)
+        self.cache[cache_key] = placements
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return placements
+
+    def find_best_placement(self, board_state: BoardState, piece_state: PieceState) -> Placement | None:
+        return max(self.find_placements(board_state, piece_state), key=lambda placement: placement.score,
+                   default=None)
+    # endregion Public methods
+
+    # region Protected methods
+    def _search(self, rows: list[int], width: int, piece: Piece, piece_state: PieceState) -> list[Placement]:
+        shapes = [piece.get_shape(rotation) for rotation in ROTATION_ORDER]
+        height = len(rows)
+
+        def fits(rotation_index: int, row: int, col: int) -> bool:
+            shape = shapes[rotation_index]
+            board_row = row + shape.min_row
+            board_col = col + shape.min_col
+            if board_row < 0 or row + shape.max_row >= height or board_col < 0 or col + shape.max_col >= width:
+                return False
+            for mask in shape.row_masks:
+                if rows[board_row] & (mask << board_col):
+                    return False
+                board_row += 1
+            return True
+
+        start = (ROTATION_ORDER.index(piece_state.rotation), piece_state.offset_row, piece_state.offset_col)
+        if not fits(*start):
+            return []
+        parents = {start: None}
+        queue = deque([start])
+        landings = {}
+        while queue:
+            state = queue.popleft()
+            rotation_index, row, col = state
+            moves = ((UserInputState.D_DOWN, (rotation_index, row + 1, col)),
+                     (UserInputState.D_LEFT, (rotation_index, row, col - 1)),
+                     (UserInputState.D_RIGHT, (rotation_index, row, col + 1)),
+                     (UserInputState.D_ROTATE, ((rotation_index + 1) % len(ROTATION_ORDER), row, col)))
+            for user_input_state, next_state in moves:
+                if next_state in parents:
+                    continue
+                if fits(*next_state):
+                    parents[next_state] = (state, user_input_state)
+                    queue.append(next_state)
+                elif user_input_state == UserInputState.D_DOWN:
+                    # symmetric rotations give the same cells, keep the first (shortest path) one
+                    shape = shapes[rotation_index]
+                    landing_key = (piece.get_canonical_rotation(ROTATION_ORDER[rotation_index]),
+                                   row + shape.min_row, col + shape.min_col)
+                    landings.setdefault(landing_key, state)
+
+        placements = []
+        for state in landings.values():
+            rotation_index, row, col = state
+            placed_rows, cleared_lines = self._place(rows, width, shapes[rotation_index], row, col)
+            features = BoardFeatures(placed_rows, width, cleared_lines)
+            placements.append(Placement(PieceState(piece_state.piece_type, row, col, ROTATION_ORDER[rotation_index]),
+                                        self._build_inputs(parents, state), features, self.heuristic(features)))
+        return placements
+
+    def _place(self, rows: list[int], width: int, shape: PieceShape, row: int, col: int) -> tuple[list[int], int]:
+        placed_rows = list(rows)
+        board_row = row + shape.min_row
+        for mask in shape.row_masks:
+            placed_rows[board_row] |= mask << (col + shape.min_col)
+            board_row += 1
+        full_row_mask = (1 << width) - 1
+        kept_rows = [row_mask for row_mask in placed_rows if row_mask != full_row_mask]
+        cleared_lines = len(placed_rows) - len(kept_rows)
+        return [0] * cleared_lines + kept_rows, cleared_lines
+
+    def _build_inputs(self, parents: dict, state: tuple[int, int, int]) \
+            -> list[tuple[UserInputState, tuple[int, int, int] | None]]:
+        inputs = []
+        while parents[state] is not None:
+            parent_state, user_input_state = parents[state]
+            inputs.append((user_input_state, state))
+            state = parent_state
+        inputs.reverse()
+        # the final straight fall is a single hard drop that also locks the piece
+        while inputs and inputs[-1][0] == UserInputState.D_DOWN:
+            inputs.pop()
+        inputs.append((UserInputState.D_HARD_DROP, None))
+        return inputs
+    # endregion Protected methods
@@ -0,0 +1,113 @@
+import time
+
+import pygame as pg
+
+from board_state import BoardState
+from constants import GRID_SIZE, HUD_HEIGHT, PIECES, BASE_COLOR, LIGHT_COLOR, DARK_COLOR
+from enums.cell_state import CellState
+from enums.frame_phase import FramePhase
+from enums.game_phase import GamePhase
+from enums.text_alignment import TextAlignment
+from frame_profiler import FrameProfiler
+from piece_state import PieceState
+from tetris_engine import TetrisEngine
+
+
+# region RENDER
+def draw_cell(surface: pg.Surface, cell: CellState, col: int, row: int, offset_x: int, offset_y: int,
+              outline: bool = False, grid_size: int = GRID_SIZE):
+    edge = grid_size // 8
+    x = offset_x + col * grid_size
+    y = offset_y + row * grid_size
+
+    outer_rect = pg.Rect(x, y, grid_size, grid_size)
+    nested_rect = pg.Rect(x + edge, y, grid_size - edge, grid_size - edge)
+    inner_rect = pg.Rect(x + edge, y + edge, grid_size - 2 * edge, grid_size - 2 * edge)
+
+    if outline:
+        pg.draw.rect(surface, BASE_COLOR[cell], outer_rect, 1)
+        return
+
+    pg.draw.rect(surface, DARK_COLOR[cell], outer_rect)
+    pg.draw.rect(surface, LIGHT_COLOR[cell], nested_rect)
+    pg.draw.rect(surface, BASE_COLOR[cell], inner_rect)
+
+
+def draw_piece(surface: pg.Surface, piece_state: PieceState,
+               offset_col: int, offset_row: int, offset_x: int, offset_y: int, outline: bool = False,
+               grid_size: int = GRID_SIZE, pieces: dict = PIECES):
+    shape = pieces[piece_state.piece_type].get_shape(piece_state.rotation)
+    for row, col in shape.cells:
+        draw_cell(surface, shape.cell_type, offset_col + col, offset_row + row, offset_x, offset_y, outline,
+                  grid_size)
+
+
+def draw_board(surface: pg.Surface, board_state: BoardState, height: int, width: int, offset_x: int, offset_y: int,
+               grid_size: int = GRID_SIZE):
+    for row in range(0, height):
+        for col in range(0, width):
+            cell = board_state.get_matrix_cell(row, col)
+            draw_cell(surface, cell, col, row, offset_x, offset_y, False, grid_size)
+
+
+def draw_text(surface: pg.Surface, font: pg.font.Font, text: str, x: int, y: int,
+              text_align: TextAlignment = TextAlignment.LEFT):
+    dst_surface_rect = surface.get_rect()
+    text_surface = font.render(text, True, (220, 220, 220))
+    match text_align:
+        case TextAlignment.CENTER:
+            text_rect = text_surface.get_rect(center=(dst_surface_rect.width // 2, y))
+        case TextAlignment.RIGHT:
+            text_rect = text_surface.get_rect(topright=(x, y))
+        case _:
+            # TextAlignment.LEFT
+            text_rect = text_surface.get_rect(topleft=(x, y))
+    surface.blit(text_surface, text_rect)
+
+
+def render(surface: pg.Surface, font: pg.font.Font, game_state: TetrisEngine, height: int, width: int,
+           profiler: FrameProfiler | None = None, piece_offset_y: int = 0):
+    start_ns = time.perf_counter_ns() if profiler is not None else 0
+    surface.fill((0, 0, 0))
+    padding_y = HUD_HEIGHT
+    grid_size = game_state.configuration.grid_size
+    pieces = game_state.configuration.pieces
+    draw_board(surface, game_state.board_state, height, width, 0, padding_y, grid_size)
+    if profiler is not None:
+        start_ns = profiler.record(FramePhase.RENDER_BOARD, start_ns)
+    match game_state.game_phase:
+        case GamePhase.PLAYING:
+            draw_piece(surface, game_state.piece_state,
+                       game_state.piece_state.offset_col, game_state.piece_state.offset_row, 0,
+                       padding_y + piece_offset_y, False, grid_size, pieces)
+            draw_piece(surface, game_state.piece_state,
+                       game_state.piece_state.offset_col, game_state.get_landing_row(), 0, padding_y, True,
+                       grid_size, pieces)
+
+        case GamePhase.CLEARING_LINE:
+            for row in range(height):
+                if game_state.board_state.pending_lines[row]:
+                    pg.draw.rect(surface, (255, 255, 255), pg.Rect(0, padding_y + row * grid_size,
+                                                                   width * grid_size, grid_size))
+
+        case GamePhase.GAME_OVER:
+            rect = surface.get_rect()
+            x, y = rect.center
+            draw_text(surface, font, 'GAME OVER', x, padding_y + y, TextAlignment.CENTER)
+
+        case GamePhase.START:
+            rect = surface.get_rect()
+            x, y = rect.center
+            draw_text(surface, font, 'PRESS START', x, padding_y + y, TextAlignment.CENTER)
+            draw_text(surface, font, f'Select level: {game_state.start_level}',
+                      x, padding_y + y + 40, TextAlignment.CENTER)
+
+    if profiler is not None:
+        start_ns = profiler.record(FramePhase.RENDER_PHASE, start_ns)
+
+    draw_text(surface, font, f'LEVEL {game_state.level}', 5, 5)
+    draw_text(surface, font, f'Score: {game_state.score}', 5, 40)
+    draw_text(surface, font, f'Lines count: {game_state.cleared_lines_count}', 5, 80)
+    if profiler is not None:
+        profiler.record(FramePhase.RENDER_HUD, start_ns)
+# endregion RENDER
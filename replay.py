@@ -0,0 +1,116 @@
+import struct
+from typing import BinaryIO, Iterator
+
+from enums.randomizer_type import RandomizerType
+from enums.user_input_state import UserInputState
+
+# header: magic, format version, piece generator seed, start level, RandomizerType value
+HEADER = struct.Struct('<4sBQHB')
+MAGIC = b'TRPL'
+VERSION = 2
+# version 1 has no randomizer type, its piece sequence is the one of RandomizerType.UNIFORM
+HEADER_V1 = struct.Struct('<4sBQH')
+# record: logic frames advanced before the input is applied, UserInputState value.
+# A frame delta of 0 applies the input to the frame of the previous record.
+RECORD = struct.Struct('<Hb')
+MAX_FRAME_DELTA = 0xFFFE
+# end of stream record, followed by the final TetrisEngine.get_state_hash() digest
+END_FRAME_DELTA = 0xFFFF
+END_INPUT = -128
+DIGEST_SIZE = 16
+RECORDS_PER_CHUNK = 4096
+INPUT_STATES = {user_input_state.value: user_input_state for user_input_state in UserInputState}
+
+
+class ReplayWriter:
+    file: BinaryIO
+    seed: int
+    start_level: int
+    randomizer_type: RandomizerType
+    # logic frames stepped with no input since the last written record
+    pending_frames: int
+    buffer: bytearray
+
+    def __init__(self, file: BinaryIO, seed: int, start_level: int = 0,
+                 randomizer_type: RandomizerType = RandomizerType.UNIFORM):
+        self.file = file
+        self.seed = seed
+        self.start_level = start_level
+        self.randomizer_type = randomizer_type
+        self.pending_frames = 0
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION, seed, start_level, randomizer_type.value))
+
+    def __enter__(self) -> 'ReplayWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    # region Public methods
+    def write_step(self, user_input_state: UserInputState):
+        # TetrisEngine.step(user_input_state)
+        self.pending_frames += 1
+        if user_input_state != UserInputState.D_NONE or self.pending_frames == MAX_FRAME_DELTA:
+            self._write_record(self.pending_frames, user_input_state)
+
+    def write_update(self, user_input_state: UserInputState):
+        # TetrisEngine.update(user_input_state), an extra input in the current frame
+        if self.pending_frames:
+            self._write_record(self.pending_frames, UserInputState.D_NONE)
+        self._write_record(0, user_input_state)
+
+    def close(self, state_hash: bytes):
+        if self.pending_frames:
+            self._write_record(self.pending_frames, UserInputState.D_NONE)
+        self.buffer += RECORD.pack(END_FRAME_DELTA, END_INPUT)
+        self.buffer += state_hash
+        self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+    # endregion Public methods
+
+    # region Protected methods
+    def _write_record(self, frame_delta: int, user_input_state: UserInputState):
+        self.buffer += RECORD.pack(frame_delta, user_input_state.value)
+        self.pending_frames = 0
+        if len(self.buffer) >= RECORD.size * RECORDS_PER_CHUNK:
+            self.flush()
+    # endregion Protected methods
+
+
+class ReplayReader:
+    file: BinaryIO
+    seed: int
+    start_level: int
+    randomizer_type: RandomizerType
+    # final state hash, available once all records were read, None for truncated recordings
+    state_hash: bytes | None
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        magic, version, self.seed, self.start_level = HEADER_V1.unpack(file.read(HEADER_V1.size))
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError(f'unsupported replay format {magic!r} version {version}')
+        self.randomizer_type = RandomizerType.UNIFORM
+        if version == VERSION:
+            self.randomizer_type = RandomizerType(file.read(HEADER.size - HEADER_V1.size)[0])
+        self.state_hash = None
+
+    def __iter__(self) -> Iterator[tuple[int, UserInputState]]:
+        leftover = b''
+        while True:
+            chunk = leftover + self.file.read(RECORD.size * RECORDS_PER_CHUNK)
+            whole_records = len(chunk) - len(chunk) % RECORD.size
+            if not whole_records:
+                return
+            for index, (frame_delta, input_value) in enumerate(RECORD.iter_unpack(chunk[:whole_records])):
+                if frame_delta == END_FRAME_DELTA and input_value == END_INPUT:
+                    digest = chunk[(index + 1) * RECORD.size:]
+                    digest += self.file.read(max(DIGEST_SIZE - len(digest), 0))
+                    self.state_hash = digest[:DIGEST_SIZE]
+                    return
+                yield frame_delta, INPUT_STATES[input_value]
+            leftover = chunk[whole_records:]
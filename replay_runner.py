@@ -0,0 +1,40 @@
+import sys
+import time
+
+from bit_board_state import BitBoardState
+from enums.user_input_state import UserInputState
+from game_configuration import GameConfiguration, DEFAULT_CONFIGURATION
+from replay import ReplayReader
+from tetris_engine import TetrisEngine
+
+
+def run_replay(path: str, board_type: type = BitBoardState,
+               configuration: GameConfiguration = DEFAULT_CONFIGURATION) -> TetrisEngine:
+    # configuration must match the one the replay was recorded with, but for the randomizer the replay names
+    with open(path, 'rb') as file:
+        reader = ReplayReader(file)
+        if reader.randomizer_type != configuration.randomizer_type:
+            configuration = GameConfiguration(configuration.width, configuration.height, configuration.grid_size,
+                                              configuration.pieces, reader.randomizer_type,
+                                              configuration.preview_count)
+        engine = TetrisEngine(board_type, reader.seed, configuration)
+        engine.start_level = reader.start_level
+        for frame_delta, user_input_state in reader:
+            if frame_delta == 0:
+                engine.update(user_input_state)
+                continue
+            for _ in range(frame_delta - 1):
+                engine.step(UserInputState.D_NONE)
+            engine.step(user_input_state)
+    if reader.state_hash is not None and reader.state_hash != engine.get_state_hash():
+        raise ValueError(f'{path}: final state hash mismatch')
+    return engine
+
+
+if __name__ == '__main__':
+    for replay_path in sys.argv[1:]:
+        start_time = time.perf_counter()
+        replay_engine = run_replay(replay_path)
+        elapsed_time = time.perf_counter() - start_time
+        print(f'{replay_path}: {replay_engine.frame} frames in {elapsed_time:.3f}s '
+              f'({replay_engine.frame / elapsed_time:.0f} frames/s), score {replay_engine.score}')
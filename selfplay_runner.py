@@ -0,0 +1,187 @@
+import argparse
+import io
+import os
+import random
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bit_board_state import BitBoardState
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from stats_store import StatsStore
+from tetris_bot import TetrisBot
+from tetris_engine import TetrisEngine
+
+COLUMNS = ('seed', 'start_level', 'score', 'lines', 'level', 'frames', 'pieces')
+# file header: magic, index in PLAYERS, start level, max frames, games, shard size; followed by the blocks
+FILE_HEADER = struct.Struct('<4sBIQQI')
+FILE_MAGIC = b'TSPR'
+RUN_PARAMETERS = ('player', 'start_level', 'max_frames', 'games', 'shard_size')
+# block header: magic, shard id, games in the block, column count; followed by one int64 array per column
+BLOCK_HEADER = struct.Struct('<4sIII')
+BLOCK_MAGIC = b'TSPB'
+PLAYERS = ('random', 'bot')
+RANDOM_PLAYER_INPUTS = [UserInputState.D_NONE] * 4 + [UserInputState.D_LEFT, UserInputState.D_RIGHT,
+                                                      UserInputState.D_ROTATE, UserInputState.D_DOWN,
+                                                      UserInputState.D_HARD_DROP]
+
+
+def play_game(seed: int, player: str, start_level: int, max_frames: int) -> TetrisEngine:
+    engine = TetrisEngine(BitBoardState, seed)
+    engine.start_level = start_level
+    engine.step(UserInputState.D_HARD_DROP)
+    match player:
+        case 'bot':
+            bot = TetrisBot(restart=False)
+            while engine.game_phase != GamePhase.GAME_OVER and engine.frame < max_frames:
+                engine.step(bot.choose_input(engine))
+        case _:
+            input_rng = random.Random(seed)
+            while engine.game_phase != GamePhase.GAME_OVER and engine.frame < max_frames:
+                engine.step(input_rng.choice(RANDOM_PLAYER_INPUTS))
+    return engine
+
+
+def play_shard(shard_id: int, shard_size: int, games: int, player: str, start_level: int,
+               max_frames: int) -> tuple[int, bytes]:
+    columns = [array('q') for _ in COLUMNS]
+    seed_column, start_level_column, score_column, lines_column, level_column, frames_column, pieces_column = columns
+    # the last shard stops at games
+    for seed in range(shard_id * shard_size, min((shard_id + 1) * shard_size, games)):
+        engine = play_game(seed, player, start_level, max_frames)
+        seed_column.append(seed)
+        start_level_column.append(engine.start_level)
+        score_column.append(engine.score)
+        lines_column.append(engine.cleared_lines_count)
+        level_column.append(engine.level)
+        frames_column.append(engine.frame)
+        pieces_column.append(engine.pieces_count)
+    return shard_id, BLOCK_HEADER.pack(BLOCK_MAGIC, shard_id, len(seed_column), len(COLUMNS)) + \
+        b''.join(column.tobytes() for column in columns)
+
+
+def pack_file_header(player: str, start_level: int, max_frames: int, games: int, shard_size: int) -> bytes:
+    return FILE_HEADER.pack(FILE_MAGIC, PLAYERS.index(player), start_level, max_frames, games, shard_size)
+
+
+def _unpack_file_header(header: bytes) -> dict | None:
+    # run parameters by name, None when header is not a results file header
+    if len(header) != FILE_HEADER.size:
+        return None
+    magic, player_index, *values = FILE_HEADER.unpack(header)
+    if magic != FILE_MAGIC or player_index >= len(PLAYERS):
+        return None
+    return dict(zip(RUN_PARAMETERS, [PLAYERS[player_index], *values]))
+
+
+def _iter_blocks(file, truncate: bool = False):
+    # yields (shard id, column arrays) of every complete block, a trailing partial block is cut off when truncate
+    while True:
+        block_start = file.tell()
+        header = file.read(BLOCK_HEADER.size)
+        if len(header) == BLOCK_HEADER.size:
+            magic, shard_id, count, column_count = BLOCK_HEADER.unpack(header)
+            data = file.read(8 * count * column_count)
+            if magic == BLOCK_MAGIC and len(data) == 8 * count * column_count:
+                columns = []
+                for column_index in range(column_count):
+                    column = array('q')
+                    column.frombytes(data[8 * count * column_index:8 * count * (column_index + 1)])
+                    columns.append(column)
+                yield shard_id, columns
+                continue
+        if truncate:
+            file.truncate(block_start)
+        return
+
+
+def read_results(path: str) -> dict[str, array]:
+    results = {name: array('q') for name in COLUMNS}
+    with open(path, 'rb') as file:
+        if _unpack_file_header(file.read(FILE_HEADER.size)) is None:
+            raise ValueError(f'{path} is not a self-play results file')
+        for _, columns in _iter_blocks(file):
+            for name, column in zip(COLUMNS, columns):
+                results[name].extend(column)
+    return results
+
+
+def get_finished_shards(path: str, file_header: bytes) -> set[int]:
+    # shards already in the results file, which must come from a run with the same parameters
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r+b') as file:
+        header = file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size and file_header.startswith(header):
+            # interrupted before the header was written
+            file.truncate(0)
+            return set()
+        if header != file_header:
+            run_parameters = _unpack_file_header(header)
+            if run_parameters is None:
+                raise ValueError(f'{path} is not a self-play results file')
+            differences = ', '.join(f'{name} {value} instead of {run_parameters[name]}'
+                                    for name, value in _unpack_file_header(file_header).items()
+                                    if value != run_parameters[name])
+            raise ValueError(f'{path} holds the results of another run, resuming it with {differences} would mix '
+                             f'them, use a new output file')
+        return {shard_id for shard_id, _ in _iter_blocks(file, truncate=True)}
+
+
+def record_block_stats(stats_store: StatsStore, session_id: int, block: bytes):
+    # results only have the COLUMNS counts, the game number of a self-play game is its seed
+    ended_at = time.time()
+    for _, columns in _iter_blocks(io.BytesIO(block)):
+        for seed, start_level, score, lines, level, frames, pieces in zip(*columns):
+            stats_store.record_game(session_id, seed, seed, start_level, level, score, lines, pieces, None, None, None,
+                                    frames, ended_at)
+
+
+def run(path: str, games: int, shard_size: int, player: str, start_level: int, max_frames: int,
+        workers: int | None = None, stats_store: StatsStore | None = None):
+    shard_count = (games + shard_size - 1) // shard_size
+    file_header = pack_file_header(player, start_level, max_frames, games, shard_size)
+    finished_shards = get_finished_shards(path, file_header)
+    pending_shards = [shard_id for shard_id in range(shard_count) if shard_id not in finished_shards]
+    start_time = time.perf_counter()
+    session_id = time.time_ns()
+    played_games = 0
+    with open(path, 'ab') as output, ProcessPoolExecutor(max_workers=workers) as executor:
+        if not output.tell():
+            output.write(file_header)
+        futures = [executor.submit(play_shard, shard_id, shard_size, games, player, start_level, max_frames)
+                   for shard_id in pending_shards]
+        for done_count, future in enumerate(as_completed(futures), 1):
+            shard_id, block = future.result()
+            played_games += min((shard_id + 1) * shard_size, games) - shard_id * shard_size
+            output.write(block)
+            output.flush()
+            if stats_store is not None:
+                record_block_stats(stats_store, session_id, block)
+            elapsed_time = time.perf_counter() - start_time
+            print(f'{done_count}/{len(pending_shards)} shards, '
+                  f'{played_games / elapsed_time:.0f} games/s', flush=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play seeded headless games on all cores.')
+    parser.add_argument('output', help='results file, finished shards in it are skipped')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--shard-size', type=int, default=250)
+    parser.add_argument('--player', choices=PLAYERS, default='random')
+    parser.add_argument('--start-level', type=int, default=0)
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 10)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--stats', help='SQLite stats database the finished games are also recorded in')
+    arguments = parser.parse_args()
+    stats = StatsStore(arguments.stats) if arguments.stats else None
+    try:
+        run(arguments.output, arguments.games, arguments.shard_size, arguments.player, arguments.start_level,
+            arguments.max_frames, arguments.workers, stats)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if stats is not None:
+            stats.close()
@@ -0,0 +1,55 @@
+import os
+
+import pygame as pg
+
+from board_compositor import BoardCompositor
+from frame_profiler import FrameProfiler
+from game import Game
+from game_configuration import GameConfiguration, DEFAULT_CONFIGURATION
+from tetris_bot import TetrisBot
+from tetris_engine import TetrisEngine
+
+WALL_WINDOW_SIZE = (1920, 1080)
+
+
+class SpectatorWall(Game):
+    engines: list[TetrisEngine]
+    # one per engine, a None entry is left to whoever drives the engine from outside
+    bots: list[TetrisBot | None]
+    compositor: BoardCompositor
+
+    def __init__(self, engines: list[TetrisEngine], bots: list[TetrisBot | None] | None = None,
+                 frame_rate: int = 60, profiler: FrameProfiler | None = None,
+                 window_size: tuple[int, int] = WALL_WINDOW_SIZE):
+        super().__init__(frame_rate, profiler, window_size)
+        self.engines = engines
+        self.bots = bots if bots is not None else [None] * len(engines)
+        configuration = engines[0].configuration if engines else DEFAULT_CONFIGURATION
+        self.compositor = BoardCompositor(self.screen, len(engines), configuration)
+
+    # region Public methods
+    def tick(self):
+        for engine, bot in zip(self.engines, self.bots):
+            if bot is not None:
+                engine.step(bot.choose_input(engine))
+        super().tick()
+
+    def render(self) -> list[pg.Rect] | None:
+        return self.compositor.render(self.engines, self.profiler)
+    # endregion Public methods
+
+
+if __name__ == '__main__':
+    # TETRIS_WALL_BOARDS=<count> bot games, TETRIS_WALL_WINDOW=<width>x<height>
+    board_count = int(os.environ.get('TETRIS_WALL_BOARDS', 16))
+    wall_window_size = tuple(map(int, os.environ.get('TETRIS_WALL_WINDOW', 'x'.join(map(str, WALL_WINDOW_SIZE)))
+                                 .split('x')))
+    profile_path = os.environ.get('TETRIS_PROFILE')
+    show_profile_overlay = os.environ.get('TETRIS_PROFILE_OVERLAY') == '1'
+    frame_profiler = None
+    if profile_path or show_profile_overlay:
+        frame_profiler = FrameProfiler(60, summary_path=profile_path, show_overlay=show_profile_overlay)
+    game_configuration = GameConfiguration()
+    SpectatorWall([TetrisEngine(seed=index, configuration=game_configuration) for index in range(board_count)],
+                  [TetrisBot() for _ in range(board_count)], profiler=frame_profiler,
+                  window_size=wall_window_size).run()
@@ -0,0 +1,227 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from tetris_engine import TetrisEngine
+
+TETRIS_LINES = 4
+# engine seeds are unsigned 64-bit, games.seed keeps them as the signed 64-bit integers SQLite stores
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY, started_at REAL, ended_at REAL, games INTEGER, rendered_frames INTEGER,
+    mean_frame_ms REAL);
+CREATE TABLE IF NOT EXISTS games (
+    game_id INTEGER PRIMARY KEY, session_id INTEGER, game_number INTEGER, seed INTEGER, start_level INTEGER,
+    level INTEGER, score INTEGER, cleared_lines INTEGER, pieces INTEGER, tetrises INTEGER, line_clears INTEGER,
+    inputs INTEGER, frames INTEGER, ended_at REAL);
+CREATE INDEX IF NOT EXISTS games_by_start_level ON games (start_level, score DESC);
+CREATE TABLE IF NOT EXISTS game_progress (
+    session_id INTEGER, game_number INTEGER, frame INTEGER, level INTEGER, score INTEGER, cleared_lines INTEGER,
+    pieces INTEGER, inputs INTEGER, recorded_at REAL);
+'''
+INSERTS = {
+    'sessions': 'INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)',
+    'games': 'INSERT INTO games (session_id, game_number, seed, start_level, level, score, cleared_lines, pieces, '
+             'tetrises, line_clears, inputs, frames, ended_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'game_progress': 'INSERT INTO game_progress VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+}
+# (score, level, cleared lines, tetris rate, ended at) of the best games started at a start level
+LEADERBOARD_QUERY = (
+    'SELECT score, level, cleared_lines, '
+    f'CASE WHEN cleared_lines > 0 THEN {TETRIS_LINES} * tetrises * 1.0 / cleared_lines END, ended_at '
+    'FROM games WHERE start_level = ? ORDER BY score DESC LIMIT ?')
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_FLUSH_INTERVAL = 0.5
+# logic frames between two game_progress rows of a running game, 10 seconds at 60 Hz
+PROGRESS_INTERVAL_FRAMES = 600
+SEED_BITS = 64
+CLOSE = None
+
+
+def to_signed_seed(seed: int) -> int:
+    return seed - (1 << SEED_BITS) if seed >= 1 << (SEED_BITS - 1) else seed
+
+
+def to_unsigned_seed(stored_seed: int) -> int:
+    return stored_seed & ((1 << SEED_BITS) - 1)
+
+
+class StatsStore:
+    path: str
+    batch_size: int
+    # seconds a row may wait in memory before it is written
+    flush_interval: float
+    # (table, row) tuples for the writer thread, CLOSE ends it
+    rows: queue.SimpleQueue
+    writer_thread: threading.Thread
+    # queries from the thread that opened the store, WAL lets them run while the writer commits
+    read_connection: sqlite3.Connection
+    # rows SQLite refused, e.g. integers out of its range, written by the writer thread
+    dropped_row_count: int
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows = queue.SimpleQueue()
+        self.dropped_row_count = 0
+        self.read_connection = sqlite3.connect(path)
+        self.read_connection.execute('PRAGMA journal_mode=WAL')
+        self.read_connection.executescript(SCHEMA)
+        self.writer_thread = threading.Thread(target=self._write_rows, name='stats-writer', daemon=True)
+        self.writer_thread.start()
+
+    def __enter__(self) -> 'StatsStore':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # region Public methods
+    def record_session(self, session_id: int, started_at: float, ended_at: float, games: int, rendered_frames: int,
+                       mean_frame_ms: float | None):
+        self.rows.put(('sessions', (session_id, started_at, ended_at, games, rendered_frames, mean_frame_ms)))
+
+    def record_game(self, session_id: int, game_number: int, seed: int, start_level: int, level: int, score: int,
+                    cleared_lines: int, pieces: int, tetrises: int | None, line_clears: int | None,
+                    inputs: int | None, frames: int, ended_at: float):
+        # unknown counts are None, e.g. for games summarised from self-play results
+        self.rows.put(('games', (session_id, game_number, to_signed_seed(seed), start_level, level, score,
+                                 cleared_lines, pieces, tetrises, line_clears, inputs, frames, ended_at)))
+
+    def record_progress(self, session_id: int, game_number: int, frame: int, level: int, score: int,
+                        cleared_lines: int, pieces: int, inputs: int, recorded_at: float):
+        self.rows.put(('game_progress', (session_id, game_number, frame, level, score, cleared_lines, pieces, inputs,
+                                         recorded_at)))
+
+    def close(self):
+        # writes everything recorded so far
+        if self.writer_thread.is_alive():
+            self.rows.put(CLOSE)
+            self.writer_thread.join()
+        self.read_connection.close()
+
+    def get_leaderboard(self, start_level: int, limit: int = 10) -> list[tuple]:
+        return self.read_connection.execute(LEADERBOARD_QUERY, (start_level, limit)).fetchall()
+    # endregion Public methods
+
+    # region Protected methods
+    def _write_rows(self):
+        connection = sqlite3.connect(self.path)
+        # WAL commits only append to the log, NORMAL skips the fsync per commit
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        pending_rows = {table: [] for table in INSERTS}
+        pending_count = 0
+        flush_time = time.monotonic() + self.flush_interval
+        is_open = True
+        while is_open:
+            try:
+                item = self.rows.get(timeout=max(flush_time - time.monotonic(), 0))
+            except queue.Empty:
+                item = ()
+            if item is CLOSE:
+                is_open = False
+            elif item:
+                table, row = item
+                pending_rows[table].append(row)
+                pending_count += 1
+            if not is_open or pending_count >= self.batch_size or time.monotonic() >= flush_time:
+                if pending_count:
+                    self._write_batch(connection, pending_rows)
+                    pending_count = 0
+                flush_time = time.monotonic() + self.flush_interval
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, pending_rows: dict[str, list[tuple]]):
+        try:
+            with connection:
+                for table, rows in pending_rows.items():
+                    if rows:
+                        connection.executemany(INSERTS[table], rows)
+        except (sqlite3.Error, OverflowError):
+            # the batch was rolled back, writing it row by row loses only the rows SQLite refuses
+            for table, rows in pending_rows.items():
+                for row in rows:
+                    try:
+                        with connection:
+                            connection.execute(INSERTS[table], row)
+                    except (sqlite3.Error, OverflowError):
+                        self.dropped_row_count += 1
+        for rows in pending_rows.values():
+            rows.clear()
+    # endregion Protected methods
+
+
+class GameStatsTracker:
+    store: StatsStore
+    session_id: int
+    engine: TetrisEngine
+    # games started in this session, numbers the game being played
+    game_number: int
+    # counts of the game being played
+    inputs: int
+    tetrises: int
+    line_clears: int
+    first_frame: int
+    next_progress_frame: int
+    # engine values seen by the last update
+    game_phase: GamePhase
+    cleared_lines_count: int
+
+    def __init__(self, store: StatsStore, session_id: int, engine: TetrisEngine):
+        self.store = store
+        self.session_id = session_id
+        self.engine = engine
+        # a game already running when tracking starts counts as the first one
+        self.game_number = 0 if engine.game_phase == GamePhase.START else 1
+        self.game_phase = engine.game_phase
+        self._start_game()
+
+    # region Public methods
+    def record_input(self, user_input_state: UserInputState):
+        if user_input_state != UserInputState.D_NONE:
+            self.inputs += 1
+
+    def update(self):
+        # after every logic tick, compares the engine with the last tick
+        engine = self.engine
+        if engine.game_phase == self.game_phase and engine.cleared_lines_count == self.cleared_lines_count and \
+                engine.frame < self.next_progress_frame:
+            return
+        # a hard drop on the game over screen and one in the start screen can restart within one tick
+        if self.game_phase in (GamePhase.START, GamePhase.GAME_OVER) and \
+                engine.game_phase in (GamePhase.PLAYING, GamePhase.CLEARING_LINE):
+            self.game_number += 1
+            self._start_game()
+        if engine.cleared_lines_count > self.cleared_lines_count:
+            self.line_clears += 1
+            if engine.cleared_lines_count - self.cleared_lines_count >= TETRIS_LINES:
+                self.tetrises += 1
+        self.cleared_lines_count = engine.cleared_lines_count
+        if engine.game_phase == GamePhase.GAME_OVER and self.game_phase != GamePhase.GAME_OVER:
+            self.store.record_game(self.session_id, self.game_number, engine.seed, engine.start_level, engine.level,
+                                   engine.score, engine.cleared_lines_count, engine.pieces_count, self.tetrises,
+                                   self.line_clears, self.inputs, engine.frame - self.first_frame, time.time())
+        elif engine.frame >= self.next_progress_frame:
+            if engine.game_phase in (GamePhase.PLAYING, GamePhase.CLEARING_LINE):
+                self.store.record_progress(self.session_id, self.game_number, engine.frame - self.first_frame,
+                                           engine.level, engine.score, engine.cleared_lines_count,
+                                           engine.pieces_count, self.inputs, time.time())
+            self.next_progress_frame = engine.frame + PROGRESS_INTERVAL_FRAMES
+        self.game_phase = engine.game_phase
+    # endregion Public methods
+
+    # region Protected methods
+    def _start_game(self):
+        self.inputs = 0
+        self.tetrises = 0
+        self.line_clears = 0
+        self.first_frame = self.engine.frame
+        self.next_progress_frame = self.engine.frame + PROGRESS_INTERVAL_FRAMES
+        self.cleared_lines_count = self.engine.cleared_lines_count
+    # endregion Protected methods
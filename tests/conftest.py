@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+import font_cache
+
+# the game state tests open a window, the dummy driver needs no display
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+
+@pytest.fixture(autouse=True)
+def font_index(tmp_path, monkeypatch):
+    # fonts are looked up through an index in tmp_path, never the one in the user's home
+    monkeypatch.setenv('TETRIS_FONT_INDEX', str(tmp_path / 'font_index.json'))
+    monkeypatch.setattr(font_cache, 'font_paths', None)
@@ -0,0 +1,90 @@
+import gc
+import tracemalloc
+from typing import Callable
+
+import pytest
+
+from benchmarks.fixtures import BOARD_KINDS, make_engine
+from bit_board_state import BitBoardState
+from board_state import BoardState
+from constants import FRAMES_PER_DROP
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from tetris_engine import TetrisEngine
+
+FRAMES = 32
+# inputs that keep the piece in the air, so every measured frame is a steady-state one
+STEADY_INPUTS = (UserInputState.D_NONE, UserInputState.D_LEFT, UserInputState.D_ROTATE, UserInputState.D_RIGHT,
+                 UserInputState.D_NONE, UserInputState.D_RIGHT, UserInputState.D_ROTATE, UserInputState.D_LEFT)
+# the same with soft drops, for the frames that also move the piece down
+FALLING_INPUTS = (UserInputState.D_NONE, UserInputState.D_LEFT, UserInputState.D_DOWN, UserInputState.D_RIGHT,
+                  UserInputState.D_NONE, UserInputState.D_ROTATE, UserInputState.D_DOWN, UserInputState.D_ROTATE)
+GRAVITY_LEVEL = max(FRAMES_PER_DROP)
+# few enough for the piece to stay in the air on the half full board
+FALLING_FRAMES = 16
+# boards with room for the piece to fall through all the measured frames
+GRAVITY_BOARD_KINDS = ['empty', 'half_full', 'tetris_ready']
+BOARD_TYPES = [BoardState, BitBoardState]
+
+
+def measure_steps(engine: TetrisEngine, inputs: tuple[UserInputState, ...]) -> tuple[int, int]:
+    start_memory, _ = tracemalloc.get_traced_memory()
+    start_gc_count = gc.get_count()[0]
+    for user_input_state in inputs:
+        engine.step(user_input_state)
+    gc_allocations = gc.get_count()[0] - start_gc_count
+    end_memory, _ = tracemalloc.get_traced_memory()
+    return end_memory - start_memory, gc_allocations
+
+
+def measure(engine: TetrisEngine, inputs: tuple[UserInputState, ...],
+            prepare: Callable[[], None]) -> tuple[int, int]:
+    # (net traced bytes, garbage collector tracked allocations) of the frames, prepare runs before every pass
+    pieces_count = engine.pieces_count
+    gc.disable()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # the first pass warms up caches, an empty pass measures the cost of measuring
+        prepare()
+        measure_steps(engine, inputs)
+        prepare()
+        baseline_bytes, baseline_gc_allocations = measure_steps(engine, ())
+        net_bytes, gc_allocations = measure_steps(engine, inputs)
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    assert engine.pieces_count == pieces_count and engine.game_phase == GamePhase.PLAYING, \
+        'the piece locked during the measurement'
+    return net_bytes - baseline_bytes, gc_allocations - baseline_gc_allocations
+
+
+@pytest.mark.parametrize('board_type', BOARD_TYPES)
+@pytest.mark.parametrize('board_kind', BOARD_KINDS)
+def test_steady_frames_allocate_nothing(board_kind: str, board_type: type):
+    engine = make_engine(board_kind, board_type)
+    # gravity is pushed past both passes, the piece only moves and rotates
+    engine.next_frame_to_drop = engine.frame + 2 * FRAMES + 1
+    inputs = tuple(STEADY_INPUTS[frame % len(STEADY_INPUTS)] for frame in range(FRAMES))
+    assert measure(engine, inputs, lambda: None) == (0, 0)
+
+
+@pytest.mark.parametrize('board_type', BOARD_TYPES)
+@pytest.mark.parametrize('board_kind', GRAVITY_BOARD_KINDS)
+def test_falling_frames_allocate_nothing(board_kind: str, board_type: type):
+    engine = make_engine(board_kind, board_type)
+    engine.level = GRAVITY_LEVEL
+    piece_state = engine.piece_state
+    start_row = piece_state.offset_row
+    inputs = tuple(FALLING_INPUTS[frame % len(FALLING_INPUTS)] for frame in range(FALLING_FRAMES))
+
+    def prepare():
+        # back to the top with a drop due on the first frame, every pass then has gravity and soft drops
+        piece_state.offset_row = start_row
+        engine.landing_row = None
+        engine.next_frame_to_drop = engine.frame + 1
+
+    drops = FALLING_FRAMES // FRAMES_PER_DROP[GRAVITY_LEVEL] + inputs.count(UserInputState.D_DOWN)
+    assert engine.board_state.get_drop_distance(piece_state) > drops
+    assert measure(engine, inputs, prepare) == (0, 0)
+    assert piece_state.offset_row > start_row
@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch_tetris import BatchTetris
+from constants import PIECES_TYPES, WIDTH, HEIGHT
+from enums.game_phase import GamePhase
+from enums.randomizer_type import RandomizerType
+from piece_randomizer import PieceRandomizer, generate_piece_sequence
+from selfplay_runner import RANDOM_PLAYER_INPUTS
+from tetris_engine import TetrisEngine
+
+GAME_COUNT = 32
+FRAMES = 2000
+SEQUENCE_LENGTH = 64 * len(PIECES_TYPES)
+# rows under it are filled but for a random hole, so random inputs clear lines
+FILLED_FROM_ROW = 14
+
+
+class SequenceRandomizer(PieceRandomizer):
+    # reads a shared piece sequence from a position like BatchTetris does
+    sequence: bytes
+    position: int
+
+    def __init__(self, sequence: bytes, position: int):
+        self.sequence = sequence
+        self.position = position
+        super().__init__(len(PIECES_TYPES), 0)
+
+    def _draw(self) -> int:
+        piece = self.sequence[self.position % len(self.sequence)]
+        self.position += 1
+        return piece
+
+
+def create_reference_engine(sequence: bytes, position: int, start_level: int) -> TetrisEngine:
+    # the state of a TetrisEngine leaving GamePhase.START, as BatchTetris.reset sets it up
+    engine = TetrisEngine(seed=0)
+    engine.randomizer = SequenceRandomizer(sequence, position)
+    engine.initialize_board(start_level).initialize_timers()
+    engine.spawn_piece()
+    engine.game_phase = GamePhase.PLAYING
+    return engine
+
+
+def assert_same_game(engine: TetrisEngine, batch: BatchTetris, index: int, compare_board: bool):
+    assert engine.game_phase.value == batch.game_phase[index]
+    assert (engine.score, engine.level, engine.cleared_lines_count) == \
+        (batch.score[index], batch.level[index], batch.cleared_lines_count[index])
+    if engine.game_phase == GamePhase.PLAYING:
+        piece_state = engine.piece_state
+        assert (piece_state.piece_type.value, piece_state.offset_row, piece_state.offset_col,
+                piece_state.rotation.value) == (batch.piece_type[index], batch.piece_row[index],
+                                                batch.piece_col[index], batch.piece_rotation[index])
+    if compare_board:
+        assert [[engine.board_state.get_matrix_cell(row, col).value for col in range(WIDTH)]
+                for row in range(HEIGHT)] == batch.boards[index].tolist()
+
+
+def start_game(rng: random.Random, sequence: bytes, batch: BatchTetris, index: int) -> TetrisEngine:
+    # restarts game index of the batch and returns its reference engine, both reading from the same position
+    start_level = rng.randrange(20)
+    position = int(batch.sequence_positions[index]) % len(sequence)
+    batch.sequence_positions[index] = position
+    batch.reset(np.array([index]), start_level)
+    engine = create_reference_engine(sequence, position, start_level)
+    for row in range(FILLED_FROM_ROW, HEIGHT):
+        hole_col = rng.randrange(WIDTH)
+        for col in range(WIDTH):
+            if col != hole_col:
+                engine.board_state.set_matrix_cell(row, col, PIECES_TYPES[0])
+                batch.boards[index, row, col] = PIECES_TYPES[0].value
+    return engine
+
+
+@pytest.mark.parametrize('randomizer_type', [RandomizerType.UNIFORM, RandomizerType.BAG])
+def test_batch_matches_engine(randomizer_type: RandomizerType):
+    rng = random.Random(randomizer_type.value)
+    sequence = generate_piece_sequence(randomizer_type, len(PIECES_TYPES), SEQUENCE_LENGTH, 1)
+    batch = BatchTetris(GAME_COUNT, seed=2, piece_sequence=sequence)
+    engines = [start_game(rng, sequence, batch, index) for index in range(GAME_COUNT)]
+    finished_games = 0
+    cleared_lines_count = 0
+    # frames with a piece spawned into the stack below row 0, where dropping works differently
+    overlapping_frames = 0
+    for frame in range(FRAMES):
+        actions = [rng.choice(RANDOM_PLAYER_INPUTS) for _ in range(GAME_COUNT)]
+        batch.step(np.array([user_input_state.value for user_input_state in actions]))
+        for index, engine in enumerate(engines):
+            engine.step(actions[index])
+            is_over = engine.game_phase == GamePhase.GAME_OVER
+            assert_same_game(engine, batch, index, is_over or frame % 25 == 0)
+            if engine.game_phase == GamePhase.PLAYING and not engine.board_state.check_piece_valid(engine.piece_state):
+                overlapping_frames += 1
+            # BatchTetris games stay over, both sides restart from the same sequence position
+            if is_over:
+                finished_games += 1
+                cleared_lines_count += engine.cleared_lines_count
+                engines[index] = start_game(rng, sequence, batch, index)
+    assert finished_games > GAME_COUNT
+    assert cleared_lines_count > 0
+    assert overlapping_frames > 0
@@ -0,0 +1,43 @@
+import tracemalloc
+
+import pygame as pg
+
+from board_compositor import BoardCompositor
+from enums.user_input_state import UserInputState
+from game_configuration import DEFAULT_CONFIGURATION
+from incremental_renderer import TEXT_CACHE_SIZE
+from spectator_wall import WALL_WINDOW_SIZE
+from tetris_engine import TetrisEngine
+
+BOARD_COUNT = 16
+FRAMES = 300
+WINDOWS = 3
+# slack for allocator warm-up between the first and the last window
+MAX_MEMORY_GROWTH_BYTES = 64 * 1024
+
+
+def test_long_running_wall_keeps_memory_flat():
+    pg.init()
+    surface = pg.display.set_mode(WALL_WINDOW_SIZE)
+    compositor = BoardCompositor(surface, BOARD_COUNT, DEFAULT_CONFIGURATION)
+    engines = [TetrisEngine(seed=index) for index in range(BOARD_COUNT)]
+    for engine in engines:
+        engine.step(UserInputState.D_HARD_DROP)
+    # every renderer of the wall shares the one bounded cache
+    text_surfaces = compositor.renderers[0].text_surfaces
+    assert all(renderer.text_surfaces is text_surfaces for renderer in compositor.renderers)
+    window_memory = []
+    tracemalloc.start()
+    try:
+        for window in range(WINDOWS):
+            for frame in range(window * FRAMES, (window + 1) * FRAMES):
+                # a new score on every board every frame, texts never repeat
+                for index, engine in enumerate(engines):
+                    engine.score = frame * BOARD_COUNT + index
+                compositor.render(engines)
+                assert len(text_surfaces) <= TEXT_CACHE_SIZE * BOARD_COUNT
+            window_memory.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+        pg.quit()
+    assert window_memory[-1] - window_memory[0] <= MAX_MEMORY_GROWTH_BYTES
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from bit_board_state import BitBoardState
+from board_state import BoardState
+from constants import PIECES_TYPES, WIDTH, HEIGHT
+from enums.cell_state import CellState
+from enums.rotation import Rotation
+from piece_state import PieceState
+from selfplay_runner import RANDOM_PLAYER_INPUTS
+from tetris_engine import TetrisEngine
+
+SEEDS = range(40)
+CELL_STATES = list(CellState)
+
+
+def get_cells(board_state) -> list[list[CellState]]:
+    return [[board_state.get_matrix_cell(row, col) for col in range(board_state.width)]
+            for row in range(board_state.height)]
+
+
+def assert_same_boards(board_state: BoardState, bit_board_state: BitBoardState):
+    assert get_cells(board_state) == get_cells(bit_board_state)
+    for row in range(board_state.height):
+        assert board_state.check_row_filled(row) == bit_board_state.check_row_filled(row)
+        assert board_state.check_row_empty(row) == bit_board_state.check_row_empty(row)
+    assert board_state.get_row_masks() == bit_board_state.get_row_masks()
+    assert board_state.get_row_colors() == bit_board_state.get_row_colors()
+    assert board_state.get_skyline() == bit_board_state.get_skyline()
+    assert board_state.snapshot() == bit_board_state.snapshot()
+
+
+def fill_randomly(rng: random.Random, board_states: tuple):
+    for _ in range(rng.randrange(200)):
+        row, col, cell_state = rng.randrange(HEIGHT), rng.randrange(WIDTH), rng.choice(CELL_STATES)
+        for board_state in board_states:
+            board_state.set_matrix_cell(row, col, cell_state)
+    # some filled rows for the line clears
+    for row in range(HEIGHT):
+        if rng.random() < 0.2:
+            for col in range(WIDTH):
+                cell_state = rng.choice(PIECES_TYPES)
+                for board_state in board_states:
+                    board_state.set_matrix_cell(row, col, cell_state)
+
+
+def random_piece_state(rng: random.Random) -> PieceState:
+    return PieceState(rng.choice(PIECES_TYPES), rng.randrange(-3, HEIGHT + 1), rng.randrange(-3, WIDTH + 1),
+                      rng.choice(list(Rotation)))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_piece_checks(seed: int):
+    rng = random.Random(seed)
+    board_states = BoardState(WIDTH, HEIGHT), BitBoardState(WIDTH, HEIGHT)
+    fill_randomly(rng, board_states)
+    assert_same_boards(*board_states)
+    for _ in range(200):
+        piece_state = random_piece_state(rng)
+        is_valid = board_states[0].check_piece_valid(piece_state)
+        assert is_valid == board_states[1].check_piece_valid(piece_state)
+        if is_valid:
+            assert board_states[0].get_drop_distance(piece_state) == board_states[1].get_drop_distance(piece_state)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_clear_lines(seed: int):
+    rng = random.Random(seed)
+    board_states = BoardState(WIDTH, HEIGHT), BitBoardState(WIDTH, HEIGHT)
+    for _ in range(3):
+        fill_randomly(rng, board_states)
+        first_row = rng.randrange(HEIGHT)
+        for board_state in board_states:
+            board_state.find_filled_rows(first_row, first_row + 4)
+        assert board_states[0].pending_lines == board_states[1].pending_lines
+        for board_state in board_states:
+            board_state.find_filled_rows()
+        assert board_states[0].pending_lines == board_states[1].pending_lines
+        assert board_states[0].clear_lines() == board_states[1].clear_lines()
+        assert board_states[0].pending_lines == board_states[1].pending_lines
+        assert_same_boards(*board_states)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_insert_garbage_rows(seed: int):
+    rng = random.Random(seed)
+    board_states = BoardState(WIDTH, HEIGHT), BitBoardState(WIDTH, HEIGHT)
+    fill_randomly(rng, board_states)
+    count, hole_col = rng.randrange(1, 6), rng.randrange(WIDTH)
+    assert board_states[0].insert_garbage_rows(count, hole_col) == \
+        board_states[1].insert_garbage_rows(count, hole_col)
+    assert board_states[0].pending_lines == board_states[1].pending_lines
+    assert_same_boards(*board_states)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_fork_and_restore(seed: int):
+    rng = random.Random(seed)
+    board_states = BoardState(WIDTH, HEIGHT), BitBoardState(WIDTH, HEIGHT)
+    fill_randomly(rng, board_states)
+    snapshots = [board_state.snapshot() for board_state in board_states]
+    forks = [board_state.fork() for board_state in board_states]
+    # writes to a fork leave its parent untouched, and the other way around
+    fill_randomly(rng, forks)
+    for board_state, snapshot in zip(board_states, snapshots):
+        assert board_state.snapshot() == snapshot
+    assert_same_boards(*forks)
+    fork_snapshots = [fork.snapshot() for fork in forks]
+    fill_randomly(rng, board_states)
+    for board_state in board_states:
+        board_state.clear_lines()
+    for fork, snapshot in zip(forks, fork_snapshots):
+        assert fork.snapshot() == snapshot
+    assert_same_boards(*board_states)
+    for board_state, snapshot in zip(board_states, snapshots):
+        board_state.restore(snapshot)
+        assert board_state.snapshot() == snapshot
+    assert_same_boards(*board_states)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_engine_parity(seed: int):
+    input_rng = random.Random(seed)
+    engines = TetrisEngine(BoardState, seed), TetrisEngine(BitBoardState, seed)
+    for frame in range(5000):
+        user_input_state = input_rng.choice(RANDOM_PLAYER_INPUTS)
+        for engine in engines:
+            engine.step(user_input_state)
+        if frame % 50 == 0:
+            assert engines[0].get_state_hash() == engines[1].get_state_hash()
+    assert_same_boards(engines[0].board_state, engines[1].board_state)
+
+
+def test_fork_shares_unchanged_rows():
+    board_state = BoardState(WIDTH, HEIGHT)
+    fill_randomly(random.Random(0), (board_state,))
+    fork = board_state.fork()
+    fork.set_matrix_cell(HEIGHT - 1, 0, CellState.EMPTY)
+    board_state.set_matrix_cell(0, 0, CellState.T_PIECE)
+    # each side copied only the row it wrote
+    assert [row for row in range(HEIGHT) if fork.rows[row] is not board_state.rows[row]] == [0, HEIGHT - 1]
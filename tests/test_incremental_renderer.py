@@ -0,0 +1,26 @@
+import pygame as pg
+
+from constants import WIDTH, HEIGHT, GRID_SIZE, HUD_HEIGHT
+from enums.user_input_state import UserInputState
+from incremental_renderer import IncrementalRenderer, TEXT_CACHE_SIZE
+from tetris_engine import TetrisEngine
+
+FRAMES = 2000
+
+
+def test_text_cache_stays_bounded():
+    pg.init()
+    surface = pg.display.set_mode((WIDTH * GRID_SIZE, HUD_HEIGHT + HEIGHT * GRID_SIZE))
+    renderer = IncrementalRenderer(surface, pg.font.Font(None, 36))
+    engine = TetrisEngine(seed=0)
+    engine.step(UserInputState.D_HARD_DROP)
+    for frame in range(FRAMES):
+        # a new score every frame, like a wall of fast bots
+        engine.score = frame
+        engine.step()
+        renderer.render(engine)
+        assert len(renderer.text_surfaces) <= TEXT_CACHE_SIZE
+    # the texts on screen are the most recently used ones
+    assert f'Score: {FRAMES - 1}' in renderer.text_surfaces
+    assert f'LEVEL {engine.level}' in renderer.text_surfaces
+    pg.quit()
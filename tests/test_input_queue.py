@@ -0,0 +1,95 @@
+from enums.user_input_state import UserInputState
+from input_queue import InputQueue, DAS_FRAMES, ARR_FRAMES
+
+TICK_NS = 16_666_667
+FRAMES = 60
+
+
+def tick_time(frame: int) -> int:
+    return (frame + 1) * TICK_NS
+
+
+def poll_frames(input_queue: InputQueue, first_frame: int, last_frame: int) -> dict[int, list[tuple]]:
+    # frame -> (UserInputState, repeat) of every press polled in the frame
+    return {frame: [(event.user_input_state, event.repeat) for event in input_queue.poll(tick_time(frame))]
+            for frame in range(first_frame, last_frame)}
+
+
+def get_repeat_frames(polled: dict[int, list[tuple]], user_input_state: UserInputState) -> list[int]:
+    return [frame for frame, presses in polled.items() if (user_input_state, True) in presses]
+
+
+def test_das_delay_and_arr_cadence():
+    input_queue = InputQueue()
+    input_queue.push(TICK_NS // 2, UserInputState.D_LEFT, True)
+    polled = poll_frames(input_queue, 0, FRAMES)
+    assert polled[0] == [(UserInputState.D_LEFT, False)]
+    assert get_repeat_frames(polled, UserInputState.D_LEFT) == list(range(DAS_FRAMES, FRAMES, ARR_FRAMES))
+
+
+def test_custom_das_and_arr():
+    input_queue = InputQueue(das_frames=3, arr_frames=2)
+    input_queue.push(0, UserInputState.D_DOWN, True)
+    polled = poll_frames(input_queue, 0, 12)
+    assert get_repeat_frames(polled, UserInputState.D_DOWN) == [3, 5, 7, 9, 11]
+
+
+def test_only_moves_repeat():
+    input_queue = InputQueue()
+    input_queue.push(0, UserInputState.D_ROTATE, True)
+    input_queue.push(0, UserInputState.D_HARD_DROP, True)
+    polled = poll_frames(input_queue, 0, FRAMES)
+    assert polled[0] == [(UserInputState.D_ROTATE, False), (UserInputState.D_HARD_DROP, False)]
+    assert not any(polled[frame] for frame in range(1, FRAMES))
+
+
+def test_release_and_press_again():
+    input_queue = InputQueue()
+    input_queue.push(0, UserInputState.D_RIGHT, True)
+    release_frame = DAS_FRAMES + ARR_FRAMES
+    input_queue.push(tick_time(release_frame) - 1, UserInputState.D_RIGHT, False)
+    polled = poll_frames(input_queue, 0, release_frame + DAS_FRAMES)
+    # the release is polled before the repeat would have been generated
+    assert get_repeat_frames(polled, UserInputState.D_RIGHT) == [DAS_FRAMES]
+    assert not any(polled[frame] for frame in range(release_frame, release_frame + DAS_FRAMES))
+    # pressing again waits the whole delay again
+    press_frame = release_frame + DAS_FRAMES
+    input_queue.push(tick_time(press_frame) - 1, UserInputState.D_RIGHT, True)
+    polled = poll_frames(input_queue, press_frame, press_frame + DAS_FRAMES + 1)
+    assert polled[press_frame] == [(UserInputState.D_RIGHT, False)]
+    assert get_repeat_frames(polled, UserInputState.D_RIGHT) == [press_frame + DAS_FRAMES]
+
+
+def test_tap_within_one_frame_does_not_repeat():
+    input_queue = InputQueue()
+    input_queue.push(1, UserInputState.D_LEFT, True)
+    input_queue.push(2, UserInputState.D_LEFT, False)
+    polled = poll_frames(input_queue, 0, FRAMES)
+    assert polled[0] == [(UserInputState.D_LEFT, False)]
+    assert not get_repeat_frames(polled, UserInputState.D_LEFT)
+
+
+def test_order_within_one_frame():
+    input_queue = InputQueue(das_frames=1, arr_frames=1)
+    input_queue.push(0, UserInputState.D_DOWN, True)
+    assert input_queue.poll(tick_time(0))[0].user_input_state == UserInputState.D_DOWN
+    # presses keep their arrival order and come before the repeats, later events wait for their tick
+    for offset, user_input_state in enumerate((UserInputState.D_LEFT, UserInputState.D_ROTATE,
+                                               UserInputState.D_RIGHT)):
+        input_queue.push(tick_time(0) + offset + 1, user_input_state, True)
+    input_queue.push(tick_time(1) + 1, UserInputState.D_HARD_DROP, True)
+    polled = poll_frames(input_queue, 1, 3)
+    assert polled[1] == [(UserInputState.D_LEFT, False), (UserInputState.D_ROTATE, False),
+                         (UserInputState.D_RIGHT, False), (UserInputState.D_DOWN, True)]
+    assert polled[2][0] == (UserInputState.D_HARD_DROP, False)
+    assert [press for press in polled[2] if press[1]] == [(UserInputState.D_DOWN, True), (UserInputState.D_LEFT, True),
+                                                          (UserInputState.D_RIGHT, True)]
+
+
+def test_clear():
+    input_queue = InputQueue()
+    input_queue.push(0, UserInputState.D_LEFT, True)
+    input_queue.poll(tick_time(0))
+    input_queue.push(tick_time(1), UserInputState.D_ROTATE, True)
+    input_queue.clear()
+    assert not any(poll_frames(input_queue, 1, FRAMES).values())
@@ -0,0 +1,48 @@
+import pytest
+
+from enums.randomizer_type import RandomizerType
+from game_configuration import GameConfiguration
+from piece_randomizer import PieceRandomizer, create_randomizer
+from tetris_engine import TetrisEngine
+
+PIECE_COUNT = 7
+SEED = 12345
+
+
+def test_incomplete_randomizer_fails_on_construction():
+    class NoDrawRandomizer(PieceRandomizer):
+        pass
+
+    with pytest.raises(TypeError):
+        NoDrawRandomizer(PIECE_COUNT, SEED)
+
+
+@pytest.mark.parametrize('randomizer_type', list(RandomizerType))
+def test_restore_continues_the_sequence(randomizer_type: RandomizerType):
+    randomizer = create_randomizer(randomizer_type, PIECE_COUNT, SEED)
+    for _ in range(10):
+        randomizer.next_piece()
+    snapshot = randomizer.snapshot()
+    expected_pieces = [randomizer.next_piece() for _ in range(50)]
+    restored_randomizer = create_randomizer(randomizer_type, PIECE_COUNT, 0)
+    restored_randomizer.restore(snapshot)
+    assert [restored_randomizer.next_piece() for _ in range(50)] == expected_pieces
+
+
+@pytest.mark.parametrize('randomizer_type', list(RandomizerType))
+def test_restore_rejects_other_randomizer_types(randomizer_type: RandomizerType):
+    snapshot = create_randomizer(randomizer_type, PIECE_COUNT, SEED).snapshot()
+    for other_type in RandomizerType:
+        if other_type != randomizer_type:
+            with pytest.raises(ValueError, match=randomizer_type.name):
+                create_randomizer(other_type, PIECE_COUNT, SEED).restore(snapshot)
+
+
+def test_engine_restore_rejects_other_randomizer_types():
+    snapshot = TetrisEngine(seed=SEED, configuration=GameConfiguration(randomizer_type=RandomizerType.BAG)).snapshot()
+    engine = TetrisEngine(seed=0, configuration=GameConfiguration(randomizer_type=RandomizerType.NES))
+    engine_snapshot = engine.snapshot()
+    with pytest.raises(ValueError):
+        engine.restore(snapshot)
+    # nothing was restored
+    assert engine.snapshot() == engine_snapshot
@@ -0,0 +1,128 @@
+from board_state import BoardState
+from constants import ROTATION_ORDER
+from enums.cell_state import CellState
+from enums.rotation import Rotation
+from enums.user_input_state import UserInputState
+from placement_search import PlacementSearch, Placement
+from piece_state import PieceState
+
+WIDTH = 6
+HEIGHT = 8
+# filled cells of the hand-built boards, rows from the top
+ROOF_ROWS = ['......',
+             '......',
+             '......',
+             '......',
+             '......',
+             'XXX...',
+             '......',
+             '......']
+SEALED_ROWS = ['......',
+               '......',
+               '......',
+               '......',
+               'XXXXXX',
+               '......',
+               '......',
+               '......']
+
+
+def build_board(rows: list[str]) -> BoardState:
+    board_state = BoardState(WIDTH, HEIGHT)
+    for row, cells in enumerate(rows):
+        for col, cell in enumerate(cells):
+            if cell == 'X':
+                board_state.set_matrix_cell(row, col, CellState.GARBAGE)
+    return board_state
+
+
+def get_cells(board_state: BoardState, piece_state: PieceState) -> frozenset[tuple[int, int]]:
+    shape = board_state.pieces[piece_state.piece_type].get_shape(piece_state.rotation)
+    return frozenset((piece_state.offset_row + row, piece_state.offset_col + col) for row, col in shape.cells)
+
+
+def play_inputs(board_state: BoardState, piece_state: PieceState, placement: Placement) -> PieceState:
+    # moves a copy of piece_state like TetrisEngine does, checking every expected position on the way
+    piece_state = PieceState(piece_state.piece_type, piece_state.offset_row, piece_state.offset_col,
+                             piece_state.rotation)
+    for user_input_state, expected_state in placement.inputs:
+        match user_input_state:
+            case UserInputState.D_DOWN:
+                piece_state.offset_row += 1
+            case UserInputState.D_LEFT:
+                piece_state.offset_col -= 1
+            case UserInputState.D_RIGHT:
+                piece_state.offset_col += 1
+            case UserInputState.D_ROTATE:
+                piece_state.rotation = ROTATION_ORDER[(ROTATION_ORDER.index(piece_state.rotation) + 1) % 4]
+            case UserInputState.D_HARD_DROP:
+                piece_state.offset_row += board_state.get_drop_distance(piece_state)
+        assert board_state.check_piece_valid(piece_state)
+        if expected_state is not None:
+            assert (ROTATION_ORDER.index(piece_state.rotation), piece_state.offset_row,
+                    piece_state.offset_col) == expected_state
+    return piece_state
+
+
+def test_slide_under_an_overhang():
+    board_state = build_board(ROOF_ROWS)
+    start = PieceState(CellState.O_PIECE, 0, 3, Rotation.ZERO)
+    placements = PlacementSearch().find_placements(board_state, start)
+    placements_by_col = {placement.piece_state.offset_col: placement for placement in placements
+                         if placement.piece_state.offset_row == HEIGHT - 2}
+    # under the roof only by falling to the right of it and sliding left
+    assert sorted(placements_by_col) == list(range(WIDTH - 1))
+    placement = placements_by_col[0]
+    inputs = [user_input_state for user_input_state, _ in placement.inputs]
+    assert inputs.index(UserInputState.D_LEFT) > inputs.index(UserInputState.D_DOWN)
+    assert inputs[-1] == UserInputState.D_HARD_DROP
+    assert get_cells(board_state, play_inputs(board_state, start, placement)) == \
+        get_cells(board_state, placement.piece_state)
+    # on top of the roof as well
+    assert any(placement.piece_state.offset_row == 3 and placement.piece_state.offset_col == 0
+               for placement in placements)
+
+
+def test_sealed_rows_are_unreachable():
+    board_state = build_board(SEALED_ROWS)
+    start = PieceState(CellState.T_PIECE, 0, 1, Rotation.ZERO)
+    placements = PlacementSearch().find_placements(board_state, start)
+    assert placements
+    for placement in placements:
+        assert max(row for row, _ in get_cells(board_state, placement.piece_state)) == 3
+        play_inputs(board_state, start, placement)
+
+
+def test_symmetric_rotations_are_placed_once():
+    board_state = BoardState(WIDTH, HEIGHT)
+    search = PlacementSearch()
+    # O has one distinct shape, I and S two, T four
+    for piece_type, rotation, expected_count in ((CellState.O_PIECE, Rotation.ZERO, WIDTH - 1),
+                                                 (CellState.I_PIECE, Rotation.ZERO, (WIDTH - 3) + WIDTH),
+                                                 (CellState.S_PIECE, Rotation.ZERO, (WIDTH - 2) + (WIDTH - 1)),
+                                                 (CellState.T_PIECE, Rotation.ZERO, 2 * (WIDTH - 2) + 2 * (WIDTH - 1))):
+        placements = search.find_placements(board_state, PieceState(piece_type, 0, 2, rotation))
+        cells = [get_cells(board_state, placement.piece_state) for placement in placements]
+        assert len(set(cells)) == len(cells) == expected_count
+
+
+def test_cache_follows_board_changes():
+    board_state = build_board(ROOF_ROWS)
+    start = PieceState(CellState.T_PIECE, 0, 2, Rotation.ZERO)
+    search = PlacementSearch(cache_size=2)
+    placements = search.find_placements(board_state, start)
+    assert search.find_placements(board_state, start) is placements
+    assert (search.cache_hits, search.cache_misses) == (1, 1)
+    # a changed board is searched again, and a different start position is another entry
+    board_state.set_matrix_cell(HEIGHT - 1, WIDTH - 1, CellState.GARBAGE)
+    changed_placements = search.find_placements(board_state, start)
+    assert changed_placements is not placements
+    assert {get_cells(board_state, placement.piece_state) for placement in changed_placements} != \
+        {get_cells(board_state, placement.piece_state) for placement in placements}
+    search.find_placements(board_state, PieceState(CellState.T_PIECE, 0, 1, Rotation.ZERO))
+    assert search.cache_misses == 3
+    # the least recently used entry, the first board, was dropped
+    board_state.set_matrix_cell(HEIGHT - 1, WIDTH - 1, CellState.EMPTY)
+    assert len(search.cache) == 2
+    assert search.find_placements(board_state, start) is not placements
+    assert search.cache_misses == 4
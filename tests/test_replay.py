@@ -0,0 +1,128 @@
+import io
+import random
+
+import pytest
+
+from bit_board_state import BitBoardState
+from enums.randomizer_type import RandomizerType
+from enums.user_input_state import UserInputState
+from game_configuration import GameConfiguration
+from replay import ReplayWriter, ReplayReader, HEADER, HEADER_V1, RECORD, MAGIC, VERSION, MAX_FRAME_DELTA, \
+    DIGEST_SIZE
+from replay_runner import run_replay
+from selfplay_runner import RANDOM_PLAYER_INPUTS
+from tetris_engine import TetrisEngine
+
+SEED = 7
+START_LEVEL = 5
+FRAMES = 3000
+
+
+def record_game(path, frames: list[list[UserInputState]],
+                randomizer_type: RandomizerType = RandomizerType.UNIFORM) -> TetrisEngine:
+    # every frame is a step with its first input, the other inputs are updates of the same frame
+    engine = TetrisEngine(BitBoardState, SEED, GameConfiguration(randomizer_type=randomizer_type))
+    engine.start_level = START_LEVEL
+    with open(path, 'wb') as file:
+        writer = ReplayWriter(file, SEED, START_LEVEL, randomizer_type)
+        for frame_inputs in frames:
+            engine.step(frame_inputs[0])
+            writer.write_step(frame_inputs[0])
+            for user_input_state in frame_inputs[1:]:
+                engine.update(user_input_state)
+                writer.write_update(user_input_state)
+        writer.close(engine.get_state_hash())
+    return engine
+
+
+def random_frames(rng: random.Random) -> list[list[UserInputState]]:
+    frames = [[UserInputState.D_HARD_DROP]]
+    for _ in range(FRAMES):
+        frames.append([rng.choice(RANDOM_PLAYER_INPUTS) for _ in range(rng.choice((1, 1, 1, 2, 3)))])
+    return frames
+
+
+def assert_same_engine(engine: TetrisEngine, replayed_engine: TetrisEngine):
+    assert replayed_engine.frame == engine.frame
+    assert replayed_engine.get_state_hash() == engine.get_state_hash()
+
+
+@pytest.mark.parametrize('randomizer_type', [RandomizerType.UNIFORM, RandomizerType.BAG])
+def test_round_trip(tmp_path, randomizer_type: RandomizerType):
+    path = tmp_path / 'game.replay'
+    engine = record_game(path, random_frames(random.Random(1)), randomizer_type)
+    with open(path, 'rb') as file:
+        reader = ReplayReader(file)
+        records = list(reader)
+    assert (reader.seed, reader.start_level, reader.randomizer_type) == (SEED, START_LEVEL, randomizer_type)
+    assert reader.state_hash == engine.get_state_hash()
+    # frames without inputs only add to the frame delta of the next record
+    assert sum(frame_delta for frame_delta, _ in records) == engine.frame
+    assert_same_engine(engine, run_replay(str(path)))
+
+
+def test_inputs_in_the_same_frame(tmp_path):
+    path = tmp_path / 'game.replay'
+    frames = [[UserInputState.D_HARD_DROP], [UserInputState.D_NONE],
+              [UserInputState.D_LEFT, UserInputState.D_ROTATE, UserInputState.D_HARD_DROP],
+              [UserInputState.D_NONE, UserInputState.D_RIGHT]]
+    engine = record_game(path, frames)
+    with open(path, 'rb') as file:
+        records = list(ReplayReader(file))
+    # a frame delta of 0 applies the input to the frame of the previous record
+    assert records == [(1, UserInputState.D_HARD_DROP), (2, UserInputState.D_LEFT), (0, UserInputState.D_ROTATE),
+                       (0, UserInputState.D_HARD_DROP), (1, UserInputState.D_NONE), (0, UserInputState.D_RIGHT)]
+    assert_same_engine(engine, run_replay(str(path)))
+
+
+def test_frame_deltas_over_the_maximum(tmp_path):
+    path = tmp_path / 'game.replay'
+    idle_frames = 2 * MAX_FRAME_DELTA + 10
+    frames = [[UserInputState.D_HARD_DROP]] + [[UserInputState.D_NONE]] * idle_frames + [[UserInputState.D_LEFT]]
+    engine = record_game(path, frames)
+    with open(path, 'rb') as file:
+        records = list(ReplayReader(file))
+    assert records == [(1, UserInputState.D_HARD_DROP), (MAX_FRAME_DELTA, UserInputState.D_NONE),
+                       (MAX_FRAME_DELTA, UserInputState.D_NONE), (11, UserInputState.D_LEFT)]
+    assert_same_engine(engine, run_replay(str(path)))
+
+
+def test_version_1_replays(tmp_path):
+    # no randomizer type in the header, the pieces come from RandomizerType.UNIFORM
+    path = tmp_path / 'game.replay'
+    engine = record_game(path, random_frames(random.Random(2)))
+    data = path.read_bytes()
+    path.write_bytes(HEADER_V1.pack(MAGIC, 1, SEED, START_LEVEL) + data[HEADER.size:])
+    assert_same_engine(engine, run_replay(str(path)))
+
+
+@pytest.mark.parametrize('header', [
+    HEADER.pack(b'TRPX', VERSION, SEED, START_LEVEL, RandomizerType.UNIFORM.value),
+    HEADER.pack(MAGIC, 0, SEED, START_LEVEL, RandomizerType.UNIFORM.value),
+    HEADER.pack(MAGIC, VERSION + 1, SEED, START_LEVEL, RandomizerType.UNIFORM.value),
+])
+def test_unsupported_headers_are_rejected(header: bytes):
+    with pytest.raises(ValueError, match='unsupported replay format'):
+        ReplayReader(io.BytesIO(header))
+
+
+def test_final_hash_mismatch(tmp_path):
+    path = tmp_path / 'game.replay'
+    record_game(path, random_frames(random.Random(3)))
+    data = bytearray(path.read_bytes())
+    data[-DIGEST_SIZE] ^= 0xFF
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match='final state hash mismatch'):
+        run_replay(str(path))
+
+
+def test_truncated_replay_has_no_hash(tmp_path):
+    path = tmp_path / 'game.replay'
+    engine = record_game(path, random_frames(random.Random(4)))
+    # the end record, the digest and the last records but for a partial one are cut off
+    path.write_bytes(path.read_bytes()[:-DIGEST_SIZE - 10 * RECORD.size - 1])
+    with open(path, 'rb') as file:
+        reader = ReplayReader(file)
+        list(reader)
+    assert reader.state_hash is None
+    assert run_replay(str(path)).frame < engine.frame
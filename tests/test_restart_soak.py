@@ -0,0 +1,69 @@
+import time
+import tracemalloc
+
+import pygame as pg
+
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from keyboard_configuration import KEYBOARD_CONFIGURATION
+from tetris_game_state import TetrisGameState
+
+HARD_DROP_KEY = next(key for key, user_input_state in KEYBOARD_CONFIGURATION.items()
+                     if user_input_state == UserInputState.D_HARD_DROP)
+RESTARTS = 3000
+WINDOWS = 3
+# slack for allocator warm-up between the first and the last window
+MAX_MEMORY_GROWTH_BYTES = 256 * 1024
+
+
+def play_until_restart(game_state: TetrisGameState):
+    # hard drops through key events until the game is over and a new one started
+    was_started = False
+    while True:
+        pg.event.post(pg.event.Event(pg.KEYDOWN, key=HARD_DROP_KEY))
+        pg.event.post(pg.event.Event(pg.KEYUP, key=HARD_DROP_KEY))
+        game_state.handle_events()
+        # both key events reached the game exactly once
+        assert len(game_state.input_queue.events) == 2
+        game_state.tick_time_ns = time.perf_counter_ns()
+        game_state.tick()
+        if game_state.engine.game_phase == GamePhase.START:
+            was_started = True
+        elif was_started and game_state.engine.game_phase == GamePhase.PLAYING:
+            return
+
+
+def ignore_input(user_input_state: UserInputState):
+    pass
+
+
+def rerun_setup(game_state: TetrisGameState):
+    # what used to leak: the bindings subscribed again on every restart, plus a handler coming and going
+    input_dispatcher = game_state.input_dispatcher
+    for event_type, type_handlers in list(input_dispatcher.handlers.items()):
+        for user_input_state, handlers in list(type_handlers.items()):
+            for handler in list(handlers):
+                input_dispatcher.subscribe(event_type, user_input_state, handler)
+    input_dispatcher.subscribe(pg.KEYDOWN, UserInputState.D_HARD_DROP, ignore_input)
+    input_dispatcher.unsubscribe(pg.KEYDOWN, UserInputState.D_HARD_DROP, ignore_input)
+
+
+def test_restarts_keep_handlers_and_memory_flat():
+    game_state = TetrisGameState(seed=0)
+    handler_count = game_state.input_dispatcher.get_handler_count()
+    dispatch_table = dict(game_state.input_dispatcher.dispatch_table)
+    window_memory = []
+    tracemalloc.start()
+    try:
+        for _ in range(WINDOWS):
+            for _ in range(RESTARTS // WINDOWS):
+                rerun_setup(game_state)
+                play_until_restart(game_state)
+            window_memory.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    assert game_state.input_dispatcher.get_handler_count() == handler_count
+    # one handler per key and event type, dispatch costs the same as before the restarts
+    assert game_state.input_dispatcher.dispatch_table == dispatch_table
+    # the first window includes warm-up allocations
+    assert window_memory[-1] - window_memory[1] <= MAX_MEMORY_GROWTH_BYTES
@@ -0,0 +1,44 @@
+import pytest
+
+from selfplay_runner import run, read_results
+
+GAMES = 25
+SHARD_SIZE = 10
+START_LEVEL = 18
+MAX_FRAMES = 2000
+
+
+def test_last_shard_stops_at_games(tmp_path):
+    path = tmp_path / 'results.bin'
+    run(str(path), GAMES, SHARD_SIZE, 'random', START_LEVEL, MAX_FRAMES, 1)
+    assert sorted(read_results(str(path))['seed']) == list(range(GAMES))
+
+
+def test_resume(tmp_path):
+    path = tmp_path / 'results.bin'
+    run(str(path), GAMES, SHARD_SIZE, 'random', START_LEVEL, MAX_FRAMES, 1)
+    results = read_results(str(path))
+    # a cut off last block is played again, finished shards are kept
+    with open(path, 'r+b') as file:
+        file.truncate(path.stat().st_size - 5)
+    run(str(path), GAMES, SHARD_SIZE, 'random', START_LEVEL, MAX_FRAMES, 1)
+    resumed_results = read_results(str(path))
+    assert sorted(resumed_results['seed']) == list(range(GAMES))
+    assert sorted(zip(*resumed_results.values())) == sorted(zip(*results.values()))
+
+
+@pytest.mark.parametrize('games, shard_size, player, start_level, max_frames', [
+    (GAMES, SHARD_SIZE, 'bot', START_LEVEL, MAX_FRAMES),
+    (GAMES, SHARD_SIZE, 'random', 0, MAX_FRAMES),
+    (GAMES, SHARD_SIZE, 'random', START_LEVEL, MAX_FRAMES + 1),
+    (GAMES + 1, SHARD_SIZE, 'random', START_LEVEL, MAX_FRAMES),
+    (GAMES, SHARD_SIZE + 1, 'random', START_LEVEL, MAX_FRAMES),
+])
+def test_resume_with_other_parameters_fails(tmp_path, games: int, shard_size: int, player: str, start_level: int,
+                                            max_frames: int):
+    path = tmp_path / 'results.bin'
+    run(str(path), GAMES, SHARD_SIZE, 'random', START_LEVEL, MAX_FRAMES, 1)
+    size = path.stat().st_size
+    with pytest.raises(ValueError, match='another run'):
+        run(str(path), games, shard_size, player, start_level, max_frames, 1)
+    assert path.stat().st_size == size
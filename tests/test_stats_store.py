@@ -0,0 +1,36 @@
+import sqlite3
+
+from stats_store import StatsStore, to_unsigned_seed
+
+SEEDS = [0, (1 << 63) - 1, 1 << 63, (1 << 64) - 1]
+
+
+def record_game(store: StatsStore, game_number: int, seed: int, score: int):
+    store.record_game(1, game_number, seed, 18, 19, score, 12, 40, 1, 3, 120, 900, 0.0)
+
+
+def test_seeds_over_63_bits_are_kept(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    with StatsStore(path) as store:
+        for game_number, seed in enumerate(SEEDS):
+            record_game(store, game_number, seed, 1000)
+    assert store.dropped_row_count == 0
+    with sqlite3.connect(path) as connection:
+        stored_seeds = [seed for seed, in connection.execute('SELECT seed FROM games ORDER BY game_number')]
+    assert [to_unsigned_seed(seed) for seed in stored_seeds] == SEEDS
+
+
+def test_refused_rows_do_not_stop_the_writer(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    with StatsStore(path, batch_size=2) as store:
+        record_game(store, 0, 1, 3000)
+        # out of the range of SQLite integers, only this row is lost
+        record_game(store, 1, 2, 1 << 64)
+        record_game(store, 2, 3, 1000)
+        for game_number in range(3, 10):
+            record_game(store, game_number, game_number + 1, 2000)
+    assert store.dropped_row_count == 1
+    with sqlite3.connect(path) as connection:
+        game_numbers = [game_number for game_number, in connection.execute(
+            'SELECT game_number FROM games ORDER BY game_number')]
+    assert game_numbers == [0] + list(range(2, 10))
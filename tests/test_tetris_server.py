@@ -0,0 +1,82 @@
+import asyncio
+import logging
+
+import pytest
+
+import tetris_server
+from enums.message_type import MessageType
+from enums.user_input_state import UserInputState
+from network_protocol import INPUT, pack_message
+from tetris_client import TetrisClient
+from tetris_server import TetrisServer
+
+TIMEOUT = 5.0
+
+
+async def receive_until(client: TetrisClient, message_type: MessageType) -> MessageType | None:
+    # the first message of message_type, or None when the connection ends first
+    while True:
+        received_type = await asyncio.wait_for(client.receive(), TIMEOUT)
+        if received_type is None or received_type == message_type:
+            return received_type
+
+
+async def play_match(send_first_message) -> tuple[TetrisServer, list[TetrisClient], list[MessageType | None]]:
+    # starts a match, lets the first player send something and returns the last message of both players
+    server = TetrisServer(0)
+    started = asyncio.get_running_loop().create_future()
+    serve_task = asyncio.create_task(server.serve('127.0.0.1', 0, started))
+    port = await started
+    clients = [TetrisClient(), TetrisClient()]
+    for client in clients:
+        await client.connect('127.0.0.1', port)
+    for client in clients:
+        assert await receive_until(client, MessageType.MATCH_START) == MessageType.MATCH_START
+    send_first_message(clients[0])
+    last_messages = [await receive_until(client, MessageType.MATCH_END) for client in clients]
+    for client in clients:
+        client.close()
+    server.stop()
+    await serve_task
+    return server, clients, last_messages
+
+
+@pytest.mark.parametrize('message', [
+    pack_message(MessageType.BOARD_UPDATE, b''),
+    b'\x00\x00\x09',
+    pack_message(MessageType.INPUT, INPUT.pack(1, UserInputState.D_LEFT.value) + b'\x00'),
+    pack_message(MessageType.INPUT, INPUT.pack(1, 99)),
+    pack_message(MessageType.INPUT, INPUT.pack(1, -2)),
+])
+def test_invalid_message_drops_the_sender(message: bytes, caplog):
+    def send_invalid_message(client: TetrisClient):
+        client.writer.write(message)
+
+    server, clients, last_messages = asyncio.run(play_match(send_invalid_message))
+    # the sender is disconnected and loses, the opponent is told
+    assert last_messages[0] is None
+    assert last_messages[1] == MessageType.MATCH_END
+    assert clients[1].winner == clients[1].player_index
+    assert not server.matches
+    # handled by the server, not an exception escaping the connection task
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_valid_inputs_keep_the_match_running():
+    def send_inputs(client: TetrisClient):
+        for user_input_state in UserInputState:
+            client.send_input(user_input_state)
+        # ends the match from the client side once the inputs are confirmed
+        asyncio.get_running_loop().call_later(0.5, client.close)
+
+    _, clients, last_messages = asyncio.run(play_match(send_inputs))
+    assert clients[0].input_latencies_ns
+    assert last_messages[1] == MessageType.MATCH_END
+
+
+def test_clients_falling_behind_are_dropped(monkeypatch):
+    # every client counts as stalled once anything is left unsent
+    monkeypatch.setattr(tetris_server, 'MAX_WRITE_BUFFER_BYTES', -1)
+    server, _, last_messages = asyncio.run(play_match(lambda client: None))
+    assert last_messages == [None, None]
+    assert not server.matches
@@ -0,0 +1,40 @@
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from versus_match import VersusMatch, MAX_INPUTS_PER_TICK
+
+MAX_TICKS = 200
+
+
+def test_topped_out_player_stays_topped_out():
+    match = VersusMatch(0, 1)
+    engine = match.engines[0]
+    pieces_count = engine.pieces_count
+    sequence = 0
+    for _ in range(MAX_TICKS):
+        # the hard drops after the one topping out the board arrive in the same tick
+        for _ in range(3):
+            sequence += 1
+            match.push_input(0, sequence, UserInputState.D_HARD_DROP)
+        match.tick()
+        # a restarted board would start counting pieces again
+        assert engine.pieces_count >= pieces_count
+        pieces_count = engine.pieces_count
+        if match.is_over():
+            break
+    assert match.winner == 1
+    assert engine.game_phase == GamePhase.GAME_OVER
+    match.push_input(0, sequence + 1, UserInputState.D_HARD_DROP)
+    match.tick()
+    assert engine.game_phase == GamePhase.GAME_OVER
+
+
+def test_inputs_per_tick_are_capped():
+    match = VersusMatch(0, 1)
+    for sequence in range(1, 1000):
+        match.push_input(0, sequence, UserInputState.D_HARD_DROP)
+    assert len(match.inputs[0]) == MAX_INPUTS_PER_TICK
+    pieces_count = match.engines[0].pieces_count
+    match.tick()
+    assert match.engines[0].pieces_count - pieces_count <= MAX_INPUTS_PER_TICK
+    assert match.last_input_sequences[0] == MAX_INPUTS_PER_TICK
+    assert not match.inputs[0]
@@ -0,0 +1,39 @@
+from constants import ROTATION_ORDER
+from enums.game_phase import GamePhase
+from enums.user_input_state import UserInputState
+from placement_search import PlacementSearch
+from tetris_engine import TetrisEngine
+
+
+class TetrisBot:
+    search: PlacementSearch
+    # remaining (input, expected rotation index, row, col) of the current plan, last input first
+    plan: list[tuple[UserInputState, tuple[int, int, int] | None]]
+    expected_state: tuple[int, int, int] | None
+    restart: bool
+
+    def __init__(self, search: PlacementSearch | None = None, restart: bool = True):
+        self.search = search if search is not None else PlacementSearch()
+        self.plan = []
+        self.expected_state = None
+        self.restart = restart
+
+    def choose_input(self, engine: TetrisEngine) -> UserInputState:
+        match engine.game_phase:
+            case GamePhase.START:
+                return UserInputState.D_HARD_DROP
+            case GamePhase.GAME_OVER:
+                return UserInputState.D_HARD_DROP if self.restart else UserInputState.D_NONE
+            case GamePhase.CLEARING_LINE:
+                return UserInputState.D_NONE
+
+        piece_state = engine.piece_state
+        current_state = (ROTATION_ORDER.index(piece_state.rotation), piece_state.offset_row, piece_state.offset_col)
+        if not self.plan or current_state != self.expected_state:
+            # new piece, or gravity moved the piece off the plan
+            placement = self.search.find_best_placement(engine.board_state, piece_state)
+            if placement is None:
+                return UserInputState.D_HARD_DROP
+            self.plan = list(reversed(placement.inputs))
+        user_input_state, self.expected_state = self.plan.pop()
+        return user_input_state
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import deque
+
+from bit_board_state import CELL_BITS, CELL_MASK, CELL_STATES, get_snapshot_row_sizes
+from enums.cell_state import CellState
+from enums.message_type import MessageType
+from enums.user_input_state import UserInputState
+from network_protocol import MESSAGE_HEADER, INPUT, MATCH_START, BOARD_UPDATE, ROW_UPDATE, MATCH_END, MESSAGE_TYPES, \
+    pack_message
+from versus_match import PLAYER_COUNT
+
+
+class TetrisClient:
+    reader: asyncio.StreamReader | None
+    writer: asyncio.StreamWriter | None
+    match_id: int | None
+    player_index: int | None
+    seed: int | None
+    width: int
+    height: int
+    # packed CellState values of every row of every board, kept from the row deltas
+    rows: list[list[int]]
+    # last BOARD_UPDATE fields of every board, without the changed row count
+    board_updates: list[tuple | None]
+    # None while the match runs
+    winner: int | None
+    input_sequence: int
+    # (sequence, send time) of the inputs the server did not confirm yet
+    unconfirmed_inputs: deque[tuple[int, int]]
+    # send to confirmation time of every confirmed input, in nanoseconds
+    input_latencies_ns: list[int]
+    received_bytes: int
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.match_id = None
+        self.player_index = None
+        self.seed = None
+        self.width = 0
+        self.height = 0
+        self.rows = []
+        self.board_updates = [None] * PLAYER_COUNT
+        self.winner = None
+        self.input_sequence = 0
+        self.unconfirmed_inputs = deque()
+        self.input_latencies_ns = []
+        self.received_bytes = 0
+
+    # region Public methods
+    async def connect(self, host: str, port: int):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    def close(self):
+        self.writer.close()
+
+    def send_input(self, user_input_state: UserInputState) -> int:
+        self.input_sequence += 1
+        self.unconfirmed_inputs.append((self.input_sequence, time.perf_counter_ns()))
+        self.writer.write(pack_message(MessageType.INPUT, INPUT.pack(self.input_sequence, user_input_state.value)))
+        return self.input_sequence
+
+    async def receive(self) -> MessageType | None:
+        # reads and applies one message, None once the server closed the connection
+        try:
+            payload_size, message_type = MESSAGE_HEADER.unpack(await self.reader.readexactly(MESSAGE_HEADER.size))
+            payload = await self.reader.readexactly(payload_size)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        self.received_bytes += MESSAGE_HEADER.size + payload_size
+        message_type = MESSAGE_TYPES[message_type]
+        match message_type:
+            case MessageType.MATCH_START:
+                self.match_id, self.player_index, self.seed, self.width, self.height = MATCH_START.unpack(payload)
+                self.rows = [[0] * self.height for _ in range(PLAYER_COUNT)]
+            case MessageType.BOARD_UPDATE:
+                self._apply_board_update(payload)
+            case MessageType.MATCH_END:
+                _, self.winner = MATCH_END.unpack(payload)
+        return message_type
+
+    def get_matrix_cell(self, player_index: int, row: int, col: int) -> CellState:
+        return CELL_STATES[(self.rows[player_index][row] >> (col * CELL_BITS)) & CELL_MASK]
+    # endregion Public methods
+
+    # region Protected methods
+    def _apply_board_update(self, payload: bytes):
+        fields = BOARD_UPDATE.unpack_from(payload)
+        player_index, last_input_sequence = fields[1], fields[2]
+        self.board_updates[player_index] = fields[:-1]
+        _, colors_size = get_snapshot_row_sizes(self.width)
+        rows = self.rows[player_index]
+        start = BOARD_UPDATE.size
+        for _ in range(fields[-1]):
+            row, = ROW_UPDATE.unpack_from(payload, start)
+            start += ROW_UPDATE.size
+            rows[row] = int.from_bytes(payload[start:start + colors_size], 'little')
+            start += colors_size
+        if player_index == self.player_index:
+            received_ns = time.perf_counter_ns()
+            while self.unconfirmed_inputs and self.unconfirmed_inputs[0][0] <= last_input_sequence:
+                self.input_latencies_ns.append(received_ns - self.unconfirmed_inputs.popleft()[1])
+    # endregion Protected methods
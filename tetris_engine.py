@@ -0,0 +1,290 @@
+import copy
+import hashlib
+import random
+import struct
+from typing import Hashable
+
+from bit_board_state import get_snapshot_row_sizes
+from board_state import BoardState
+from constants import ROTATION_ORDER, FRAMES_PER_DROP, LINE_CLEAR_HIGHLIGHT_FRAMES
+from enums.game_phase import GamePhase
+from enums.rotation import Rotation
+from enums.user_input_state import UserInputState
+from game_configuration import GameConfiguration, DEFAULT_CONFIGURATION
+from piece_randomizer import PieceRandomizer, create_randomizer
+from piece_state import PieceState
+
+# snapshot: seed, game phase, start level, level, cleared lines, score, pieces count, frame, next frame to drop,
+# highlight end frame, piece number (index in the piece set + 1, 0 without a piece), row, col, rotation;
+# followed by the board snapshot and the randomizer snapshot
+SNAPSHOT_HEADER = struct.Struct('<QBHHIQQqqqBhhB')
+ROTATIONS = tuple(Rotation)
+GAME_PHASES = tuple(GamePhase)
+
+
+class TetrisEngine:
+    # game data
+    board_type: type
+    configuration: GameConfiguration
+    seed: int
+    randomizer: PieceRandomizer
+    board_state: BoardState
+    # None until the first piece spawns
+    piece_state: PieceState | None
+    # row the active piece lands on, None until requested after the piece moved sideways, rotated or the board changed
+    landing_row: int | None
+    game_phase: GamePhase
+    # score system and level
+    start_level: int
+    level: int
+    cleared_lines_count: int
+    score: int
+    pieces_count: int
+    # timing, in logic frames
+    frame: int
+    next_frame_to_drop: int
+    highlight_end_frame: int
+
+    def __init__(self, board_type: type = BoardState, seed: int | None = None,
+                 configuration: GameConfiguration = DEFAULT_CONFIGURATION):
+        self.board_type = board_type
+        self.configuration = configuration
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.randomizer = create_randomizer(configuration.randomizer_type, len(configuration.piece_types), self.seed,
+                                            configuration.preview_count)
+        self.piece_state = None
+        self.landing_row = None
+        self.initialize_board().initialize_timers()
+
+    # region INITIALIZATION
+    def initialize_board(self, start_level=0) -> 'TetrisEngine':
+        self.board_state = self.board_type(self.configuration.width, self.configuration.height,
+                                           self.configuration.pieces)
+        self.game_phase = GamePhase.START
+        self.start_level = start_level
+        self.level = self.start_level
+        self.cleared_lines_count = 0
+        self.score = 0
+        self.pieces_count = 0
+        return self
+
+    def initialize_timers(self) -> 'TetrisEngine':
+        self.frame = 0
+        self.next_frame_to_drop = self.frame + self._get_frames_to_next_drop()
+        self.highlight_end_frame = self.frame + LINE_CLEAR_HIGHLIGHT_FRAMES
+        return self
+    # endregion END INITIALIZATION
+
+    # region Public methods
+    def spawn_piece(self):
+        piece_type = self.configuration.piece_types[self.randomizer.next_piece()]
+        self.piece_state = PieceState(piece_type, 0, self.configuration.width // 2, ROTATION_ORDER[0])
+        self.landing_row = None
+        self.next_frame_to_drop = self.frame + self._get_frames_to_next_drop()
+
+    def merge_piece(self):
+        shape = self.configuration.pieces[self.piece_state.piece_type].get_shape(self.piece_state.rotation)
+        for row, col in shape.cells:
+            self.board_state.set_matrix_cell(self.piece_state.offset_row + row, self.piece_state.offset_col + col,
+                                             shape.cell_type)
+        # lines can only complete on the rows the piece covers
+        self.board_state.find_filled_rows(self.piece_state.offset_row + shape.min_row,
+                                          self.piece_state.offset_row + shape.max_row + 1)
+        self.pieces_count += 1
+        self.landing_row = None
+
+    def add_garbage_lines(self, count: int, hole_col: int):
+        # the game ends when the garbage pushes blocks out of the top or into the active piece
+        overflowed = self.board_state.insert_garbage_rows(count, hole_col)
+        self.landing_row = None
+        if overflowed or not self.board_state.check_row_empty(0) or \
+                (self.piece_state is not None and not self.board_state.check_piece_valid(self.piece_state)):
+            self.game_phase = GamePhase.GAME_OVER
+
+    def get_next_pieces(self) -> list[Hashable]:
+        return [self.configuration.piece_types[piece] for piece in self.randomizer.preview]
+
+    def get_landing_row(self) -> int:
+        if self.landing_row is None:
+            self.landing_row = self.piece_state.offset_row + self.board_state.get_drop_distance(self.piece_state)
+        return self.landing_row
+
+    def soft_drop(self) -> bool:
+        self.piece_state.offset_row += 1
+        if not self.board_state.check_piece_valid(self.piece_state):
+            self.piece_state.offset_row -= 1
+            self.merge_piece()
+            self.spawn_piece()
+            return False
+        self.next_frame_to_drop = self.frame + self._get_frames_to_next_drop()
+        return True
+
+    def get_state_hash(self) -> bytes:
+        state_hash = hashlib.blake2b(digest_size=16)
+        state_hash.update(bytes(self.board_state.get_matrix_cell(row, col).value
+                                for row in range(self.board_state.height) for col in range(self.board_state.width)))
+        if self.game_phase != GamePhase.START:
+            state_hash.update(repr((self._get_piece_number(), self.piece_state.offset_row,
+                                    self.piece_state.offset_col, self.piece_state.rotation.value)).encode())
+        state_hash.update(repr((self.game_phase.value, self.start_level, self.level, self.cleared_lines_count,
+                                self.score, self.frame, self.next_frame_to_drop, self.highlight_end_frame)).encode())
+        return state_hash.digest()
+
+    def snapshot(self) -> bytes:
+        piece_state = self.piece_state
+        if piece_state is None:
+            piece_fields = (0, 0, 0, 0)
+        else:
+            piece_fields = (self._get_piece_number(), piece_state.offset_row, piece_state.offset_col,
+                            piece_state.rotation.value)
+        return SNAPSHOT_HEADER.pack(self.seed, self.game_phase.value, self.start_level, self.level,
+                                    self.cleared_lines_count, self.score, self.pieces_count, self.frame,
+                                    self.next_frame_to_drop, self.highlight_end_frame, *piece_fields) + \
+            self.board_state.snapshot() + self.randomizer.snapshot()
+
+    def restore(self, snapshot: bytes):
+        mask_size, colors_size = get_snapshot_row_sizes(self.board_state.width)
+        board_end = SNAPSHOT_HEADER.size + (mask_size + colors_size) * self.board_state.height
+        # first, a snapshot of another randomizer type fails before anything changed
+        self.randomizer.restore(snapshot[board_end:])
+        (self.seed, game_phase, self.start_level, self.level, self.cleared_lines_count, self.score, self.pieces_count,
+         self.frame, self.next_frame_to_drop, self.highlight_end_frame, piece_number, offset_row, offset_col,
+         rotation) = SNAPSHOT_HEADER.unpack_from(snapshot)
+        self.game_phase = GAME_PHASES[game_phase]
+        self.piece_state = PieceState(self.configuration.piece_types[piece_number - 1], offset_row, offset_col,
+                                      ROTATIONS[rotation]) if piece_number else None
+        self.landing_row = None
+        self.board_state.restore(snapshot[SNAPSHOT_HEADER.size:board_end])
+
+    def fork(self) -> 'TetrisEngine':
+        # an independent engine sharing the board rows until either side writes to them
+        engine = copy.copy(self)
+        engine.board_state = self.board_state.fork()
+        if self.piece_state is not None:
+            engine.piece_state = PieceState(self.piece_state.piece_type, self.piece_state.offset_row,
+                                            self.piece_state.offset_col, self.piece_state.rotation)
+        engine.randomizer = self.randomizer.copy()
+        return engine
+
+    def step(self, user_input_state: UserInputState = UserInputState.D_NONE):
+        self.frame += 1
+        self.update(user_input_state)
+
+    def update(self, user_input_state: UserInputState = UserInputState.D_NONE):
+        match self.game_phase:
+            case GamePhase.PLAYING:
+                self._update_game_state(user_input_state)
+            case GamePhase.CLEARING_LINE:
+                self._update_game_line()
+            case GamePhase.GAME_OVER:
+                self._update_game_over(user_input_state)
+            case GamePhase.START:
+                self._update_game_start(user_input_state)
+    # endregion Public methods
+
+    # region Protected methods
+    def _get_piece_number(self) -> int:
+        # stable small integer for the active piece type, the CellState value for the standard pieces
+        return self.configuration.piece_types.index(self.piece_state.piece_type) + 1
+
+    def _get_frames_to_next_drop(self) -> int:
+        max_available_level = max(FRAMES_PER_DROP.keys())
+        if self.level > max_available_level:
+            self.level = max_available_level
+        return FRAMES_PER_DROP[self.level]
+
+    def _update_game_state(self, user_input_state: UserInputState):
+        pieces_count = self.pieces_count
+        # moves and rotations are validated on plain ints and only written back when they fit
+        piece_state = self.piece_state
+        piece = self.configuration.pieces[piece_state.piece_type]
+        offset_col = piece_state.offset_col
+        rotation = piece_state.rotation
+        match user_input_state:
+            # Process rotation and movement
+            case UserInputState.D_LEFT:
+                offset_col -= 1
+            case UserInputState.D_RIGHT:
+                offset_col += 1
+            case UserInputState.D_ROTATE:
+                new_rotation_idx = (ROTATION_ORDER.index(rotation) + 1) % len(ROTATION_ORDER)
+                rotation = ROTATION_ORDER[new_rotation_idx]
+
+        if user_input_state in (UserInputState.D_LEFT, UserInputState.D_RIGHT, UserInputState.D_ROTATE) and \
+                self.board_state.check_shape_valid(piece.get_shape(rotation), piece_state.offset_row, offset_col):
+            piece_state.offset_col = offset_col
+            piece_state.rotation = rotation
+            self.landing_row = None
+
+        match user_input_state:
+            # Process soft and hard drops
+            case UserInputState.D_DOWN:
+                self.soft_drop()
+            case UserInputState.D_HARD_DROP:
+                self.piece_state.offset_row = self.get_landing_row()
+                self.soft_drop()
+
+        while self.frame >= self.next_frame_to_drop:
+            self.soft_drop()
+
+        if self.pieces_count == pieces_count:
+            # the board only changes when a piece locks
+            return
+
+        if any(self.board_state.pending_lines):
+            self.game_phase = GamePhase.CLEARING_LINE
+            self.highlight_end_frame = self.frame + LINE_CLEAR_HIGHLIGHT_FRAMES
+
+        game_over_row = 0
+        if not self.board_state.check_row_empty(game_over_row):
+            self.game_phase = GamePhase.GAME_OVER
+
+    def _compute_score(self, level: int, cleared_line_count: int):
+        match cleared_line_count:
+            case 1:
+                return 40 * (level + 1)
+            case 2:
+                return 100 * (level + 1)
+            case 3:
+                return 300 * (level + 1)
+            case 4:
+                return 1200 * (level + 1)
+            case _:
+                return 0
+
+    def _get_lines_for_next_level(self, start_level: int, level: int):
+        level_up_limit = min(start_level * 10 + 1, max(100, start_level * 10 - 50))
+        if level == start_level:
+            return level_up_limit
+        diff = level - start_level
+        return level_up_limit + diff * 10
+
+    def _update_game_line(self):
+        if self.frame >= self.highlight_end_frame:
+            pending_lines = self.board_state.clear_lines()
+            self.landing_row = None
+            self.cleared_lines_count += pending_lines
+            self.score += self._compute_score(self.level, pending_lines)
+
+            if self.cleared_lines_count >= self._get_lines_for_next_level(self.start_level, self.level):
+                self.level += 1
+
+            self.game_phase = GamePhase.PLAYING
+
+    def _update_game_over(self, user_input_state: UserInputState):
+        match user_input_state:
+            case UserInputState.D_HARD_DROP:
+                self.game_phase = GamePhase.START
+
+    def _update_game_start(self, user_input_state: UserInputState):
+        match user_input_state:
+            case UserInputState.D_ROTATE:
+                self.start_level += 1
+            case UserInputState.D_DOWN:
+                if self.start_level > 0:
+                    self.start_level -= 1
+            case UserInputState.D_HARD_DROP:
+                self.initialize_board(self.start_level)
+                self.spawn_piece()
+                self.game_phase = GamePhase.PLAYING
+    # endregion Protected methods
@@ -1,197 +1,163 @@
-import copy
-import random
+import os
+import time
 
-from board_state import BoardState
-from constants import WIDTH, HEIGHT, PIECES_TYPES, ROTATION_ORDER, PIECES, FRAMES_PER_DROP, SECONDS_PER_FRAME
-from enums.cell_state import CellState
+import pygame as pg
+
+from constants import WIDTH, HEIGHT, GRID_SIZE
 from enums.game_phase import GamePhase
+from enums.randomizer_type import RandomizerType
 from enums.user_input_state import UserInputState
+from frame_profiler import FrameProfiler
 from game import Game
-from piece_state import PieceState
+from game_configuration import GameConfiguration, DEFAULT_CONFIGURATION
+from incremental_renderer import IncrementalRenderer
+from input_queue import InputQueue
+from renderer import render
+from replay import ReplayWriter
+from stats_store import StatsStore, GameStatsTracker
+from tetris_bot import TetrisBot
+from tetris_engine import TetrisEngine
 
 
 class TetrisGameState(Game):
-    # game data
-    board_state: BoardState
-    lines: list[bool]
-    piece_state: PieceState
-    game_phase: GamePhase
-    user_input_state: UserInputState
-    # score system and level
-    start_level: int
-    level: int
-    cleared_lines_count: int
-    score: int
-    # timing
-    time: float
-    next_time_to_drop: float
-    highlight_end_time: float
-
-    def __init__(self, frame_rate: int = 60):
-        super().__init__(frame_rate)
-        self.initialize_board().initialize_timers()
-
-    # region INITIALIZATION
-    def initialize_board(self, start_level=0) -> 'TetrisGameState':
-        self.board_state = BoardState(WIDTH, HEIGHT)
-        self.game_phase = GamePhase.START
-        self.start_level = start_level
-        self.level = self.start_level
-        self.cleared_lines_count = 0
-        self.score = 0
-        self.user_input_state = UserInputState.D_NONE
-
-        self.keydown_event_handlers[UserInputState.D_NONE].append(self._handle_key_down)
-        self.keydown_event_handlers[UserInputState.D_LEFT].append(self._handle_key_down)
-        self.keydown_event_handlers[UserInputState.D_RIGHT].append(self._handle_key_down)
-        self.keydown_event_handlers[UserInputState.D_DOWN].append(self._handle_key_down)
-        self.keydown_event_handlers[UserInputState.D_ROTATE].append(self._handle_key_down)
-        self.keydown_event_handlers[UserInputState.D_HARD_DROP].append(self._handle_key_down)
-
-        return self
-
-    def initialize_timers(self) -> 'TetrisGameState':
-        self.time = 0.0
-        self.next_time_to_drop = self.time + self._get_time_to_next_drop()
-        self.highlight_end_time = self.time + 0.2
-        return self
-    # endregion END INITIALIZATION
+    engine: TetrisEngine
+    incremental_renderer: IncrementalRenderer | None
+    replay_writer: ReplayWriter | None
+    # plays instead of the keyboard when set, e.g. for attract mode
+    bot: TetrisBot | None
+    input_queue: InputQueue
+    # (pieces count, rotation, row, col) of the active piece before the last logic tick, for render interpolation
+    previous_piece_position: tuple | None
+    stats_store: StatsStore | None
+    stats_tracker: GameStatsTracker | None
+    # wall clock start of the session and frames rendered since, for the session statistics
+    started_at: float
+    rendered_frames: int
+
+    def __init__(self, frame_rate: int = 60, incremental_render: bool = False, seed: int | None = None,
+                 replay_path: str | None = None, profiler: FrameProfiler | None = None, bot: TetrisBot | None = None,
+                 configuration: GameConfiguration = DEFAULT_CONFIGURATION, stats_store: StatsStore | None = None):
+        super().__init__(frame_rate, profiler, configuration.window_size)
+        self.engine = TetrisEngine(seed=seed, configuration=configuration)
+        self.incremental_renderer = None
+        if incremental_render:
+            self.incremental_renderer = IncrementalRenderer(self.screen, self.font, configuration.height,
+                                                            configuration.width, grid_size=configuration.grid_size)
+        self.replay_writer = None
+        if replay_path is not None:
+            self.replay_writer = ReplayWriter(open(replay_path, 'wb'), self.engine.seed, self.engine.start_level,
+                                              configuration.randomizer_type)
+        self.bot = bot
+        self.input_queue = InputQueue()
+        self.previous_piece_position = None
+        self.stats_store = stats_store
+        self.stats_tracker = None
+        if stats_store is not None:
+            self.stats_tracker = GameStatsTracker(stats_store, time.time_ns(), self.engine)
+        self.started_at = time.time()
+        self.rendered_frames = 0
+
+        if self.bot is None:
+            for user_input_state in (UserInputState.D_LEFT, UserInputState.D_RIGHT, UserInputState.D_DOWN,
+                                     UserInputState.D_ROTATE, UserInputState.D_HARD_DROP):
+                self.input_dispatcher.subscribe(pg.KEYDOWN, user_input_state, self._handle_key_down)
+                self.input_dispatcher.subscribe(pg.KEYUP, user_input_state, self._handle_key_up)
 
     # region Public methods
-    def spawn_piece(self):
-        cell_type = random.choice(PIECES_TYPES)
-        self.piece_state = PieceState(cell_type, 0, WIDTH // 2, ROTATION_ORDER[0])
-        self.next_time_to_drop = self.time + self._get_time_to_next_drop()
-
-    def merge_piece(self):
-        piece = PIECES[self.piece_state.piece_type]
-        for row in range(0, piece.side):
-            for col in range(0, piece.side):
-                piece_cell = piece.get_piece_cell(row, col, self.piece_state.rotation)
-                if piece_cell != CellState.EMPTY:
-                    board_row = self.piece_state.offset_row + row
-                    board_col = self.piece_state.offset_col + col
-                    self.board_state.set_matrix_cell(board_row, board_col, piece_cell)
-
-    def soft_drop(self) -> bool:
-        self.piece_state.offset_row += 1
-        if not self.board_state.check_piece_valid(self.piece_state):
-            self.piece_state.offset_row -= 1
-            self.merge_piece()
-            self.spawn_piece()
-            return False
-        self.next_time_to_drop = self.time + self._get_time_to_next_drop()
-        return True
-
-    def update(self):
-        self.time += self.clock.get_time() / 1000.0
-        match self.game_phase:
-            case GamePhase.PLAYING:
-                self._update_game_state(self.user_input_state)
-            case GamePhase.CLEARING_LINE:
-                self._update_game_line()
-            case GamePhase.GAME_OVER:
-                self._update_game_over(self.user_input_state)
-            case GamePhase.START:
-                self._update_game_start(self.user_input_state)
-        super().update()
-        self.user_input_state = UserInputState.D_NONE
+    def tick(self):
+        self.previous_piece_position = self._get_piece_position()
+        if self.bot is not None:
+            self._step(self.bot.choose_input(self.engine))
+            if self.stats_tracker is not None:
+                self.stats_tracker.update()
+            super().tick()
+            return
+        # every input due by this tick is applied in order, the first one advances the frame
+        input_events = self.input_queue.poll(self.tick_time_ns)
+        self._step(input_events[0].user_input_state if input_events else UserInputState.D_NONE)
+        for input_event in input_events[1:]:
+            self.engine.update(input_event.user_input_state)
+            if self.replay_writer is not None:
+                self.replay_writer.write_update(input_event.user_input_state)
+            if self.stats_tracker is not None:
+                self.stats_tracker.record_input(input_event.user_input_state)
+        if self.profiler is not None:
+            applied_ns = time.perf_counter_ns()
+            for input_event in input_events:
+                if not input_event.repeat:
+                    self.profiler.record_input_latency(applied_ns - input_event.timestamp_ns)
+        if self.stats_tracker is not None:
+            self.stats_tracker.update()
+        super().tick()
+
+    def on_quit(self):
+        super().on_quit()
+        if self.replay_writer is not None:
+            self.replay_writer.close(self.engine.get_state_hash())
+            self.replay_writer.file.close()
+        if self.stats_store is not None:
+            ended_at = time.time()
+            mean_frame_ms = (ended_at - self.started_at) * 1000 / self.rendered_frames if self.rendered_frames else None
+            self.stats_store.record_session(self.stats_tracker.session_id, self.started_at, ended_at,
+                                            self.stats_tracker.game_number, self.rendered_frames, mean_frame_ms)
+            self.stats_store.close()
+
+    def render(self) -> list[pg.Rect] | None:
+        self.rendered_frames += 1
+        if self.incremental_renderer is not None:
+            return self.incremental_renderer.render(self.engine, self.profiler)
+        configuration = self.engine.configuration
+        render(self.screen, self.font, self.engine, configuration.height, configuration.width, self.profiler,
+               self._get_piece_offset_y())
+        return None
     # endregion Public methods
 
     # region Protected methods
-    def _get_time_to_next_drop(self):
-        max_available_level = max(FRAMES_PER_DROP.keys())
-        if self.level > max_available_level:
-            self.level = max_available_level
-        return FRAMES_PER_DROP[self.level] * SECONDS_PER_FRAME
-
-    def _update_game_state(self, user_input_state: UserInputState):
-        current_piece = copy.deepcopy(self.piece_state)
-        match user_input_state:
-            # Process rotation and movement
-            case UserInputState.D_LEFT:
-                current_piece.offset_col -= 1
-            case UserInputState.D_RIGHT:
-                current_piece.offset_col += 1
-            case UserInputState.D_ROTATE:
-                new_rotation_idx = (ROTATION_ORDER.index(current_piece.rotation) + 1) % len(ROTATION_ORDER)
-                current_piece.rotation = ROTATION_ORDER[new_rotation_idx]
-
-        if self.board_state.check_piece_valid(current_piece):
-            self.piece_state = current_piece
-
-        match user_input_state:
-            # Process soft and hard drops
-            case UserInputState.D_DOWN:
-                self.soft_drop()
-            case UserInputState.D_HARD_DROP:
-                while self.soft_drop():
-                    pass
-
-        while self.time >= self.next_time_to_drop:
-            self.soft_drop()
-
-        self.board_state.find_filled_rows()
-        if any(self.board_state.pending_lines):
-            self.game_phase = GamePhase.CLEARING_LINE
-            self.highlight_end_time = self.time + 0.2
-
-        game_over_row = 0
-        if not self.board_state.check_row_empty(game_over_row):
-            self.game_phase = GamePhase.GAME_OVER
-
-    def _compute_score(self, level: int, cleared_line_count: int):
-        match cleared_line_count:
-            case 1:
-                return 40 * (level + 1)
-            case 2:
-                return 100 * (level + 1)
-            case 3:
-                return 300 * (level + 1)
-            case 4:
-                return 1200 * (level + 1)
-            case _:
-                return 0
-
-    def _get_lines_for_next_level(self, start_level: int, level: int):
-        level_up_limit = min(start_level * 10 + 1, max(100, start_level * 10 - 50))
-        if level == start_level:
-            return level_up_limit
-        diff = level - start_level
-        return level_up_limit + diff * 10
-
-    def _update_game_line(self):
-        if self.time >= self.highlight_end_time:
-            pending_lines = self.board_state.clear_lines()
-            self.cleared_lines_count += pending_lines
-            self.score += self._compute_score(self.level, pending_lines)
-
-            if self.cleared_lines_count >= self._get_lines_for_next_level(self.start_level, self.level):
-                self.level += 1
-
-            self.game_phase = GamePhase.PLAYING
-
-    def _update_game_over(self, user_input_state: UserInputState):
-        match user_input_state:
-            case UserInputState.D_HARD_DROP:
-                self.game_phase = GamePhase.START
-
-    def _update_game_start(self, user_input_state: UserInputState):
-        match user_input_state:
-            case UserInputState.D_ROTATE:
-                self.start_level += 1
-            case UserInputState.D_DOWN:
-                if self.start_level > 0:
-                    self.start_level -= 1
-            case UserInputState.D_HARD_DROP:
-                self.initialize_board(self.start_level)
-                self.spawn_piece()
-                self.game_phase = GamePhase.PLAYING
+    def _get_piece_position(self) -> tuple | None:
+        if self.engine.game_phase != GamePhase.PLAYING:
+            return None
+        piece_state = self.engine.piece_state
+        return self.engine.pieces_count, piece_state.rotation, piece_state.offset_row, piece_state.offset_col
+
+    def _get_piece_offset_y(self) -> int:
+        # a piece that fell one row during the last tick is drawn between the two rows
+        previous_position = self.previous_piece_position
+        current_position = self._get_piece_position()
+        if previous_position is None or current_position is None or \
+                previous_position[:2] != current_position[:2] or previous_position[3] != current_position[3] or \
+                current_position[2] - previous_position[2] != 1:
+            return 0
+        return round((self.timestep.alpha - 1) * self.engine.configuration.grid_size)
+
+    def _step(self, user_input_state: UserInputState):
+        self.engine.step(user_input_state)
+        if self.replay_writer is not None:
+            self.replay_writer.write_step(user_input_state)
+        if self.stats_tracker is not None:
+            self.stats_tracker.record_input(user_input_state)
 
     def _handle_key_down(self, user_input_state: UserInputState):
-        self.user_input_state = user_input_state
+        self.input_queue.push(time.perf_counter_ns(), user_input_state, True)
+
+    def _handle_key_up(self, user_input_state: UserInputState):
+        self.input_queue.push(time.perf_counter_ns(), user_input_state, False)
     # endregion Protected methods
 
 
 if __name__ == '__main__':
-    TetrisGameState().run()
+    # TETRIS_PROFILE=<summary.json> records per-frame timings, TETRIS_PROFILE_OVERLAY=1 also shows them on screen
+    # TETRIS_BOARD=<width>x<height> and TETRIS_GRID_SIZE=<pixels> change the board size
+    # TETRIS_RANDOMIZER=uniform|bag|nes picks the piece randomizer
+    # TETRIS_STATS=<stats.db> records finished games and the session in a SQLite database
+    board_width, board_height = map(int, os.environ.get('TETRIS_BOARD', f'{WIDTH}x{HEIGHT}').split('x'))
+    grid_size = int(os.environ.get('TETRIS_GRID_SIZE', GRID_SIZE))
+    randomizer_type = RandomizerType[os.environ.get('TETRIS_RANDOMIZER', 'uniform').upper()]
+    game_configuration = GameConfiguration(board_width, board_height, grid_size, randomizer_type=randomizer_type)
+    profile_path = os.environ.get('TETRIS_PROFILE')
+    show_profile_overlay = os.environ.get('TETRIS_PROFILE_OVERLAY') == '1'
+    frame_profiler = None
+    if profile_path or show_profile_overlay:
+        frame_profiler = FrameProfiler(60, summary_path=profile_path, show_overlay=show_profile_overlay)
+    stats_path = os.environ.get('TETRIS_STATS')
+    TetrisGameState(profiler=frame_profiler, configuration=game_configuration,
+                    stats_store=StatsStore(stats_path) if stats_path else None).run()
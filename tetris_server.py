@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import random
+import time
+
+from enums.message_type import MessageType
+from fixed_timestep import FixedTimestep, NANOSECONDS_PER_SECOND
+from network_protocol import MESSAGE_HEADER, INPUT
+from replay import INPUT_STATES
+from versus_match import VersusMatch
+
+DEFAULT_PORT = 7777
+# unsent bytes a client may fall behind by, about two seconds of updates, before it is dropped
+MAX_WRITE_BUFFER_BYTES = 64 * 1024
+
+
+class PlayerConnection:
+    writer: asyncio.StreamWriter
+    # reads the inputs of the player
+    task: asyncio.Task
+    match: VersusMatch | None
+    player_index: int
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.match = None
+        self.player_index = 0
+        self.task = asyncio.current_task()
+
+
+class TetrisServer:
+    seed: int
+    rng: random.Random
+    timestep: FixedTimestep
+    matches: dict[int, VersusMatch]
+    # connections of every running match, by match id
+    connections: dict[int, list[PlayerConnection]]
+    # waits for an opponent
+    waiting_connection: PlayerConnection | None
+    open_connections: set[PlayerConnection]
+    next_match_id: int
+    is_running: bool
+    # totals for the benchmarks, match ticks counts one tick of one match
+    tick_count: int
+    match_tick_count: int
+    tick_ns: int
+    sent_bytes: int
+
+    def __init__(self, seed: int | None = None):
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.timestep = FixedTimestep()
+        self.matches = {}
+        self.connections = {}
+        self.waiting_connection = None
+        self.open_connections = set()
+        self.next_match_id = 0
+        self.is_running = False
+        self.tick_count = 0
+        self.match_tick_count = 0
+        self.tick_ns = 0
+        self.sent_bytes = 0
+
+    # region Public methods
+    async def serve(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                    started: asyncio.Future | None = None):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        if started is not None:
+            started.set_result(server.sockets[0].getsockname()[1])
+        async with server:
+            await self.run()
+            # closing the connections ends their readers
+            connections = list(self.open_connections)
+            for connection in connections:
+                connection.writer.close()
+            await asyncio.gather(*(connection.task for connection in connections))
+
+    async def run(self):
+        # matches tick at the FixedTimestep rate, late ticks are caught up like in Game.update
+        self.is_running = True
+        self.timestep.reset()
+        while self.is_running:
+            for _ in range(self.timestep.advance(time.perf_counter_ns())):
+                self.tick()
+            next_tick_ns = self.timestep.get_tick_time_ns(self.timestep.tick_count + 1)
+            await asyncio.sleep(max(next_tick_ns - time.perf_counter_ns(), 0) / NANOSECONDS_PER_SECOND)
+
+    def stop(self):
+        self.is_running = False
+
+    def tick(self):
+        start_ns = time.perf_counter_ns()
+        for match_id, match in list(self.matches.items()):
+            messages = match.tick()
+            if messages:
+                for connection in self.connections[match_id]:
+                    connection.writer.write(messages)
+                    # a client that stopped reading loses the match instead of buffering without bound
+                    if connection.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER_BYTES:
+                        connection.writer.transport.abort()
+                self.sent_bytes += len(messages) * len(self.connections[match_id])
+            if match.is_over():
+                self._end_match(match_id)
+        self.match_tick_count += len(self.matches)
+        self.tick_count += 1
+        self.tick_ns += time.perf_counter_ns() - start_ns
+    # endregion Public methods
+
+    # region Protected methods
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = PlayerConnection(writer)
+        self.open_connections.add(connection)
+        self._join(connection)
+        try:
+            while True:
+                payload_size, message_type = MESSAGE_HEADER.unpack(await reader.readexactly(MESSAGE_HEADER.size))
+                payload = await reader.readexactly(payload_size)
+                # clients only send inputs, anything else ends the connection
+                if message_type != MessageType.INPUT.value or payload_size != INPUT.size:
+                    break
+                sequence, input_value = INPUT.unpack(payload)
+                user_input_state = INPUT_STATES.get(input_value)
+                if user_input_state is None:
+                    break
+                if connection.match is not None:
+                    connection.match.push_input(connection.player_index, sequence, user_input_state)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._leave(connection)
+
+    def _join(self, connection: PlayerConnection):
+        if self.waiting_connection is None:
+            self.waiting_connection = connection
+            return
+        match = VersusMatch(self.next_match_id, self.rng.getrandbits(64))
+        self.next_match_id += 1
+        connections = [self.waiting_connection, connection]
+        self.waiting_connection = None
+        self.matches[match.match_id] = match
+        self.connections[match.match_id] = connections
+        for player_index, player_connection in enumerate(connections):
+            player_connection.match = match
+            player_connection.player_index = player_index
+            player_connection.writer.write(match.get_start_message(player_index))
+
+    def _leave(self, connection: PlayerConnection):
+        self.open_connections.discard(connection)
+        if self.waiting_connection is connection:
+            self.waiting_connection = None
+        match = connection.match
+        if match is not None and match.match_id in self.matches:
+            # leaving loses the match, the opponent is told right away
+            match.forfeit(connection.player_index)
+            for player_connection in self.connections[match.match_id]:
+                if player_connection is not connection:
+                    player_connection.writer.write(match.get_end_message())
+            self._end_match(match.match_id)
+        connection.writer.close()
+
+    def _end_match(self, match_id: int):
+        del self.matches[match_id]
+        for connection in self.connections.pop(match_id):
+            connection.match = None
+            connection.writer.close()
+    # endregion Protected methods
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the versus match server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--seed', type=int, help='seed of the match seeds, random by default')
+    arguments = parser.parse_args()
+    asyncio.run(TetrisServer(arguments.seed).serve(arguments.host, arguments.port))
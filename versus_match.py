@@ -0,0 +1,162 @@
+import random
+
+from bit_board_state import get_snapshot_row_sizes, BitBoardState
+from enums.game_phase import GamePhase
+from enums.message_type import MessageType
+from enums.user_input_state import UserInputState
+from game_configuration import GameConfiguration, DEFAULT_CONFIGURATION
+from network_protocol import BOARD_UPDATE, ROW_UPDATE, MATCH_START, MATCH_END, NO_WINNER, pack_message
+from tetris_engine import TetrisEngine
+
+PLAYER_COUNT = 2
+# garbage lines sent to the opponent by the number of lines cleared at once
+GARBAGE_LINES = (0, 0, 1, 2, 4)
+# inputs of one player applied per tick, more than any player presses in a frame, the rest is dropped
+MAX_INPUTS_PER_TICK = 8
+
+
+class VersusMatch:
+    match_id: int
+    seed: int
+    engines: list[TetrisEngine]
+    # (sequence, UserInputState) received per player since the last tick
+    inputs: list[list[tuple[int, UserInputState]]]
+    last_input_sequences: list[int]
+    # [lines, hole column] batches waiting per player, applied after a lock that clears no lines
+    pending_garbage: list[list[list[int]]]
+    garbage_rng: random.Random
+    # garbage lines added to the board of every player so far
+    received_garbage_lines: list[int]
+    # state of every board when its last BOARD_UPDATE was built, and the row colors the clients have
+    sent_states: list[tuple | None]
+    sent_rows: list[list[int]]
+    winner: int | None
+
+    def __init__(self, match_id: int, seed: int, board_type: type = BitBoardState,
+                 configuration: GameConfiguration = DEFAULT_CONFIGURATION):
+        self.match_id = match_id
+        self.seed = seed
+        # both players get the same piece sequence
+        self.engines = [TetrisEngine(board_type, seed, configuration) for _ in range(PLAYER_COUNT)]
+        # the match starts right away at level 0, there always is an active piece from here on
+        for engine in self.engines:
+            engine.step(UserInputState.D_HARD_DROP)
+        self.inputs = [[] for _ in range(PLAYER_COUNT)]
+        self.last_input_sequences = [0] * PLAYER_COUNT
+        self.pending_garbage = [[] for _ in range(PLAYER_COUNT)]
+        self.garbage_rng = random.Random(seed)
+        self.received_garbage_lines = [0] * PLAYER_COUNT
+        self.sent_states = [None] * PLAYER_COUNT
+        self.sent_rows = [[0] * configuration.height for _ in range(PLAYER_COUNT)]
+        self.winner = None
+
+    # region Public methods
+    def get_start_message(self, player_index: int) -> bytes:
+        configuration = self.engines[player_index].configuration
+        return pack_message(MessageType.MATCH_START, MATCH_START.pack(self.match_id, player_index, self.seed,
+                                                                      configuration.width, configuration.height))
+
+    def push_input(self, player_index: int, sequence: int, user_input_state: UserInputState):
+        inputs = self.inputs[player_index]
+        if len(inputs) < MAX_INPUTS_PER_TICK:
+            inputs.append((sequence, user_input_state))
+
+    def forfeit(self, player_index: int):
+        if self.winner is None:
+            self.winner = (player_index + 1) % PLAYER_COUNT
+
+    def is_over(self) -> bool:
+        return self.winner is not None
+
+    def tick(self) -> bytes:
+        # advances both boards one logic frame, returns the messages for both players
+        for player_index, engine in enumerate(self.engines):
+            cleared_lines_count = engine.cleared_lines_count
+            pieces_count = engine.pieces_count
+            # like TetrisGameState.tick, the first input advances the frame and the others share it
+            inputs = self.inputs[player_index]
+            # a hard drop would restart a topped out board, versus engines stay in GAME_OVER
+            if engine.game_phase == GamePhase.GAME_OVER:
+                inputs.clear()
+                continue
+            engine.step(inputs[0][1] if inputs else UserInputState.D_NONE)
+            if inputs:
+                for _, user_input_state in inputs[1:]:
+                    if engine.game_phase == GamePhase.GAME_OVER:
+                        break
+                    engine.update(user_input_state)
+                self.last_input_sequences[player_index] = inputs[-1][0]
+                inputs.clear()
+            if engine.cleared_lines_count != cleared_lines_count:
+                cleared_count = min(engine.cleared_lines_count - cleared_lines_count, len(GARBAGE_LINES) - 1)
+                self._send_garbage(player_index, GARBAGE_LINES[cleared_count])
+            elif engine.pieces_count != pieces_count and engine.game_phase == GamePhase.PLAYING:
+                self._receive_garbage(player_index)
+
+        messages = [self._get_board_update(player_index) for player_index in range(PLAYER_COUNT)]
+        if self.winner is None:
+            topped_out = [engine.game_phase == GamePhase.GAME_OVER for engine in self.engines]
+            if all(topped_out):
+                self.winner = NO_WINNER
+            elif any(topped_out):
+                self.winner = topped_out.index(False)
+        if self.winner is not None:
+            messages.append(self.get_end_message())
+        return b''.join(messages)
+
+    def get_end_message(self) -> bytes:
+        return pack_message(MessageType.MATCH_END, MATCH_END.pack(self.match_id, self.winner))
+    # endregion Public methods
+
+    # region Protected methods
+    def _send_garbage(self, player_index: int, lines: int):
+        # cleared lines cancel the player's own incoming garbage first
+        pending_garbage = self.pending_garbage[player_index]
+        while lines and pending_garbage:
+            cancelled = min(lines, pending_garbage[0][0])
+            pending_garbage[0][0] -= cancelled
+            lines -= cancelled
+            if not pending_garbage[0][0]:
+                pending_garbage.pop(0)
+        if lines:
+            opponent_engine = self.engines[(player_index + 1) % PLAYER_COUNT]
+            self.pending_garbage[(player_index + 1) % PLAYER_COUNT].append(
+                [lines, self.garbage_rng.randrange(opponent_engine.configuration.width)])
+
+    def _receive_garbage(self, player_index: int):
+        engine = self.engines[player_index]
+        for lines, hole_col in self.pending_garbage[player_index]:
+            engine.add_garbage_lines(lines, hole_col)
+            self.received_garbage_lines[player_index] += lines
+        self.pending_garbage[player_index].clear()
+
+    def _get_board_update(self, player_index: int) -> bytes:
+        engine = self.engines[player_index]
+        piece_state = engine.piece_state
+        pending_garbage = self.pending_garbage[player_index]
+        incoming_garbage_lines = sum(lines for lines, _ in pending_garbage) if pending_garbage else 0
+        # the board rows only change when a piece locks, lines clear or garbage comes in
+        board_key = (engine.pieces_count, engine.cleared_lines_count, self.received_garbage_lines[player_index])
+        state = (board_key, engine.game_phase, piece_state.piece_type, piece_state.offset_row, piece_state.offset_col,
+                 piece_state.rotation, engine.level, engine.score, self.last_input_sequences[player_index],
+                 incoming_garbage_lines)
+        sent_state = self.sent_states[player_index]
+        if state == sent_state:
+            return b''
+        self.sent_states[player_index] = state
+
+        row_updates = []
+        if sent_state is None or board_key != sent_state[0]:
+            # only the rows that differ from what the clients have are sent
+            _, colors_size = get_snapshot_row_sizes(engine.board_state.width)
+            sent_rows = self.sent_rows[player_index]
+            for row, colors in enumerate(engine.board_state.get_row_colors()):
+                if colors != sent_rows[row]:
+                    sent_rows[row] = colors
+                    row_updates.append(ROW_UPDATE.pack(row) + colors.to_bytes(colors_size, 'little'))
+        return pack_message(MessageType.BOARD_UPDATE, BOARD_UPDATE.pack(
+            engine.frame, player_index, self.last_input_sequences[player_index], engine.game_phase.value,
+            engine.configuration.piece_types.index(piece_state.piece_type) + 1, piece_state.offset_row,
+            piece_state.offset_col, piece_state.rotation.value, engine.level, engine.score,
+            engine.cleared_lines_count, incoming_garbage_lines, len(row_updates)) + b''.join(row_updates))
+    # endregion Protected methods